@@ -0,0 +1,46 @@
+"""Unique (course_id, datetime, starting_hole) key for bulk upserts
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The old ORM upsert could insert the same slot twice; keep the oldest row
+    op.execute(
+        """
+        UPDATE players p
+        SET tee_time_id = k.keep_id
+        FROM (
+            SELECT id, MIN(id) OVER (PARTITION BY course_id, datetime, starting_hole) AS keep_id
+            FROM tee_times
+        ) k
+        WHERE p.tee_time_id = k.id AND k.id <> k.keep_id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM tee_times t
+        USING tee_times d
+        WHERE t.course_id = d.course_id
+          AND t.datetime = d.datetime
+          AND t.starting_hole = d.starting_hole
+          AND t.id > d.id
+        """
+    )
+    op.create_unique_constraint(
+        "uq_tee_times_course_datetime_hole",
+        "tee_times",
+        ["course_id", "datetime", "starting_hole"],
+    )
+
+
+def downgrade():
+    op.drop_constraint("uq_tee_times_course_datetime_hole", "tee_times", type_="unique")
@@ -0,0 +1,48 @@
+"""Stored availability flag and indexes for the tee time list filters
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # `available_booking_sizes != '{}'` cannot use an index; a stored flag can
+    op.add_column(
+        "tee_times",
+        sa.Column(
+            "is_available",
+            sa.Boolean(),
+            sa.Computed("coalesce(cardinality(available_booking_sizes), 0) > 0", persisted=True),
+        ),
+    )
+    # Built concurrently so API reads keep working while the indexes build
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tee_times_available_datetime",
+            "tee_times",
+            ["datetime"],
+            postgresql_where=sa.text("is_available"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_tee_times_available_course_datetime",
+            "tee_times",
+            ["course_id", "datetime"],
+            postgresql_where=sa.text("is_available"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_tee_times_available_course_datetime", "tee_times", postgresql_concurrently=True)
+        op.drop_index("ix_tee_times_available_datetime", "tee_times", postgresql_concurrently=True)
+    op.drop_column("tee_times", "is_available")
@@ -0,0 +1,55 @@
+"""Append-only tee time snapshots and their hourly rollups
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "tee_time_snapshots",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("tee_time_id", sa.Integer(), sa.ForeignKey("tee_times.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("course_id", sa.Integer(), sa.ForeignKey("courses.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("tee_datetime", sa.DateTime(), nullable=False),
+        sa.Column("observed_at", sa.DateTime(), nullable=False),
+        sa.Column("change_type", sa.String(24), nullable=False),
+        sa.Column("price", sa.Float()),
+        sa.Column("available_booking_sizes", sa.ARRAY(sa.Integer())),
+    )
+    op.create_index("ix_tee_time_snapshots_tee_time_id", "tee_time_snapshots", ["tee_time_id"])
+    op.create_index("ix_tee_time_snapshots_course_datetime", "tee_time_snapshots", ["course_id", "tee_datetime"])
+    # Snapshots are appended in observed_at order, which BRIN summarises in a few pages
+    op.create_index("ix_tee_time_snapshots_observed_at", "tee_time_snapshots", ["observed_at"], postgresql_using="brin")
+
+    op.create_table(
+        "tee_time_rollups",
+        sa.Column("course_id", sa.Integer(), sa.ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("tee_date", sa.Date(), primary_key=True),
+        sa.Column("tee_hour", sa.SmallInteger(), primary_key=True),
+        sa.Column("lead_hours", sa.Integer(), primary_key=True),
+        sa.Column("added", sa.Integer(), nullable=False),
+        sa.Column("opened", sa.Integer(), nullable=False),
+        sa.Column("sold_out", sa.Integer(), nullable=False),
+        sa.Column("expired", sa.Integer(), nullable=False),
+        sa.Column("availability_changed", sa.Integer(), nullable=False),
+        sa.Column("price_changed", sa.Integer(), nullable=False),
+        sa.Column("price_sum", sa.Float(), nullable=False),
+        sa.Column("price_count", sa.Integer(), nullable=False),
+        sa.Column("min_price", sa.Float()),
+        sa.Column("max_price", sa.Float()),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("tee_time_rollups")
+    op.drop_table("tee_time_snapshots")
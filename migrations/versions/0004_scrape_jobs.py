@@ -0,0 +1,32 @@
+"""Scrape jobs shared by every API worker
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "scrape_jobs",
+        sa.Column("id", sa.String(32), primary_key=True),
+        sa.Column("course", sa.String(), nullable=False),
+        sa.Column("status", sa.String(16), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("finished_at", sa.DateTime()),
+        sa.Column("tee_times_found", sa.Integer()),
+        sa.Column("duration_seconds", sa.Float()),
+        sa.Column("error", sa.String()),
+    )
+    op.create_index("ix_scrape_jobs_course_status", "scrape_jobs", ["course", "status", "finished_at"])
+
+
+def downgrade():
+    op.drop_table("scrape_jobs")
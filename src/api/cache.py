@@ -0,0 +1,296 @@
+import abc
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from src.database.events import on_tee_times_changed
+from src.monitoring.metrics import Counter, Gauge
+from src.utils.datetimes import ensure_utc
+from src.utils.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# Tag of entries that may contain any course; invalidated by every change
+ALL_COURSES = "*"
+
+CACHE_REQUESTS = Counter("query_cache_requests_total", "Tee time query cache lookups", labelnames=("endpoint", "result"))
+CACHE_ENTRIES = Gauge("query_cache_entries", "Entries in the in-process tee time query cache")
+CACHE_BYTES = Gauge("query_cache_bytes", "Approximate size of the in-process tee time query cache")
+
+
+class CacheBackend(abc.ABC):
+    """
+    Stores serialized query results, each tagged with the course it covers.
+
+    generation(tag) changes whenever entries with that tag are invalidated.
+    A result computed after reading it is only stored if it is unchanged, so
+    a query that raced a save cannot put its stale result back.
+    """
+
+    @abc.abstractmethod
+    def generation(self, tag: str) -> Hashable:
+        pass
+
+    @abc.abstractmethod
+    def get(self, key: str, tag: str, generation: Optional[Hashable] = None) -> Optional[str]:
+        pass
+
+    @abc.abstractmethod
+    def set(self, key: str, tag: str, value: str, ttl_seconds: float, generation: Optional[Hashable] = None):
+        pass
+
+    @abc.abstractmethod
+    def invalidate(self, tags: Optional[List[str]]):
+        """Drop entries with any of `tags` (and ALL_COURSES entries), or everything for None."""
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """LRU cache bounded by entry count and approximate bytes, with per-entry TTLs."""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._generation = 0
+        self._tag_generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def generation(self, tag: str) -> Hashable:
+        with self._lock:
+            return self._generation, self._tag_generations.get(tag, 0)
+
+    def get(self, key: str, tag: str, generation: Optional[Hashable] = None) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, _, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, tag: str, value: str, ttl_seconds: float, generation: Optional[Hashable] = None):
+        size = len(key) + len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != (self._generation, self._tag_generations.get(tag, 0)):
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, tag, time.monotonic() + ttl_seconds)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+            self._update_gauges()
+
+    def invalidate(self, tags: Optional[List[str]]):
+        with self._lock:
+            if tags is None:
+                self._generation += 1
+                stale = list(self._entries)
+            else:
+                tags = set(tags) | {ALL_COURSES}
+                for tag in tags:
+                    self._tag_generations[tag] = self._tag_generations.get(tag, 0) + 1
+                stale = [key for key, (_, tag, _) in self._entries.items() if tag in tags]
+            for key in stale:
+                self._remove(key)
+            self._update_gauges()
+
+    def _remove(self, key: str):
+        value, _, _ = self._entries.pop(key)
+        self._bytes -= len(key) + len(value)
+
+    def _update_gauges(self):
+        CACHE_ENTRIES.set(len(self._entries))
+        CACHE_BYTES.set(self._bytes)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Shares the cache between workers through Redis (or any server speaking its
+    protocol). Invalidation bumps a generation counter per course instead of
+    deleting keys, so it is O(1); orphaned entries age out with their TTL.
+    Size the server with maxmemory and an allkeys-lru policy.
+    """
+
+    def __init__(self, url: Optional[str] = None, client=None, prefix: str = "teetimes"):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("QUERY_CACHE_BACKEND=redis needs the redis package (pip install redis)")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def _generation_keys(self, tag: str) -> List[str]:
+        return [f"{self.prefix}:generation", f"{self.prefix}:generation:{tag}"]
+
+    def generation(self, tag: str) -> Hashable:
+        generation, tag_generation = self.client.mget(self._generation_keys(tag))
+        return int(generation or 0), int(tag_generation or 0)
+
+    def _key(self, key: str, tag: str, generation: Optional[Hashable]) -> str:
+        # Keys carry the generation read before computing, so a stale result lands under a key nobody reads
+        generation, tag_generation = generation if generation is not None else self.generation(tag)
+        return f"{self.prefix}:{generation}:{tag}:{tag_generation}:{key}"
+
+    def get(self, key: str, tag: str, generation: Optional[Hashable] = None) -> Optional[str]:
+        value = self.client.get(self._key(key, tag, generation))
+        return value.decode() if isinstance(value, bytes) else value
+
+    def set(self, key: str, tag: str, value: str, ttl_seconds: float, generation: Optional[Hashable] = None):
+        self.client.set(self._key(key, tag, generation), value, px=max(int(ttl_seconds * 1000), 1))
+
+    def invalidate(self, tags: Optional[List[str]]):
+        pipeline = self.client.pipeline()
+        if tags is None:
+            pipeline.incr(f"{self.prefix}:generation")
+        else:
+            for tag in set(tags) | {ALL_COURSES}:
+                pipeline.incr(f"{self.prefix}:generation:{tag}")
+        pipeline.execute()
+
+
+class QueryCache:
+    """
+    Caches tee time list responses keyed on their normalized query parameters.
+
+    Entries live for at most `ttl_seconds` and never past the first upcoming
+    tee time they contain, since that slot stops being bookable then. Saved
+    scrapes invalidate the entries of their courses through the tee time
+    change events, which only reach this process: with several workers
+    (WEB_CONCURRENCY above 1) use the redis backend, as the memory one is
+    turned off.
+
+    With the list endpoints reading from a replica (DB_READ_HOST), a query
+    that runs after the invalidation but before the replica has replayed the
+    save still sees the old rows and is cached as fresh, for up to
+    `ttl_seconds`. Keep the TTL short where replica lag matters.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend], ttl_seconds: float = 60):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+
+    @classmethod
+    def from_env(cls) -> "QueryCache":
+        backend_name = os.getenv('QUERY_CACHE_BACKEND', 'memory')
+        if backend_name == 'memory' and int(os.getenv('WEB_CONCURRENCY', 1)) > 1:
+            # Other workers' saves would never invalidate this process's entries
+            logger.warning("QUERY_CACHE_BACKEND=memory is not shared between WEB_CONCURRENCY workers; "
+                           "the query cache is off, use QUERY_CACHE_BACKEND=redis")
+            backend = None
+        elif backend_name == 'memory':
+            backend = MemoryCacheBackend(
+                max_entries=int(os.getenv('QUERY_CACHE_MAX_ENTRIES', 1024)),
+                max_bytes=int(os.getenv('QUERY_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+            )
+        elif backend_name == 'redis':
+            backend = RedisCacheBackend(os.getenv('QUERY_CACHE_REDIS_URL', 'redis://localhost:6379/0'))
+        elif backend_name == 'none':
+            backend = None
+        else:
+            raise ValueError(f"Unknown QUERY_CACHE_BACKEND '{backend_name}'. Use memory, redis or none.")
+        return cls(backend, ttl_seconds=float(os.getenv('QUERY_CACHE_TTL_SECONDS', 60)))
+
+    def get_or_compute(self, endpoint: str, params: Dict, compute: Callable[[], Dict]) -> Dict:
+        if self.backend is None:
+            return compute()
+        key, tag, generation, cached = self._lookup(endpoint, params)
+        if cached is not None:
+            return cached
+        result = compute()
+        self._store(key, tag, generation, result)
+        return result
+
+    async def get_or_compute_async(self, endpoint: str, params: Dict, compute: Callable[[], Awaitable[Dict]]) -> Dict:
+        if self.backend is None:
+            return await compute()
+        key, tag, generation, cached = self._lookup(endpoint, params)
+        if cached is not None:
+            return cached
+        result = await compute()
+        self._store(key, tag, generation, result)
+        return result
+
+    def _lookup(self, endpoint: str, params: Dict) -> Tuple[str, str, Optional[Hashable], Optional[Dict]]:
+        # The generation is read before computing; _store drops the result if a save invalidated it since
+        key, tag = self.key(endpoint, params), params.get('course') or ALL_COURSES
+        try:
+            generation = self.backend.generation(tag)
+            cached = self.backend.get(key, tag, generation)
+        except Exception as e:
+            logger.warning("Error reading query cache: %s", e)
+            generation, cached = None, None
+        CACHE_REQUESTS.inc(endpoint=endpoint, result="hit" if cached is not None else "miss")
+        return key, tag, generation, loads(cached) if cached is not None else None
+
+    def _store(self, key: str, tag: str, generation: Optional[Hashable], result: Dict):
+        ttl_seconds = self._ttl(result)
+        if generation is not None and ttl_seconds > 0:
+            try:
+                self.backend.set(key, tag, dumps(result).decode(), ttl_seconds, generation)
+            except Exception as e:
+                logger.warning("Error writing query cache: %s", e)
+
+    def invalidate(self, course_names: Optional[List[str]] = None):
+        if self.backend is not None:
+            self.backend.invalidate(course_names)
+
+    def stats(self) -> Dict:
+        hits = sum(value for (endpoint, result), value in CACHE_REQUESTS.values().items() if result == "hit")
+        misses = sum(value for (endpoint, result), value in CACHE_REQUESTS.values().items() if result == "miss")
+        return {
+            "backend": type(self.backend).__name__ if self.backend is not None else None,
+            "hits": hits,
+            "misses": misses,
+            "hitRatio": hits / (hits + misses) if hits + misses else None,
+            "entries": CACHE_ENTRIES.value(),
+            "bytes": CACHE_BYTES.value()
+        }
+
+    @staticmethod
+    def key(endpoint: str, params: Dict) -> str:
+        normalized = {name: value.value if isinstance(value, Enum) else value for name, value in params.items()}
+        # Leaving sort_by out means sorting by datetime
+        normalized['sort_by'] = normalized.get('sort_by') or 'datetime'
+        payload = json.dumps([endpoint, normalized], sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    def _ttl(self, result: Dict) -> float:
+        now = datetime.now(timezone.utc)
+        upcoming = [
+            # Fresh results hold datetimes, cached ones ISO strings
+            slot for slot in (ensure_utc(tee_time["datetime"]) for tee_time in result.get("teeTimes", []))
+            if slot > now
+        ]
+        if not upcoming:
+            return self.ttl_seconds
+        return min(self.ttl_seconds, (min(upcoming) - now).total_seconds())
+
+
+_cache: Optional[QueryCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_query_cache() -> QueryCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = QueryCache.from_env()
+            on_tee_times_changed(_cache.invalidate)
+        return _cache
@@ -1,8 +1,8 @@
-from src.database.db_config import get_db
+from src.database.db_config import AsyncSessionLocal, get_db
 
 def get_db_session():
-    db = next(get_db())
-    try:
+    yield from get_db()
+
+async def get_async_db_session():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
@@ -0,0 +1,129 @@
+import csv
+import io
+import os
+from enum import Enum
+from typing import AsyncIterator, List
+
+from sqlalchemy import Row
+
+from src.database.repositories.tee_time_repository import format_tee_time
+from src.utils.serialization import dumps
+
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 5000))
+
+COLUMNS = ("id", "course", "datetime", "timezone", "available_booking_sizes", "price", "currency", "starting_hole")
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+    arrow = "arrow"
+
+
+class NdjsonEncoder:
+    """One JSON object per line, shaped like the list endpoints' teeTimes."""
+    media_type = "application/x-ndjson"
+    extension = "ndjson"
+
+    def header(self) -> bytes:
+        return b""
+
+    def encode(self, rows: List[Row]) -> bytes:
+        return b"".join(dumps(format_tee_time(row)) + b"\n" for row in rows)
+
+    def footer(self) -> bytes:
+        return b""
+
+
+class CsvEncoder:
+    """Same fields as NDJSON; available_booking_sizes is a JSON list such as [2, 3, 4]."""
+    media_type = "text/csv"
+    extension = "csv"
+
+    def _write(self, rows: List) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
+
+    def header(self) -> bytes:
+        return self._write([COLUMNS])
+
+    def encode(self, rows: List[Row]) -> bytes:
+        return self._write([
+            [
+                dumps(value).decode() if column == "available_booking_sizes"
+                else value.isoformat() if column == "datetime" else value
+                for column, value in format_tee_time(row).items()
+            ]
+            for row in rows
+        ])
+
+    def footer(self) -> bytes:
+        return b""
+
+
+class ArrowEncoder:
+    """
+    An Arrow IPC stream with one record batch per database batch. datetime is
+    a UTC timestamp; the timezone column says where the course is.
+    """
+    media_type = "application/vnd.apache.arrow.stream"
+    extension = "arrows"
+
+    def __init__(self):
+        try:
+            import pyarrow
+        except ImportError:
+            raise RuntimeError("format=arrow needs the pyarrow package (pip install pyarrow)")
+        self.pa = pyarrow
+        self.schema = pyarrow.schema([
+            ("id", pyarrow.int64()),
+            ("course", pyarrow.string()),
+            ("datetime", pyarrow.timestamp("us", tz="UTC")),
+            ("timezone", pyarrow.string()),
+            ("available_booking_sizes", pyarrow.list_(pyarrow.int32())),
+            ("price", pyarrow.float64()),
+            ("currency", pyarrow.string()),
+            ("starting_hole", pyarrow.int32())
+        ])
+        self._sink = io.BytesIO()
+        self._writer = None
+
+    def _drain(self) -> bytes:
+        data = self._sink.getvalue()
+        self._sink.seek(0)
+        self._sink.truncate()
+        return data
+
+    def header(self) -> bytes:
+        self._writer = self.pa.ipc.new_stream(self._sink, self.schema)
+        return self._drain()
+
+    def encode(self, rows: List[Row]) -> bytes:
+        columns = [[row[index] for row in rows] for index in range(len(COLUMNS))]
+        self._writer.write_batch(self.pa.record_batch(columns, schema=self.schema))
+        return self._drain()
+
+    def footer(self) -> bytes:
+        self._writer.close()
+        return self._drain()
+
+
+ENCODERS = {
+    ExportFormat.ndjson: NdjsonEncoder,
+    ExportFormat.csv: CsvEncoder,
+    ExportFormat.arrow: ArrowEncoder
+}
+
+
+def make_encoder(export_format: ExportFormat):
+    """Raises RuntimeError when the format's optional dependency is missing."""
+    return ENCODERS[export_format]()
+
+
+async def encode_export(batches: AsyncIterator[List[Row]], encoder) -> AsyncIterator[bytes]:
+    # One chunk per database batch keeps memory flat and the response flowing
+    yield encoder.header()
+    async for rows in batches:
+        yield encoder.encode(rows)
+    yield encoder.footer()
@@ -0,0 +1,211 @@
+import asyncio
+import itertools
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import date
+from typing import AsyncIterator, Dict, List, Optional, Set
+
+from src.database.change_relay import PostgresChangeRelay
+from src.database.db_config import get_engine
+from src.database.events import TeeTimeChange, on_tee_time_changes
+from src.monitoring.metrics import Counter, Gauge
+from src.utils.datetimes import to_local
+from src.utils.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+FEED_SUBSCRIBERS = Gauge("change_feed_subscribers", "Open tee time change feed connections")
+FEED_EVENTS = Counter("change_feed_events_total", "Tee time changes queued for feed subscribers")
+FEED_OVERFLOWS = Counter("change_feed_overflows_total", "Feed subscribers disconnected for falling behind")
+
+FEED_HEARTBEAT_SECONDS = float(os.getenv('FEED_HEARTBEAT_SECONDS', 15))
+
+# Changes that take a slot away from everyone, whatever their party size
+GONE = ("sold_out", "expired")
+
+
+@dataclass
+class ChangeFilter:
+    """What a subscriber wants to hear about. Dates are UTC days, as in the list filters."""
+    courses: Optional[Set[str]] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    players: Optional[int] = None
+
+    def matches(self, change: TeeTimeChange) -> bool:
+        if self.courses and change.course not in self.courses:
+            return False
+        day = change.datetime.date()
+        if (self.start_date and day < self.start_date) or (self.end_date and day > self.end_date):
+            return False
+        if self.players is None or change.type in GONE:
+            return True
+        # Also tell a party when a slot it could have booked no longer fits it
+        return self.players in change.available_booking_sizes or self.players in (change.previous_available_booking_sizes or [])
+
+
+@dataclass(eq=False)
+class Subscription:
+    filter: ChangeFilter
+    queue: asyncio.Queue
+
+
+@dataclass
+class FeedEvent:
+    id: int
+    type: str
+    data: Dict = field(default_factory=dict)
+
+
+class ChangeBroker:
+    """
+    Fans tee time changes out to feed subscribers in this process.
+
+    On its own it only hears changes saved by this process. With several
+    workers, set FEED_RELAY=postgres so every change reaches every worker's
+    broker through a PostgresChangeRelay.
+
+    publish() runs on the writer's thread and only schedules the fan-out on
+    the event loop, so the scrape write path never waits on subscribers.
+    Each subscriber has a bounded queue; one that falls `queue_size` events
+    behind is sent an overflow event and disconnected rather than buffered
+    without limit. It should re-read the list endpoints and resubscribe.
+    """
+
+    def __init__(self, max_subscribers: int = 1000, queue_size: int = 1000):
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self._subscriptions: Set[Subscription] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ChangeBroker":
+        return cls(
+            max_subscribers=int(os.getenv('FEED_MAX_SUBSCRIBERS', 1000)),
+            queue_size=int(os.getenv('FEED_QUEUE_SIZE', 1000))
+        )
+
+    def subscribe(self, change_filter: ChangeFilter) -> Subscription:
+        """Call on the event loop. Raises RuntimeError when the feed is full."""
+        with self._lock:
+            if len(self._subscriptions) >= self.max_subscribers:
+                raise RuntimeError("Too many change feed subscribers, try again later")
+            self._loop = asyncio.get_running_loop()
+            subscription = Subscription(change_filter, asyncio.Queue(self.queue_size + 1))
+            self._subscriptions.add(subscription)
+            FEED_SUBSCRIBERS.set(len(self._subscriptions))
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+            FEED_SUBSCRIBERS.set(len(self._subscriptions))
+
+    def publish(self, changes: List[TeeTimeChange]):
+        if not self._subscriptions or self._loop is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._fan_out, changes)
+        except RuntimeError:
+            # The loop has shut down; nobody is listening any more
+            pass
+
+    def _fan_out(self, changes: List[TeeTimeChange]):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        events = [FeedEvent(next(self._ids), change.type, format_change(change)) for change in changes]
+        for subscription in subscriptions:
+            for change, event in zip(changes, events):
+                if not subscription.filter.matches(change):
+                    continue
+                # The queue has one spare slot so the overflow notice always fits
+                if subscription.queue.qsize() >= self.queue_size:
+                    self._overflow(subscription)
+                    break
+                subscription.queue.put_nowait(event)
+                FEED_EVENTS.inc()
+
+    def _overflow(self, subscription: Subscription):
+        self.unsubscribe(subscription)
+        FEED_OVERFLOWS.inc()
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(FeedEvent(next(self._ids), "overflow", {"reason": "Fell too far behind; reload and resubscribe"}))
+
+    def stats(self) -> Dict:
+        return {
+            "subscribers": len(self._subscriptions),
+            "maxSubscribers": self.max_subscribers,
+            "queueSize": self.queue_size,
+            "eventsQueued": FEED_EVENTS.value(),
+            "overflows": FEED_OVERFLOWS.value()
+        }
+
+
+def format_change(change: TeeTimeChange) -> Dict:
+    """A change shaped like a teeTimes entry of the list endpoints, plus what it replaced."""
+    return {
+        "id": change.id,
+        "course": change.course,
+        "datetime": to_local(change.datetime, change.timezone),
+        "timezone": change.timezone,
+        "starting_hole": change.starting_hole,
+        "available_booking_sizes": change.available_booking_sizes,
+        "price": change.price,
+        "previous_available_booking_sizes": change.previous_available_booking_sizes,
+        "previous_price": change.previous_price
+    }
+
+
+async def sse_events(broker: ChangeBroker, subscription: Subscription,
+                     heartbeat_seconds: float = FEED_HEARTBEAT_SECONDS) -> AsyncIterator[str]:
+    """Server-sent events for one subscription until it overflows or the client goes away."""
+    try:
+        # Flushes the headers so clients know the subscription is live
+        yield ": subscribed\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), heartbeat_seconds)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+            yield f"id: {event.id}\nevent: {event.type}\ndata: {dumps(event.data).decode()}\n\n"
+            if event.type == "overflow":
+                return
+    finally:
+        broker.unsubscribe(subscription)
+
+
+_broker: Optional[ChangeBroker] = None
+_relay: Optional[PostgresChangeRelay] = None
+_broker_lock = threading.Lock()
+
+
+def get_change_broker() -> ChangeBroker:
+    global _broker, _relay
+    with _broker_lock:
+        if _broker is None:
+            _broker = ChangeBroker.from_env()
+            relay_name = os.getenv('FEED_RELAY', 'none')
+            if relay_name == 'postgres':
+                # Changes reach this broker (and every other worker's) through Postgres
+                _relay = PostgresChangeRelay.from_env(get_engine, _broker.publish)
+                on_tee_time_changes(_relay.publish)
+            elif relay_name == 'none':
+                if int(os.getenv('WEB_CONCURRENCY', 1)) > 1:
+                    logger.warning("The change feed only carries changes saved by the worker a client is connected to; "
+                                   "set FEED_RELAY=postgres when running several workers")
+                on_tee_time_changes(_broker.publish)
+            else:
+                raise ValueError(f"Unknown FEED_RELAY '{relay_name}'. Use postgres or none.")
+        return _broker
+
+
+def get_change_relay() -> Optional[PostgresChangeRelay]:
+    """The relay feeding the change broker, if FEED_RELAY enables one; call get_change_broker() first."""
+    return _relay
@@ -1,19 +1,89 @@
-from fastapi import FastAPI, BackgroundTasks, Query, Depends
-from fastapi.responses import RedirectResponse
+from fastapi import FastAPI, BackgroundTasks, HTTPException, Query, Depends
+from fastapi.responses import PlainTextResponse, RedirectResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import asyncio
-from typing import List, Optional
-from sqlalchemy.orm import Session
+import logging
+import os
+import sys
+from datetime import date
+from typing import List, Optional, Set
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.scrapers.mayfair_lakes_scraper import MayfairLakesScraper
-from src.scrapers.vancouver_city_scraper import VancouverCityScraper
+from src.scrapers.jobs import ScrapeJobManager
+from src.scrapers.orchestrator import ScrapeOrchestrator
+from src.scrapers.registry import ScraperRegistry
+from src.scrapers.scheduler import ScrapeScheduler
 from src.database.repositories.tee_time_repository import TeeTimeRepository
-from src.database.db_config import get_db
+from src.database.repositories.async_tee_time_repository import AsyncTeeTimeRepository
+from src.database.db_config import SessionLocal, dispose_engines, get_engine, init_engines, pool_stats
+from src.database.leader import AdvisoryLockLeader
+from src.database.scrape_job_store import PostgresScrapeJobStore
+from src.database.expiry_sweeper import ExpirySweeper
+from src.database.rollup_refresher import RollupRefresher
+from src.database.fingerprint_store import get_fingerprint_store
+from src.database.firestore_mirror import get_firestore_mirror
 from src.api.routers import tee_times
-from src.api.dependencies import get_db_session
+from src.api.dependencies import get_async_db_session
+from src.api.cache import get_query_cache
+from src.api.feed import get_change_broker, get_change_relay
+from src.monitoring.http import RequestMetricsMiddleware
+from src.monitoring.logs import configure_logging
+from src.monitoring.metrics import REGISTRY
+from src.monitoring.tracing import span
 
-app = FastAPI()
+configure_logging()
+logger = logging.getLogger(__name__)
+
+FIRESTORE_MIRROR_ENABLED = os.getenv('FIRESTORE_MIRROR_ENABLED', '0') != '0'
+
+def prepare_scrapers():
+    # Imports the scrapers (and Selenium) and starts browsers; the scheduler
+    # runs this off the event loop once this worker wins scrape leadership
+    SCRAPERS.load_all()
+    from src.scrapers.driver_pool import get_driver_pool
+    get_driver_pool().warm()
+
+def shutdown_browsers():
+    # Only a worker that scraped has loaded the driver pool
+    driver_pool = sys.modules.get('src.scrapers.driver_pool')
+    if driver_pool is not None:
+        driver_pool.get_driver_pool().shutdown()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_engines()
+    # Subscribe the read cache, change feed and Firestore mirror to tee time changes before any scrape can save
+    get_query_cache()
+    get_change_broker()
+    change_relay = get_change_relay()
+    if change_relay is not None:
+        change_relay.start()
+    firestore_mirror = get_firestore_mirror() if FIRESTORE_MIRROR_ENABLED else None
+    if firestore_mirror is not None:
+        firestore_mirror.start()
+    if os.getenv('EXPIRY_ENABLED', '1') != '0':
+        expiry_sweeper.start()
+    if os.getenv('SCRAPE_SCHEDULER_ENABLED', '1') != '0':
+        # Only the leader imports scrapers and starts browsers; the others wait to take over
+        scrape_scheduler.start()
+    if os.getenv('ROLLUP_ENABLED', '1') != '0':
+        rollup_refresher.start()
+    yield
+    await rollup_refresher.stop()
+    await scrape_scheduler.stop()
+    await scrape_jobs.stop()
+    await expiry_sweeper.stop()
+    if firestore_mirror is not None:
+        # Writes what the last scrapes and sweeps left pending
+        await firestore_mirror.stop()
+    if change_relay is not None:
+        await asyncio.to_thread(change_relay.stop)
+    scrape_orchestrator.shutdown()
+    shutdown_browsers()
+    await dispose_engines()
+
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -24,68 +94,113 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route request latency for /metrics
+app.add_middleware(RequestMetricsMiddleware)
+
 app.include_router(tee_times.router, prefix="/api/tee-times", tags=["tee_times"])
 
-SCRAPERS = {
-    "mayfair_lakes": MayfairLakesScraper,
-    "vancouver_city": VancouverCityScraper
-}
+# Course keys to scraper classes from config.yml, imported when first scraped
+SCRAPERS = ScraperRegistry.from_config()
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    yield
+scrape_orchestrator = ScrapeOrchestrator.from_env()
+expiry_sweeper = ExpirySweeper.from_env(SessionLocal)
+rollup_refresher = RollupRefresher.from_env(SessionLocal)
 
 @app.get("/", include_in_schema=False)
 async def root():
     return RedirectResponse(url="/docs")
 
 @app.post("/scrape")
-async def scrape_endpoint(background_tasks: BackgroundTasks, course: Optional[str] = Query(None, description="Course to scrape (optional)")):
+async def scrape_endpoint(course: Optional[str] = Query(None, description="Course to scrape (optional)"),
+                          force: bool = Query(False, description="Scrape even if a recent scrape is fresh enough")):
     if course is not None and course not in SCRAPERS:
         return {"error": f"Invalid course. Available courses are: {', '.join(SCRAPERS.keys())}"}
-    background_tasks.add_task(trigger_scrape, course)
+    jobs = []
+    for name in [course] if course else list(SCRAPERS):
+        job, outcome = await scrape_jobs.submit(name, force=force)
+        jobs.append(dict(job.to_dict(), outcome=outcome))
     message = f"Scraping task for {course} has been scheduled" if course else "Scraping task for all courses has been scheduled"
-    return {"message": message}
+    return {"message": message, "jobs": jobs}
 
 @app.get("/available-courses", response_model=List[str])
-async def get_available_courses(db: Session = Depends(get_db_session)):
-    tee_time_repository = TeeTimeRepository(db)
-    return tee_time_repository.get_all_course_names()
+async def get_available_courses(db: AsyncSession = Depends(get_async_db_session)):
+    tee_time_repository = AsyncTeeTimeRepository(db)
+    return await tee_time_repository.get_all_course_names()
+
+@app.get("/db/pool/stats")
+async def get_db_pool_stats():
+    return pool_stats()
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    # Prometheus text format; the JSON /*/stats endpoints summarise the same figures
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/feed/stats")
+async def get_feed_stats():
+    return get_change_broker().stats()
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    return get_query_cache().stats()
 
 @app.post("/update-expired-tee-times")
 async def update_expired_tee_times_endpoint(background_tasks: BackgroundTasks):
     background_tasks.add_task(update_expired_tee_times)
     return {"message": "Task to update expired tee times has been scheduled"}
 
-async def trigger_scrape(course: Optional[str] = None):
-    db = next(get_db())
-    tee_time_repository = TeeTimeRepository(db)
-    
+@app.get("/expiry/stats")
+async def get_expiry_stats():
+    return expiry_sweeper.stats()
+
+@app.get("/rollups/stats")
+async def get_rollup_stats():
+    return rollup_refresher.stats()
+
+@app.get("/firestore/stats")
+async def get_firestore_stats():
+    if not FIRESTORE_MIRROR_ENABLED:
+        return {"enabled": False}
+    return dict(get_firestore_mirror().stats(), enabled=True)
+
+def persist_tee_times(course: str, tee_times: List[dict], scraped_dates: Optional[Set[date]] = None):
+    # Runs on a scraper worker thread, so it gets its own session
+    db = SessionLocal()
+    tee_time_repository = TeeTimeRepository(db, fingerprints=get_fingerprint_store())
     try:
-        if course:
-            scrapers = [SCRAPERS[course]()]
-        else:
-            scrapers = [scraper() for scraper in SCRAPERS.values()]
-
-        for scraper in scrapers:
-            tee_times = await scraper.scrape()
-            print(f"Scraped tee times: {tee_times}")
-            tee_time_repository.save_tee_times(tee_times)
-    except Exception as e:
-        print(f"Error during scraping: {str(e)}")
+        with span("persist", course=course, tee_times=len(tee_times)):
+            tee_time_repository.save_tee_times(tee_times, scraped_dates)
     finally:
         db.close()
 
-async def update_expired_tee_times():
-    db = next(get_db())
-    tee_time_repository = TeeTimeRepository(db)
+# On-demand and scheduled scrapes: one job per course at a time across every worker, reused while fresh
+scrape_jobs = ScrapeJobManager.from_env(scrape_orchestrator, SCRAPERS, persist_tee_times, store=PostgresScrapeJobStore(get_engine))
+
+# Only the worker holding the advisory lock runs scheduled scrapes
+scrape_scheduler = ScrapeScheduler.from_env(
+    scrape_orchestrator, SCRAPERS, persist_tee_times, leader=AdvisoryLockLeader(get_engine, "tee-time-scrape-scheduler"),
+    prepare=prepare_scrapers, jobs=scrape_jobs
+)
+
+@app.get("/scrape/schedule")
+async def get_scrape_schedule():
+    return scrape_scheduler.status()
+
+@app.get("/scrape/{job_id}")
+async def get_scrape_job(job_id: str):
+    job = await scrape_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown scrape job; it may have finished long ago")
+    return job.to_dict()
+
+def update_expired_tee_times():
+    # Sync so BackgroundTasks runs it in the threadpool; errors are also recorded in the sweeper's stats
     try:
-        tee_time_repository.update_expired_tee_times()
-        print("Successfully updated expired tee times")
-    except Exception as e:
-        print(f"Error updating expired tee times: {str(e)}")
-    finally:
-        db.close()
+        rows = expiry_sweeper.run_once()
+        if rows is not None:
+            logger.info("Successfully updated expired tee times")
+    except Exception:
+        logger.warning("On-demand expiry sweep failed", exc_info=True)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,16 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from src.utils.serialization import dumps
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Encodes with src.utils.serialization. Return it from a route instead of
+    a dict: FastAPI runs dicts through jsonable_encoder first, which walks
+    every value of a large page in Python.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,23 +1,32 @@
 from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import date
 from pydantic import BaseModel, constr, validator
 from enum import Enum
 
+from src.api.export import EXPORT_BATCH_SIZE, ExportFormat, encode_export, make_encoder
+from src.api.feed import ChangeFilter, get_change_broker, sse_events
+from src.api.responses import FastJSONResponse
+
 class SortOrder(str, Enum):
     asc = "asc"
     desc = "desc"
 
-class FilterParams(BaseModel):
+class TotalMode(str, Enum):
+    exact = "exact"
+    estimate = "estimate"
+    none = "none"
+
+CURSOR_DESCRIPTION = "Opaque nextCursor/prevCursor from a previous response; pages by keyset instead of page number"
+TOTAL_DESCRIPTION = "How to compute totalItems: exact (default for page), estimate or none (default for cursor)"
+
+class TeeTimeFilters(BaseModel):
     date: Optional[str] = Query(None)
     course: Optional[constr(max_length=100)] = None
     min_price: Optional[float] = Query(None, ge=0)
     max_price: Optional[float] = Query(None, ge=0)
-    page: int = Query(1, ge=1)
-    limit: int = Query(20, ge=1, le=100)
-    sort_by: Optional[str] = Query(None, description="Field to sort by (e.g., 'datetime', 'price')")
-    sort_order: SortOrder = Query(SortOrder.asc, description="Sort order (asc or desc)")
 
     @validator('date')
     def validate_date(cls, v):
@@ -28,8 +37,23 @@ class FilterParams(BaseModel):
         except ValueError:
             raise ValueError('Invalid date format. Use YYYY-MM-DD.')
 
-from src.api.dependencies import get_db_session
-from src.database.repositories.tee_time_repository import TeeTimeRepository
+class FilterParams(TeeTimeFilters):
+    page: int = Query(1, ge=1)
+    limit: int = Query(20, ge=1, le=100)
+    sort_by: Optional[str] = Query(None, description="Field to sort by (e.g., 'datetime', 'price')")
+    sort_order: SortOrder = Query(SortOrder.asc, description="Sort order (asc or desc)")
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION)
+    total: Optional[TotalMode] = Query(None, description=TOTAL_DESCRIPTION)
+
+class ExportParams(TeeTimeFilters):
+    format: ExportFormat = Query(ExportFormat.ndjson, description="ndjson, csv or arrow (Arrow IPC stream)")
+    available_only: bool = Query(False, description="Leave out past and fully booked tee times")
+
+from src.api.cache import get_query_cache
+from src.api.dependencies import get_async_db_session
+from src.database.db_config import AsyncSessionLocal
+from src.database.repositories.async_tee_time_repository import AsyncTeeTimeRepository
+from src.database.repositories.history_repository import AsyncHistoryRepository
 
 router = APIRouter()
 
@@ -39,10 +63,15 @@ async def get_all_tee_times(
     limit: int = Query(20, ge=1, le=100),
     sort_by: Optional[str] = Query(None, description="Field to sort by (e.g., 'datetime', 'price')"),
     sort_order: SortOrder = Query(SortOrder.asc, description="Sort order (asc or desc)"),
-    db: Session = Depends(get_db_session)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    total: Optional[TotalMode] = Query(None, description=TOTAL_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db_session)
 ):
-    tee_time_repository = TeeTimeRepository(db)
-    return tee_time_repository.get_all_tee_times(page, limit, sort_by, sort_order)
+    tee_time_repository = AsyncTeeTimeRepository(db)
+    try:
+        return FastJSONResponse(await tee_time_repository.get_all_tee_times(page, limit, sort_by, sort_order, cursor, total))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/available")
 async def get_all_available_tee_times(
@@ -50,27 +79,106 @@ async def get_all_available_tee_times(
     limit: int = Query(20, ge=1, le=100),
     sort_by: Optional[str] = Query(None, description="Field to sort by (e.g., 'datetime', 'price')"),
     sort_order: SortOrder = Query(SortOrder.asc, description="Sort order (asc or desc)"),
-    db: Session = Depends(get_db_session)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    total: Optional[TotalMode] = Query(None, description=TOTAL_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db_session)
 ):
-    tee_time_repository = TeeTimeRepository(db)
-    return tee_time_repository.get_all_available_tee_times(page, limit, sort_by, sort_order)
+    tee_time_repository = AsyncTeeTimeRepository(db)
+    params = {"page": page, "limit": limit, "sort_by": sort_by, "sort_order": sort_order, "cursor": cursor, "total": total}
+    try:
+        return FastJSONResponse(await get_query_cache().get_or_compute_async(
+            "available",
+            params,
+            lambda: tee_time_repository.get_all_available_tee_times(page, limit, sort_by, sort_order, cursor, total)
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/filtered")
 async def get_filtered_tee_times(
     params: FilterParams = Depends(),
-    db: Session = Depends(get_db_session)
+    db: AsyncSession = Depends(get_async_db_session)
 ):
     if params.min_price is not None and params.max_price is not None and params.min_price > params.max_price:
         raise HTTPException(status_code=400, detail="min_price cannot be greater than max_price")
     
-    tee_time_repository = TeeTimeRepository(db)
-    return tee_time_repository.get_filtered_tee_times(
-        params.date.isoformat() if params.date else None,
-        params.course,
-        params.min_price,
-        params.max_price,
-        params.page,
-        params.limit,
-        params.sort_by,
-        params.sort_order
-    )
\ No newline at end of file
+    tee_time_repository = AsyncTeeTimeRepository(db)
+    try:
+        result = await get_query_cache().get_or_compute_async("filtered", params.dict(), lambda: tee_time_repository.get_filtered_tee_times(
+            params.date.isoformat() if params.date else None,
+            params.course,
+            params.min_price,
+            params.max_price,
+            params.page,
+            params.limit,
+            params.sort_by,
+            params.sort_order,
+            params.cursor,
+            params.total
+        ))
+        return FastJSONResponse(result)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/export")
+async def export_tee_times(params: ExportParams = Depends()):
+    if params.min_price is not None and params.max_price is not None and params.min_price > params.max_price:
+        raise HTTPException(status_code=400, detail="min_price cannot be greater than max_price")
+    try:
+        encoder = make_encoder(params.format)
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    async def batches():
+        # The response outlives request dependencies, so the stream owns its session
+        async with AsyncSessionLocal() as db:
+            async for rows in AsyncTeeTimeRepository(db).stream_tee_times(
+                params.date.isoformat() if params.date else None,
+                params.course,
+                params.min_price,
+                params.max_price,
+                params.available_only,
+                EXPORT_BATCH_SIZE
+            ):
+                yield rows
+
+    return StreamingResponse(
+        encode_export(batches(), encoder),
+        media_type=encoder.media_type,
+        headers={"Content-Disposition": f'attachment; filename="tee-times.{encoder.extension}"'}
+    )
+
+@router.get("/changes")
+async def stream_tee_time_changes(
+    course: Optional[List[str]] = Query(None, description="Only these courses (repeat for several)"),
+    start_date: Optional[date] = Query(None, description="First day (YYYY-MM-DD, UTC) of tee times to hear about"),
+    end_date: Optional[date] = Query(None, description="Last day (YYYY-MM-DD, UTC) of tee times to hear about"),
+    players: Optional[int] = Query(None, ge=1, le=8, description="Only slots that fit (or stopped fitting) this party size")
+):
+    if start_date is not None and end_date is not None and start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date cannot be after end_date")
+    broker = get_change_broker()
+    try:
+        subscription = broker.subscribe(ChangeFilter(set(course) if course else None, start_date, end_date, players))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return StreamingResponse(
+        sse_events(broker, subscription),
+        media_type="text/event-stream",
+        # Stop proxies from buffering events
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/sell-out-curve")
+async def get_sell_out_curve(
+    course: constr(max_length=100) = Query(..., description="Course name"),
+    start_date: date = Query(..., description="First tee day (YYYY-MM-DD, UTC)"),
+    end_date: date = Query(..., description="Last tee day (YYYY-MM-DD, UTC)"),
+    tee_hour_from: Optional[int] = Query(None, ge=0, le=23, description="Only tee times from this UTC hour"),
+    tee_hour_to: Optional[int] = Query(None, ge=0, le=23, description="Only tee times up to this UTC hour"),
+    max_lead_hours: int = Query(336, ge=0, le=8784, description="Furthest point of the curve, in hours before tee off"),
+    db: AsyncSession = Depends(get_async_db_session)
+):
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date cannot be after end_date")
+    return await AsyncHistoryRepository(db).get_sell_out_curve(course, start_date, end_date, tee_hour_from, tee_hour_to, max_lead_hours)
@@ -0,0 +1,157 @@
+import dataclasses
+import logging
+import os
+import re
+import select
+import threading
+from typing import Callable, List, Optional, Union
+
+from sqlalchemy import Engine, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.types import Text
+
+from src.monitoring.metrics import Counter
+from src.utils.datetimes import ensure_utc
+from src.utils.serialization import dumps, loads
+from .events import TeeTimeChange, TeeTimeChangesListener
+
+logger = logging.getLogger(__name__)
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+NOTIFY_PAYLOAD_LIMIT = 7900
+
+RELAY_NOTIFICATIONS = Counter("change_relay_notifications_total", "Tee time change notifications, by direction", labelnames=("direction",))
+RELAY_ERRORS = Counter("change_relay_errors_total", "Failed tee time change notifications, by direction", labelnames=("direction",))
+
+NOTIFY = text("SELECT pg_notify(:channel, payload) FROM unnest(:payloads) AS payload").bindparams(
+    bindparam("payloads", type_=ARRAY(Text))
+)
+
+
+def encode_changes(changes: List[TeeTimeChange], limit: int = NOTIFY_PAYLOAD_LIMIT) -> List[str]:
+    """JSON arrays of changes, each small enough for one NOTIFY."""
+    payloads, chunk, size = [], [], 2
+    for change in changes:
+        encoded = dumps(dataclasses.asdict(change)).decode()
+        if len(encoded) + 2 > limit:
+            logger.warning("Tee time change %d is too large to relay", change.id)
+            continue
+        if chunk and size + len(encoded) + 1 > limit:
+            payloads.append("[" + ",".join(chunk) + "]")
+            chunk, size = [], 2
+        chunk.append(encoded)
+        size += len(encoded) + 1
+    if chunk:
+        payloads.append("[" + ",".join(chunk) + "]")
+    return payloads
+
+
+def decode_changes(payload: str) -> List[TeeTimeChange]:
+    return [TeeTimeChange(**dict(change, datetime=ensure_utc(change["datetime"]))) for change in loads(payload)]
+
+
+class PostgresChangeRelay:
+    """
+    Carries tee time changes between processes through Postgres LISTEN/NOTIFY,
+    so every worker's change feed hears about saves made in any of them (the
+    scheduler leader, on-demand scrapes, expiry sweeps).
+
+    publish() is registered as a change listener and NOTIFYs the changes on
+    the channel, in chunks under Postgres' payload limit. A thread LISTENs on
+    a dedicated connection and hands every notification, including this
+    process's own, to `deliver`. If NOTIFY fails the changes are delivered
+    locally only. Changes sent while the listening connection is down are
+    missed; it reconnects after `retry_seconds`.
+    """
+
+    def __init__(self, engine: Union[Engine, Callable[[], Engine]], deliver: TeeTimeChangesListener,
+                 channel: str = "tee_time_changes", retry_seconds: float = 5):
+        if not re.fullmatch(r"[a-z_][a-z0-9_]*", channel):
+            raise ValueError(f"Invalid change relay channel '{channel}'")
+        # Either an engine or a function returning one, so the engine can be built after import
+        self._engine = engine
+        self.deliver = deliver
+        self.channel = channel
+        self.retry_seconds = retry_seconds
+        self._stopping = threading.Event()
+        self._listening = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls, engine: Union[Engine, Callable[[], Engine]], deliver: TeeTimeChangesListener) -> "PostgresChangeRelay":
+        return cls(engine, deliver, channel=os.getenv('FEED_RELAY_CHANNEL', 'tee_time_changes'))
+
+    def engine(self) -> Engine:
+        return self._engine if isinstance(self._engine, Engine) else self._engine()
+
+    def publish(self, changes: List[TeeTimeChange]):
+        payloads = encode_changes(changes)
+        if not payloads:
+            return
+        try:
+            with self.engine().connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                connection.execute(NOTIFY, {"channel": self.channel, "payloads": payloads})
+            RELAY_NOTIFICATIONS.inc(len(payloads), direction="sent")
+        except Exception as e:
+            RELAY_ERRORS.inc(direction="sent")
+            logger.error("Error relaying %d tee time changes, delivering them locally: %s", len(changes), e)
+            self.deliver(changes)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._listen_forever, name="change-relay", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wait_until_listening(self, timeout: Optional[float] = None) -> bool:
+        return self._listening.wait(timeout)
+
+    def _listen_forever(self):
+        while not self._stopping.is_set():
+            try:
+                self._listen()
+            except Exception as e:
+                RELAY_ERRORS.inc(direction="received")
+                logger.warning("Change relay lost its connection, reconnecting in %ss: %s", self.retry_seconds, e)
+            finally:
+                self._listening.clear()
+            self._stopping.wait(self.retry_seconds)
+
+    def _listen(self):
+        # Detached, so the pool neither counts nor reuses a connection left LISTENing
+        connection = self.engine().raw_connection()
+        connection.detach()
+        try:
+            dbapi_connection = connection.dbapi_connection
+            dbapi_connection.autocommit = True
+            with dbapi_connection.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            self._listening.set()
+            while not self._stopping.is_set():
+                # Wakes at least once a second to notice stop()
+                if not select.select([dbapi_connection], [], [], 1)[0]:
+                    continue
+                dbapi_connection.poll()
+                while dbapi_connection.notifies:
+                    self._receive(dbapi_connection.notifies.pop(0).payload)
+        finally:
+            connection.close()
+
+    def _receive(self, payload: str):
+        try:
+            changes = decode_changes(payload)
+        except Exception as e:
+            RELAY_ERRORS.inc(direction="received")
+            logger.error("Error decoding relayed tee time changes: %s", e)
+            return
+        RELAY_NOTIFICATIONS.inc(direction="received")
+        try:
+            self.deliver(changes)
+        except Exception:
+            logger.exception("Error delivering relayed tee time changes")
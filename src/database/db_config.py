@@ -1,25 +1,168 @@
+import logging
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Callable, Dict, Optional
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from dotenv import load_dotenv
 
+from src.monitoring.metrics import REGISTRY, Counter, Gauge, Histogram
+
 load_dotenv()
 
 DB_USER = os.getenv('DB_USER')
 DB_PASSWORD = os.getenv('DB_PASSWORD')
 DB_HOST = os.getenv('DB_HOST')
 DB_NAME = os.getenv('DB_NAME')
-
-print(f"DB_USER: {DB_USER}")
-print(f"DB_PASSWORD: {'*' * len(DB_PASSWORD) if DB_PASSWORD else 'Not set'}")
-print(f"DB_HOST: {DB_HOST}")
-print(f"DB_NAME: {DB_NAME}")
+# Optional replica for the API's list endpoints; same credentials and database name
+DB_READ_HOST = os.getenv('DB_READ_HOST') or DB_HOST
 
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
+ASYNC_READ_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_READ_HOST}/{DB_NAME}"
+
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv('DB_POOL_TIMEOUT_SECONDS', 30))
+DB_POOL_RECYCLE_SECONDS = int(os.getenv('DB_POOL_RECYCLE_SECONDS', 1800))
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', '1') != '0'
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 30000))
+
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled database connection", labelnames=("pool",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total", "Checkouts that gave up after the pool timeout", labelnames=("pool",)
+)
+POOL_SIZE = Gauge("db_pool_size", "Connections the pool keeps open", labelnames=("pool",))
+POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently in use", labelnames=("pool",))
+POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections open beyond the pool size", labelnames=("pool",))
+
+
+class _TimedCheckoutMixin:
+    # Connections are handed out by _do_get, so timing it covers both queueing
+    # for a free connection and opening an overflow one
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.inc(pool=self._orig_logging_name)
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started, pool=self._orig_logging_name)
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+# SQLAlchemy names pool loggers after the pool class, which puts these under
+# src.*; keep their connection chatter at SQLAlchemy's usual WARNING
+for _pool_class in (InstrumentedQueuePool, InstrumentedAsyncQueuePool):
+    logging.getLogger(f"{_pool_class.__module__}.{_pool_class.__name__}").setLevel(logging.WARNING)
+
+
+def _pool_options(name: str) -> Dict:
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        # Labels this pool's metrics
+        "pool_logging_name": name
+    }
+
+
+def create_db_engine(url: str, name: str = "primary") -> Engine:
+    connect_args = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"} if DB_STATEMENT_TIMEOUT_MS else {}
+    return create_engine(url, poolclass=InstrumentedQueuePool, connect_args=connect_args, **_pool_options(name))
+
+
+def create_async_db_engine(url: str, name: str = "read") -> AsyncEngine:
+    connect_args = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}} if DB_STATEMENT_TIMEOUT_MS else {}
+    return create_async_engine(url, poolclass=InstrumentedAsyncQueuePool, connect_args=connect_args, **_pool_options(name))
+
+
+# Engines are built on first use (or by init_engines() in the API lifespan), so
+# importing this module, e.g. for Base, neither builds pools nor loads asyncpg
+_engines_lock = threading.Lock()
+_engine: Optional[Engine] = None
+_async_engine: Optional[AsyncEngine] = None
+
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def get_engine() -> Engine:
+    global _engine
+    with _engines_lock:
+        if _engine is None:
+            _engine = create_db_engine(DATABASE_URL, "primary")
+        return _engine
+
+
+def get_async_engine() -> AsyncEngine:
+    # The API read path uses asyncpg so queries never block the event loop
+    global _async_engine
+    with _engines_lock:
+        if _async_engine is None:
+            _async_engine = create_async_db_engine(ASYNC_READ_DATABASE_URL, "read")
+        return _async_engine
+
+
+def init_engines():
+    get_engine()
+    get_async_engine()
+
+
+async def dispose_engines():
+    """Close pooled connections on shutdown. The engines stay usable and reconnect if used again."""
+    if _engine is not None:
+        _engine.dispose()
+    if _async_engine is not None:
+        await _async_engine.dispose()
+
+
+class _BindOnFirstUse:
+    """A session factory that binds itself to its engine when it makes its first session."""
+
+    def __init__(self, get_bind: Callable, **kw):
+        super().__init__(**kw)
+        self._get_bind = get_bind
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=self._get_bind())
+        return super().__call__(**local_kw)
+
+
+class LazySessionmaker(_BindOnFirstUse, sessionmaker):
+    pass
+
+
+class LazyAsyncSessionmaker(_BindOnFirstUse, async_sessionmaker):
+    pass
+
+
+SessionLocal = LazySessionmaker(get_engine, autocommit=False, autoflush=False)
+AsyncSessionLocal = LazyAsyncSessionmaker(get_async_engine, autoflush=False, expire_on_commit=False)
+
+
+def __getattr__(name: str):
+    # `from src.database.db_config import engine` still works for scripts
+    if name == "engine":
+        return get_engine()
+    if name == "async_engine":
+        return get_async_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 Base = declarative_base()
 
@@ -28,4 +171,33 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def _collect_pool_gauges():
+    # Only pools this process has built; rendering /metrics never opens one
+    for name, built in (("primary", _engine), ("read", _async_engine)):
+        if built is not None:
+            POOL_SIZE.set(built.pool.size(), pool=name)
+            POOL_CHECKED_OUT.set(built.pool.checkedout(), pool=name)
+            POOL_OVERFLOW.set(built.pool.overflow(), pool=name)
+
+REGISTRY.add_collector(_collect_pool_gauges)
+
+def pool_stats() -> Dict:
+    """Occupancy and checkout waits of each connection pool, for sizing DB_POOL_SIZE and DB_MAX_OVERFLOW."""
+    waits = POOL_CHECKOUT_WAIT.values()
+    stats = {}
+    for name, pool in (("primary", get_engine().pool), ("read", get_async_engine().pool)):
+        cumulative, total, count = waits.get((name,), ([], 0.0, 0))
+        stats[name] = {
+            "size": pool.size(),
+            "checkedOut": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "maxOverflow": DB_MAX_OVERFLOW,
+            "checkouts": count,
+            "averageWaitSeconds": total / count if count else None,
+            # Checkouts that waited longer than 10ms suggest the pool is too small for the worker count
+            "waitsOver10ms": count - cumulative[POOL_CHECKOUT_WAIT.buckets.index(0.01)] if count else 0,
+            "timeouts": POOL_CHECKOUT_TIMEOUTS.value(pool=name)
+        }
+    return stats
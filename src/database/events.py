@@ -0,0 +1,88 @@
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Called with the names of the courses whose tee times changed, or None for every course
+TeeTimesChangedListener = Callable[[Optional[List[str]]], None]
+
+
+@dataclass
+class TeeTimeChange:
+    """
+    One slot changed by a write. type is added, opened (bookable again),
+    sold_out, availability_changed (booking sizes changed), price_changed or
+    expired. previous_* are known for merged slots only.
+    """
+    type: str
+    id: int
+    course_id: int
+    course: str
+    datetime: datetime
+    timezone: str
+    starting_hole: int
+    available_booking_sizes: List[int]
+    price: Optional[float]
+    previous_available_booking_sizes: Optional[List[int]] = None
+    previous_price: Optional[float] = None
+
+
+# Called with the slot level changes of one committed write
+TeeTimeChangesListener = Callable[[List[TeeTimeChange]], None]
+
+_listeners: List[TeeTimesChangedListener] = []
+_change_listeners: List[TeeTimeChangesListener] = []
+_listeners_lock = threading.Lock()
+
+
+def on_tee_times_changed(listener: TeeTimesChangedListener) -> TeeTimesChangedListener:
+    with _listeners_lock:
+        _listeners.append(listener)
+    return listener
+
+
+def on_tee_time_changes(listener: TeeTimeChangesListener) -> TeeTimeChangesListener:
+    with _listeners_lock:
+        _change_listeners.append(listener)
+    return listener
+
+
+def remove_listener(listener):
+    with _listeners_lock:
+        for listeners in (_listeners, _change_listeners):
+            if listener in listeners:
+                listeners.remove(listener)
+
+
+def publish_tee_times_changed(course_names: Optional[Iterable[str]] = None):
+    """
+    Tell listeners (e.g. the API read cache) that tee times were committed.
+    Runs listeners on the caller's thread; a failing listener never fails
+    the write that published the event.
+    """
+    course_names = sorted(course_names) if course_names is not None else None
+    with _listeners_lock:
+        listeners = list(_listeners)
+    for listener in listeners:
+        try:
+            listener(course_names)
+        except Exception:
+            logger.exception("Error in tee time change listener %s", listener.__name__)
+
+
+def publish_tee_time_changes(changes: List[TeeTimeChange]):
+    """
+    Hand the slot changes of a committed write to listeners (e.g. the change
+    feed). Listeners run on the writer's thread, so they must only hand the
+    changes off, never wait on consumers.
+    """
+    with _listeners_lock:
+        listeners = list(_change_listeners)
+    for listener in listeners:
+        try:
+            listener(changes)
+        except Exception:
+            logger.exception("Error in tee time change listener %s", listener.__name__)
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from src.monitoring.metrics import Counter, Histogram
+from .repositories.tee_time_repository import TeeTimeRepository
+
+logger = logging.getLogger(__name__)
+
+EXPIRY_SWEEP_SECONDS = Histogram("expiry_sweep_seconds", "Duration of expired tee time sweeps")
+EXPIRY_ROWS = Counter("expiry_rows_total", "Tee times marked unavailable by the expiry sweep")
+
+
+class ExpirySweeper:
+    """
+    Periodically marks tee times that have started as unavailable.
+
+    Each sweep remembers its cutoff as a high-water mark, and the next one
+    scans slots from `overlap_seconds` before it on. The overlap picks up
+    slots the previous sweep could not see or skipped: rows a save held
+    locked, or re-opened in a transaction that started before the mark.
+    Size it above the longest scrape. save_tee_times also expires the past
+    slots of the courses it saves.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], interval_seconds: float = 120, batch_size: int = 5000,
+                 overlap_seconds: float = 3600):
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.overlap_seconds = overlap_seconds
+        self.high_water_mark: Optional[datetime] = None
+        self._running = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {
+            "runs": 0,
+            "rowsTotal": 0,
+            "lastRunAt": None,
+            "lastDurationSeconds": None,
+            "lastRows": None,
+            "lastError": None
+        }
+
+    @classmethod
+    def from_env(cls, session_factory: Callable[[], Session]) -> "ExpirySweeper":
+        return cls(
+            session_factory,
+            interval_seconds=float(os.getenv('EXPIRY_INTERVAL_SECONDS', 120)),
+            batch_size=int(os.getenv('EXPIRY_BATCH_SIZE', 5000)),
+            overlap_seconds=float(os.getenv('EXPIRY_OVERLAP_SECONDS', 3600))
+        )
+
+    def run_once(self) -> Optional[int]:
+        """Run one sweep; returns the rows updated, or None if a sweep was already running."""
+        if not self._running.acquire(blocking=False):
+            logger.info("Expiry sweep already running, skipping")
+            return None
+        cutoff = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        db = self.session_factory()
+        try:
+            since = self.high_water_mark - timedelta(seconds=self.overlap_seconds) if self.high_water_mark else None
+            rows = TeeTimeRepository(db).update_expired_tee_times(cutoff, since=since, batch_size=self.batch_size)
+            self.high_water_mark = cutoff
+            self._stats.update(lastRows=rows, lastError=None)
+            self._stats["rowsTotal"] += rows
+            EXPIRY_ROWS.inc(rows)
+            return rows
+        except Exception as e:
+            self._stats["lastError"] = str(e)
+            logger.error("Error updating expired tee times: %s", e)
+            raise
+        finally:
+            db.close()
+            duration = time.perf_counter() - started
+            EXPIRY_SWEEP_SECONDS.observe(duration)
+            self._stats["runs"] += 1
+            self._stats.update(lastRunAt=cutoff.isoformat(), lastDurationSeconds=duration)
+            self._running.release()
+
+    async def run_forever(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.run_once)
+            except Exception:
+                # Already recorded; try again next interval
+                pass
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict:
+        return dict(
+            self._stats,
+            intervalSeconds=self.interval_seconds,
+            overlapSeconds=self.overlap_seconds,
+            highWaterMark=self.high_water_mark.isoformat() if self.high_water_mark else None
+        )
@@ -0,0 +1,105 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+FINGERPRINTS_TABLE = """
+CREATE TABLE IF NOT EXISTS tee_sheet_fingerprints (
+    course_name TEXT NOT NULL,
+    day TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    saved_at REAL NOT NULL,
+    PRIMARY KEY (course_name, day)
+)
+"""
+
+
+def fingerprint_tee_sheet(rows: Iterable[Dict]) -> str:
+    """
+    Content hash of one day's tee sheet. Rows are expected to be prepared
+    (UTC datetimes, one row per slot); their order does not matter.
+    """
+    lines = sorted(
+        f"{row['datetime'].isoformat()}|{row['starting_hole']}|{row['price']!r}|{row['currency']}|"
+        f"{','.join(str(size) for size in row['available_booking_sizes'])}"
+        for row in rows
+    )
+    return hashlib.blake2b("\n".join(lines).encode(), digest_size=16).hexdigest()
+
+
+class FingerprintStore:
+    """
+    The last persisted fingerprint of each (course, day) tee sheet, kept in a
+    small SQLite file so unchanged days are still skipped after a restart.
+
+    Fingerprints older than `max_age_seconds` are ignored, so every day is
+    rewritten now and then even if the database was changed behind our back.
+    """
+
+    def __init__(self, path: str, max_age_seconds: float = 6 * 60 * 60):
+        self.path = path
+        self.max_age_seconds = max_age_seconds
+        # Scrapes persist from worker threads; one connection behind a lock is plenty
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(FINGERPRINTS_TABLE)
+
+    @classmethod
+    def from_env(cls) -> "FingerprintStore":
+        return cls(
+            path=os.getenv('TEE_SHEET_FINGERPRINT_PATH', 'tee_sheet_fingerprints.sqlite3'),
+            max_age_seconds=float(os.getenv('TEE_SHEET_FINGERPRINT_MAX_AGE_SECONDS', 6 * 60 * 60))
+        )
+
+    def get(self, course_name: str, days: Iterable[date]) -> Dict[date, str]:
+        days = list(days)
+        if not days:
+            return {}
+        placeholders = ",".join("?" for _ in days)
+        with self._lock:
+            result = self._connection.execute(
+                f"SELECT day, fingerprint FROM tee_sheet_fingerprints "
+                f"WHERE course_name = ? AND saved_at >= ? AND day IN ({placeholders})",
+                [course_name, time.time() - self.max_age_seconds, *[day.isoformat() for day in days]]
+            ).fetchall()
+        return {date.fromisoformat(day): fingerprint for day, fingerprint in result}
+
+    def put(self, fingerprints: List[Tuple[str, date, str]]):
+        """Record (course_name, day, fingerprint) entries after a successful save."""
+        saved_at = time.time()
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO tee_sheet_fingerprints (course_name, day, fingerprint, saved_at) VALUES (?, ?, ?, ?)",
+                [(course_name, day.isoformat(), fingerprint, saved_at) for course_name, day, fingerprint in fingerprints]
+            )
+            # Days in the past will never be scraped again
+            self._connection.execute(
+                "DELETE FROM tee_sheet_fingerprints WHERE day < ?", [(date.today() - timedelta(days=1)).isoformat()]
+            )
+
+    def clear(self, course_name: Optional[str] = None):
+        with self._lock, self._connection:
+            if course_name is None:
+                self._connection.execute("DELETE FROM tee_sheet_fingerprints")
+            else:
+                self._connection.execute("DELETE FROM tee_sheet_fingerprints WHERE course_name = ?", [course_name])
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+_store: Optional[FingerprintStore] = None
+_store_lock = threading.Lock()
+
+
+def get_fingerprint_store() -> FingerprintStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = FingerprintStore.from_env()
+        return _store
@@ -0,0 +1,265 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.monitoring.metrics import Counter, Gauge, Histogram
+from .events import TeeTimeChange, on_tee_time_changes
+
+logger = logging.getLogger(__name__)
+
+# Firestore rejects batched writes of more operations than this
+FIRESTORE_BATCH_LIMIT = 500
+
+MIRROR_WRITES = Counter("firestore_mirror_writes_total", "Tee time documents written to Firestore", labelnames=("operation",))
+MIRROR_COALESCED = Counter("firestore_mirror_coalesced_total", "Tee time changes replaced by a later change of the same slot before a flush")
+MIRROR_UNCHANGED = Counter("firestore_mirror_unchanged_total", "Tee time documents skipped because Firestore already has them")
+MIRROR_RETRIES = Counter("firestore_mirror_retries_total", "Retried Firestore batch commits")
+MIRROR_FAILED_BATCHES = Counter("firestore_mirror_failed_batches_total", "Firestore batches that failed every attempt")
+MIRROR_DROPPED = Counter("firestore_mirror_dropped_total", "Tee time changes dropped because too many slots were waiting for a flush")
+MIRROR_PENDING = Gauge("firestore_mirror_pending", "Tee time documents waiting for the next Firestore flush")
+MIRROR_FLUSH_SECONDS = Histogram("firestore_mirror_flush_seconds", "Duration of Firestore mirror flushes")
+
+# (tee time id, document or None to delete it, the change it came from)
+Operation = Tuple[int, Optional[Dict], TeeTimeChange]
+
+
+def to_document(change: TeeTimeChange) -> Optional[Dict]:
+    """A slot's Firestore document, shaped like a teeTimes entry; None once it has expired."""
+    if change.type == "expired":
+        return None
+    return {
+        "course": change.course,
+        "datetime": change.datetime,
+        "timezone": change.timezone,
+        "starting_hole": change.starting_hole,
+        "available_booking_sizes": list(change.available_booking_sizes),
+        "price": change.price
+    }
+
+
+class FirestoreMirror:
+    """
+    Mirrors committed tee time changes into a Firestore collection, one
+    document per slot keyed by its tee time id.
+
+    publish() runs on the writer's thread after the Postgres commit and only
+    records the change, so saving never waits on Firestore. Each flush writes
+    the latest change of every slot since the previous flush, skipping
+    documents identical to the last ones written, in batches of up to
+    `batch_size` operations, `max_concurrency` batches at a time. A failed
+    batch is retried with jittered backoff up to `max_attempts` times, then
+    put back for the next flush unless a newer change of its slot arrived.
+
+    Memory stays bounded while Firestore is down: past `max_pending` waiting
+    slots the oldest changes are dropped (counted in `dropped`), and only the
+    `max_written` most recently written documents are remembered for skipping
+    unchanged writes.
+    """
+
+    def __init__(self, client_factory: Callable[[], Any], collection: str = "tee_times", flush_interval_seconds: float = 2,
+                 batch_size: int = FIRESTORE_BATCH_LIMIT, max_concurrency: int = 4, max_attempts: int = 5,
+                 retry_base_seconds: float = 0.5, max_pending: int = 100_000, max_written: int = 100_000):
+        if not 0 < batch_size <= FIRESTORE_BATCH_LIMIT:
+            raise ValueError(f"batch_size must be between 1 and {FIRESTORE_BATCH_LIMIT}")
+        self.client_factory = client_factory
+        self.collection = collection
+        self.flush_interval_seconds = flush_interval_seconds
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.max_pending = max_pending
+        self.max_written = max_written
+        self._client = None
+        self._pending: Dict[int, TeeTimeChange] = {}
+        # The last document written for each slot still in Firestore, least recently written first
+        self._written: "OrderedDict[int, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flushing = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="firestore-mirror")
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {
+            "flushes": 0,
+            "documentsWritten": 0,
+            "lastFlushAt": None,
+            "lastDurationSeconds": None,
+            "lastError": None
+        }
+
+    @classmethod
+    def from_env(cls, client_factory: Callable[[], Any]) -> "FirestoreMirror":
+        return cls(
+            client_factory,
+            collection=os.getenv('FIRESTORE_COLLECTION', 'tee_times'),
+            flush_interval_seconds=float(os.getenv('FIRESTORE_FLUSH_INTERVAL_SECONDS', 2)),
+            batch_size=int(os.getenv('FIRESTORE_BATCH_SIZE', FIRESTORE_BATCH_LIMIT)),
+            max_concurrency=int(os.getenv('FIRESTORE_MAX_CONCURRENCY', 4)),
+            max_attempts=int(os.getenv('FIRESTORE_MAX_ATTEMPTS', 5)),
+            max_pending=int(os.getenv('FIRESTORE_MAX_PENDING', 100_000)),
+            max_written=int(os.getenv('FIRESTORE_MAX_WRITTEN', 100_000))
+        )
+
+    def publish(self, changes: List[TeeTimeChange]):
+        with self._lock:
+            coalesced = sum(1 for change in changes if change.id in self._pending)
+            for change in changes:
+                # Re-inserted so the pending changes stay oldest first
+                self._pending.pop(change.id, None)
+                self._pending[change.id] = change
+            self._trim_pending()
+        if coalesced:
+            MIRROR_COALESCED.inc(coalesced)
+
+    def flush(self) -> int:
+        """Write everything pending; returns the documents written. Blocks, so call it off the event loop."""
+        with self._flushing:
+            started_at = datetime.now(timezone.utc)
+            started = time.perf_counter()
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            operations, unchanged = [], 0
+            for tee_time_id, change in pending.items():
+                document = to_document(change)
+                if document is not None and self._written.get(tee_time_id) == document:
+                    unchanged += 1
+                    continue
+                operations.append((tee_time_id, document, change))
+            if unchanged:
+                MIRROR_UNCHANGED.inc(unchanged)
+
+            written, error = 0, None
+            try:
+                if operations:
+                    if self._client is None:
+                        self._client = self.client_factory()
+                    batches = [operations[i:i + self.batch_size] for i in range(0, len(operations), self.batch_size)]
+                    for batch, batch_error in zip(batches, self._executor.map(self._commit, batches)):
+                        if batch_error is None:
+                            written += self._record_written(batch)
+                        else:
+                            error = batch_error
+                            self._requeue(batch)
+            except Exception as e:
+                # e.g. no credentials; keep the changes for the next flush
+                error = str(e)
+                self._requeue(operations)
+                logger.error("Error flushing the Firestore mirror: %s", e)
+            finally:
+                duration = time.perf_counter() - started
+                MIRROR_FLUSH_SECONDS.observe(duration)
+                self._stats["flushes"] += 1
+                self._stats["documentsWritten"] += written
+                self._stats.update(lastFlushAt=started_at.isoformat(), lastDurationSeconds=duration, lastError=error)
+            return written
+
+    def _commit(self, operations: List[Operation]) -> Optional[str]:
+        """Commit one batch, retrying; returns the last error if every attempt failed."""
+        collection = self._client.collection(self.collection)
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                batch = self._client.batch()
+                for tee_time_id, document, _ in operations:
+                    reference = collection.document(str(tee_time_id))
+                    if document is None:
+                        batch.delete(reference)
+                    else:
+                        batch.set(reference, document)
+                batch.commit()
+                return None
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    MIRROR_FAILED_BATCHES.inc()
+                    logger.error("Firestore batch of %d writes failed %d times: %s", len(operations), attempt, e)
+                    return str(e) or type(e).__name__
+                MIRROR_RETRIES.inc()
+                time.sleep(self.retry_base_seconds * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+
+    def _record_written(self, operations: List[Operation]) -> int:
+        for tee_time_id, document, _ in operations:
+            if document is None:
+                self._written.pop(tee_time_id, None)
+            else:
+                self._written[tee_time_id] = document
+                self._written.move_to_end(tee_time_id)
+        # Forgetting a document only costs rewriting it if it comes back unchanged
+        while len(self._written) > self.max_written:
+            self._written.popitem(last=False)
+        MIRROR_WRITES.inc(sum(1 for _, document, _ in operations if document is not None), operation="set")
+        MIRROR_WRITES.inc(sum(1 for _, document, _ in operations if document is None), operation="delete")
+        return len(operations)
+
+    def _requeue(self, operations: List[Operation]):
+        with self._lock:
+            # A change that arrived since the flush started is newer; the failed ones go in front of those
+            failed = {tee_time_id: change for tee_time_id, _, change in operations if tee_time_id not in self._pending}
+            self._pending = {**failed, **self._pending}
+            self._trim_pending()
+
+    def _trim_pending(self):
+        """Drop the oldest pending changes past `max_pending`; call with the lock held."""
+        excess = len(self._pending) - self.max_pending
+        if excess > 0:
+            for tee_time_id in list(self._pending)[:excess]:
+                del self._pending[tee_time_id]
+            MIRROR_DROPPED.inc(excess)
+            logger.warning("Firestore mirror has more than %d pending changes, dropped the %d oldest", self.max_pending, excess)
+        MIRROR_PENDING.set(len(self._pending))
+
+    async def run_forever(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            await loop.run_in_executor(None, self.flush)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run_forever())
+
+    async def stop(self):
+        """Stop flushing on a timer, then write what is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.get_running_loop().run_in_executor(None, self.flush)
+
+    def stats(self) -> Dict:
+        return dict(
+            self._stats,
+            pending=len(self._pending),
+            collection=self.collection,
+            coalesced=MIRROR_COALESCED.value(),
+            unchanged=MIRROR_UNCHANGED.value(),
+            retries=MIRROR_RETRIES.value(),
+            failedBatches=MIRROR_FAILED_BATCHES.value(),
+            dropped=MIRROR_DROPPED.value()
+        )
+
+
+def _firestore_client():
+    # Imported here so firebase-admin is only needed when the mirror is on
+    from .firestore_service import FirestoreService
+    return FirestoreService().get_db()
+
+
+_mirror: Optional[FirestoreMirror] = None
+_mirror_lock = threading.Lock()
+
+
+def get_firestore_mirror() -> FirestoreMirror:
+    global _mirror
+    with _mirror_lock:
+        if _mirror is None:
+            _mirror = FirestoreMirror.from_env(_firestore_client)
+            on_tee_time_changes(_mirror.publish)
+        return _mirror
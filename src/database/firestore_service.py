@@ -1,23 +1,38 @@
 import firebase_admin
 from firebase_admin import credentials, firestore
+import logging
 import os
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
 class FirestoreService:
     _instance = None
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(FirestoreService, cls).__new__(cls)
-            cls._instance._initialize()
+            # Only keep an instance that initialized, so a failure is retried on the next call
+            instance = super(FirestoreService, cls).__new__(cls)
+            instance._initialize()
+            cls._instance = instance
         return cls._instance
 
     def _initialize(self):
         load_dotenv()
+        if os.getenv('FIRESTORE_EMULATOR_HOST'):
+            # The emulator needs no credentials and accepts any project ID
+            project = os.getenv('FIRESTORE_PROJECT_ID', 'demo-tee-times')
+            logger.info("Using the Firestore emulator at %s, project %s", os.getenv('FIRESTORE_EMULATOR_HOST'), project)
+            self.db = firestore.Client(project=project)
+            return
         cred_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
-        print(f"Attempting to load credentials from: {os.path.abspath(cred_path)}")
+        logger.info("Attempting to load credentials from: %s", os.path.abspath(cred_path))
         cred = credentials.Certificate(cred_path)
-        firebase_admin.initialize_app(cred)
+        try:
+            # Left over from an earlier attempt that failed after initializing the app
+            firebase_admin.get_app()
+        except ValueError:
+            firebase_admin.initialize_app(cred)
         self.db = firestore.client()
 
     def get_db(self):
@@ -0,0 +1,75 @@
+import logging
+import threading
+import zlib
+from typing import Callable, Union
+
+from sqlalchemy import Engine, text
+
+logger = logging.getLogger(__name__)
+
+
+class AdvisoryLockLeader:
+    """
+    Leader election between processes through a Postgres session advisory lock.
+
+    The lock belongs to one dedicated connection, so it is released by
+    Postgres if this process dies or the connection drops. is_leader()
+    re-checks that connection, so a lost connection means lost leadership.
+    """
+
+    def __init__(self, engine: Union[Engine, Callable[[], Engine]], name: str):
+        # Either an engine or a function returning one, so the engine can be built after import
+        self._engine = engine
+        self.name = name
+        # Advisory locks take a bigint key; derive a stable one from the name
+        self.key = zlib.crc32(name.encode())
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self._connection is not None:
+                return self._check()
+            connection = self.engine().connect().execution_options(isolation_level="AUTOCOMMIT")
+            try:
+                acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}).scalar()
+            except Exception:
+                connection.close()
+                raise
+            if not acquired:
+                connection.close()
+                return False
+            self._connection = connection
+            logger.info("Acquired leadership of '%s'", self.name)
+            return True
+
+    def engine(self) -> Engine:
+        return self._engine if isinstance(self._engine, Engine) else self._engine()
+
+    def is_leader(self) -> bool:
+        with self._lock:
+            return self._connection is not None and self._check()
+
+    def release(self):
+        with self._lock:
+            if self._connection is None:
+                return
+            try:
+                self._connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+            except Exception as e:
+                logger.warning("Error releasing leadership of '%s': %s", self.name, e)
+            finally:
+                self._connection.close()
+                self._connection = None
+
+    def _check(self) -> bool:
+        try:
+            self._connection.execute(text("SELECT 1"))
+            return True
+        except Exception as e:
+            logger.warning("Lost leadership of '%s': %s", self.name, e)
+            try:
+                self._connection.close()
+            finally:
+                self._connection = None
+            return False
@@ -1,2 +1,4 @@
 from .tee_time import Course, TeeTime, Player
+from .tee_time_history import TeeTimeRollup, TeeTimeSnapshot
+from .scrape_job import ScrapeJobRecord
 # Import any future models here
\ No newline at end of file
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Float, Index, Integer, String
+from ..db_config import Base
+from .tee_time import TZDateTime
+
+class ScrapeJobRecord(Base):
+    """An on-demand or scheduled scrape of one course, readable by every worker."""
+    __tablename__ = "scrape_jobs"
+    __table_args__ = (
+        # The running job and last success of a course
+        Index("ix_scrape_jobs_course_status", "course", "status", "finished_at"),
+    )
+
+    id = Column(String(32), primary_key=True)
+    course = Column(String, nullable=False)
+    status = Column(String(16), nullable=False)
+    created_at = Column(TZDateTime, nullable=False)
+    finished_at = Column(TZDateTime)
+    tee_times_found = Column(Integer)
+    duration_seconds = Column(Float)
+    error = Column(String)
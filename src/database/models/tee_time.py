@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, ARRAY
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, ARRAY, Boolean, Computed, Index, UniqueConstraint, text
 from sqlalchemy.orm import relationship
 from ..db_config import Base
 import enum
@@ -10,10 +10,11 @@ class TZDateTime(TypeDecorator):
     cache_ok = True
 
     def process_bind_param(self, value, dialect):
+        # Stored as naive UTC; asyncpg refuses aware datetimes for timestamp columns
         if value is not None:
             if value.tzinfo is None:
-                return value.replace(tzinfo=timezone.utc)
-            return value.astimezone(timezone.utc)
+                return value
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
         return value
 
     def process_result_value(self, value, dialect):
@@ -45,6 +46,13 @@ class Course(Base):
 
 class TeeTime(Base):
     __tablename__ = "tee_times"
+    __table_args__ = (
+        # Natural key of a slot; the bulk upsert in save_tee_times conflicts on it
+        UniqueConstraint("course_id", "datetime", "starting_hole", name="uq_tee_times_course_datetime_hole"),
+        # The list endpoints only read available slots; expired slots fall out of these indexes
+        Index("ix_tee_times_available_datetime", "datetime", postgresql_where=text("is_available")),
+        Index("ix_tee_times_available_course_datetime", "course_id", "datetime", postgresql_where=text("is_available")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     course_id = Column(Integer, ForeignKey("courses.id"))
@@ -53,6 +61,8 @@ class TeeTime(Base):
     currency = Column(String)
     available_booking_sizes = Column(ARRAY(Integer)) 
     starting_hole = Column(Integer)
+    # Maintained by Postgres so availability filters can use the partial indexes
+    is_available = Column(Boolean, Computed("coalesce(cardinality(available_booking_sizes), 0) > 0", persisted=True))
 
     course = relationship("Course", back_populates="tee_times")
     players = relationship("Player", back_populates="tee_time")
@@ -0,0 +1,47 @@
+from sqlalchemy import ARRAY, BigInteger, Column, Date, Float, ForeignKey, Index, Integer, SmallInteger, String
+from ..db_config import Base
+from .tee_time import TZDateTime
+
+class TeeTimeSnapshot(Base):
+    """Append-only record of every change a write made to a tee time, as published to the change feed."""
+    __tablename__ = "tee_time_snapshots"
+    __table_args__ = (
+        # Rollups re-aggregate whole course days
+        Index("ix_tee_time_snapshots_course_datetime", "course_id", "tee_datetime"),
+        # Rows arrive in observed_at order, so a tiny BRIN index finds recent ones
+        Index("ix_tee_time_snapshots_observed_at", "observed_at", postgresql_using="brin"),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    tee_time_id = Column(Integer, ForeignKey("tee_times.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Copied from the tee time so history queries never join the live table
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
+    tee_datetime = Column(TZDateTime, nullable=False)
+    observed_at = Column(TZDateTime, nullable=False)
+    change_type = Column(String(24), nullable=False)
+    price = Column(Float)
+    available_booking_sizes = Column(ARRAY(Integer))
+
+class TeeTimeRollup(Base):
+    """
+    Snapshot counts per course, tee day (UTC), tee hour and whole hours
+    before the tee time the change was seen. Rebuilt per course day by
+    HistoryRepository.refresh_rollups.
+    """
+    __tablename__ = "tee_time_rollups"
+
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True)
+    tee_date = Column(Date, primary_key=True)
+    tee_hour = Column(SmallInteger, primary_key=True)
+    lead_hours = Column(Integer, primary_key=True)
+    added = Column(Integer, nullable=False, default=0)
+    opened = Column(Integer, nullable=False, default=0)
+    sold_out = Column(Integer, nullable=False, default=0)
+    expired = Column(Integer, nullable=False, default=0)
+    availability_changed = Column(Integer, nullable=False, default=0)
+    price_changed = Column(Integer, nullable=False, default=0)
+    price_sum = Column(Float, nullable=False, default=0)
+    price_count = Column(Integer, nullable=False, default=0)
+    min_price = Column(Float)
+    max_price = Column(Float)
+    refreshed_at = Column(TZDateTime, nullable=False)
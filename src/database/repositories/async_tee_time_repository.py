@@ -0,0 +1,55 @@
+from typing import AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import Row, Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.tee_time import Course, TeeTime
+from .tee_time_repository import TeeTimeListQueries, select_tee_times
+
+
+class AsyncTeeTimeRepository(TeeTimeListQueries):
+    """
+    The tee time read queries on an AsyncSession, for the API's async routes.
+    Builds exactly the same statements and responses as TeeTimeRepository.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_all_tee_times(self, page: int, limit: int, sort_by: Optional[str], sort_order: str,
+                                cursor: Optional[str] = None, total: Optional[str] = None) -> Dict:
+        query = select_tee_times()
+        return await self._paginate_query(query, page, limit, sort_by, sort_order, cursor, total)
+
+    async def get_all_available_tee_times(self, page: int, limit: int, sort_by: Optional[str], sort_order: str,
+                                          cursor: Optional[str] = None, total: Optional[str] = None) -> Dict:
+        query = select_tee_times().where(TeeTime.is_available)
+        return await self._paginate_query(query, page, limit, sort_by, sort_order, cursor, total)
+
+    async def get_filtered_tee_times(self, date: Optional[str], course: Optional[str], min_price: Optional[float], max_price: Optional[float], page: int, limit: int, sort_by: Optional[str], sort_order: str,
+                                     cursor: Optional[str] = None, total: Optional[str] = None) -> Dict:
+        query = self._filtered_query(date, course, min_price, max_price)
+        return await self._paginate_query(query, page, limit, sort_by, sort_order, cursor, total)
+
+    async def stream_tee_times(self, date: Optional[str], course: Optional[str], min_price: Optional[float], max_price: Optional[float],
+                               available_only: bool = False, batch_size: int = 5000) -> AsyncIterator[List[Row]]:
+        """
+        Every matching tee time in id order, in batches of `batch_size` rows
+        read from a server-side cursor, so memory stays flat however many
+        rows match. Unlike the list endpoints it includes past and sold out
+        slots unless `available_only`, and never counts.
+        """
+        query = self._filtered_query(date, course, min_price, max_price, available_only).order_by(TeeTime.id)
+        result = await self.db.stream(query.execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            yield rows
+
+    async def get_all_course_names(self) -> List[str]:
+        return list((await self.db.execute(select(Course.name).distinct())).scalars())
+
+    async def _paginate_query(self, query: Select, page: int, limit: int, sort_by: Optional[str], sort_order: str,
+                              cursor: Optional[str] = None, total: Optional[str] = None) -> Dict:
+        plan = self._plan_page(query, page, limit, sort_by, sort_order, cursor, total)
+        count_result = (await self.db.execute(plan.count_statement)).scalar() if plan.count_statement is not None else None
+        rows = (await self.db.execute(plan.statement)).all()
+        return self._page_result(plan, rows, count_result)
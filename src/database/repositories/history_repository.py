@@ -0,0 +1,164 @@
+import zlib
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import Date, Integer, Row, Select, SmallInteger, cast, delete, func, insert, literal, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..events import TeeTimeChange
+from ..models.tee_time import Course
+from ..models.tee_time_history import TeeTimeRollup, TeeTimeSnapshot
+
+# Refreshes from several workers take turns through this transaction-scoped advisory lock
+ROLLUP_LOCK_KEY = zlib.crc32(b"tee-time-rollups")
+
+
+class HistoryQueries:
+    """Builds the history read statements and shapes their results without touching a session."""
+
+    def _sell_out_curve_statement(self, course: str, start_date: date, end_date: date,
+                                  tee_hour_from: Optional[int] = None, tee_hour_to: Optional[int] = None) -> Select:
+        rollups = TeeTimeRollup.__table__.c
+        query = (
+            select(
+                rollups.lead_hours,
+                func.sum(rollups.added).label("added"),
+                func.sum(rollups.opened).label("opened"),
+                func.sum(rollups.sold_out).label("sold_out"),
+                func.sum(rollups.price_sum).label("price_sum"),
+                func.sum(rollups.price_count).label("price_count")
+            )
+            .join(Course, Course.id == rollups.course_id)
+            .where(Course.name == course, rollups.tee_date >= start_date, rollups.tee_date <= end_date)
+            .group_by(rollups.lead_hours)
+            .order_by(rollups.lead_hours.desc())
+        )
+        if tee_hour_from is not None:
+            query = query.where(rollups.tee_hour >= tee_hour_from)
+        if tee_hour_to is not None:
+            query = query.where(rollups.tee_hour <= tee_hour_to)
+        return query
+
+    def _sell_out_curve(self, rows: List[Row], course: str, start_date: date, end_date: date, max_lead_hours: int) -> Dict:
+        # Walk from the earliest sighting towards tee off: a slot is available from
+        # when it was added or reopened until it sells out
+        slots = sum(row.added for row in rows)
+        available, points = 0, []
+        for row in rows:
+            available += row.added + row.opened - row.sold_out
+            if 0 <= row.lead_hours <= max_lead_hours:
+                points.append({
+                    "hoursBefore": row.lead_hours,
+                    "available": available,
+                    "availableFraction": available / slots if slots else None,
+                    "soldOut": row.sold_out,
+                    "averagePrice": row.price_sum / row.price_count if row.price_count else None
+                })
+        return {
+            "course": course,
+            "startDate": start_date.isoformat(),
+            "endDate": end_date.isoformat(),
+            "slots": slots,
+            "points": points
+        }
+
+
+class HistoryRepository(HistoryQueries):
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record(self, changes: List[TeeTimeChange], observed_at: datetime):
+        """Append snapshots of `changes` in the caller's transaction."""
+        if not changes:
+            return
+        self.db.execute(insert(TeeTimeSnapshot), [
+            {
+                "tee_time_id": change.id,
+                "course_id": change.course_id,
+                "tee_datetime": change.datetime,
+                "observed_at": observed_at,
+                "change_type": change.type,
+                "price": change.price,
+                "available_booking_sizes": change.available_booking_sizes
+            }
+            for change in changes
+        ])
+
+    def refresh_rollups(self, lag_seconds: float = 300) -> Optional[int]:
+        """
+        Rebuild the rollups of every course day with snapshots observed since
+        the last refresh, less `lag_seconds` so snapshots committed late are
+        not missed. Rebuilding whole days keeps refreshes idempotent. Returns
+        the number of course days rebuilt, or None when another refresh holds
+        the lock.
+        """
+        snapshots = TeeTimeSnapshot.__table__.c
+        rollups = TeeTimeRollup.__table__.c
+        try:
+            if not self.db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": ROLLUP_LOCK_KEY}).scalar():
+                return None
+            refreshed_at = datetime.now(timezone.utc)
+            last_refresh = self.db.execute(select(func.max(rollups.refreshed_at))).scalar()
+
+            tee_date = cast(snapshots.tee_datetime, Date)
+            touched_query = select(snapshots.course_id, tee_date).distinct()
+            if last_refresh is not None:
+                touched_query = touched_query.where(snapshots.observed_at >= last_refresh - timedelta(seconds=lag_seconds))
+            touched = [tuple(row) for row in self.db.execute(touched_query)]
+            if not touched:
+                self.db.commit()
+                return 0
+
+            self.db.execute(delete(TeeTimeRollup).where(tuple_(rollups.course_id, rollups.tee_date).in_(touched)))
+            first_day = datetime.combine(min(day for _, day in touched), time(), timezone.utc)
+            last_day = datetime.combine(max(day for _, day in touched), time(), timezone.utc)
+            lead_hours = cast(func.floor(func.extract("epoch", snapshots.tee_datetime - snapshots.observed_at) / 3600), Integer)
+            tee_hour = cast(func.extract("hour", snapshots.tee_datetime), SmallInteger)
+            counts = {
+                change_type: func.count().filter(snapshots.change_type == change_type)
+                for change_type in ("added", "opened", "sold_out", "expired", "availability_changed", "price_changed")
+            }
+            aggregated = (
+                select(
+                    snapshots.course_id,
+                    tee_date,
+                    tee_hour,
+                    lead_hours,
+                    *counts.values(),
+                    func.coalesce(func.sum(snapshots.price), 0),
+                    func.count(snapshots.price),
+                    func.min(snapshots.price),
+                    func.max(snapshots.price),
+                    literal(refreshed_at, rollups.refreshed_at.type)
+                )
+                .where(
+                    # The range lets the (course_id, tee_datetime) index narrow the scan
+                    snapshots.course_id.in_({course_id for course_id, _ in touched}),
+                    snapshots.tee_datetime >= first_day,
+                    snapshots.tee_datetime < last_day + timedelta(days=1),
+                    tuple_(snapshots.course_id, tee_date).in_(touched)
+                )
+                .group_by(snapshots.course_id, tee_date, tee_hour, lead_hours)
+            )
+            self.db.execute(insert(TeeTimeRollup).from_select([
+                "course_id", "tee_date", "tee_hour", "lead_hours", *counts.keys(),
+                "price_sum", "price_count", "min_price", "max_price", "refreshed_at"
+            ], aggregated))
+            self.db.commit()
+            return len(touched)
+        except Exception:
+            self.db.rollback()
+            raise
+
+
+class AsyncHistoryRepository(HistoryQueries):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_sell_out_curve(self, course: str, start_date: date, end_date: date, tee_hour_from: Optional[int] = None,
+                                 tee_hour_to: Optional[int] = None, max_lead_hours: int = 336) -> Dict:
+        """How many of a course's slots in a date range were still bookable N hours before tee off, from the rollups."""
+        statement = self._sell_out_curve_statement(course, start_date, end_date, tee_hour_from, tee_hour_to)
+        rows = (await self.db.execute(statement)).all()
+        return self._sell_out_curve(rows, course, start_date, end_date, max_lead_hours)
@@ -1,160 +1,624 @@
 from sqlalchemy.orm import Session
-from ..models.tee_time import Course, TeeTime, Player
-from datetime import datetime, timezone
-from typing import Dict, List, Optional
-from sqlalchemy import and_, desc
-import pytz
-
-class TeeTimeRepository:
-    def __init__(self, db: Session):
-        self.db = db
+from ..models.tee_time import Course, TeeTime, TZDateTime
+from ..events import TeeTimeChange, publish_tee_time_changes, publish_tee_times_changed
+from ..fingerprint_store import FingerprintStore, fingerprint_tee_sheet
+from .history_repository import HistoryRepository
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import and_, or_, desc, exists, func, literal, select, update, tuple_, Row, Select, MetaData, Table, Column, Integer, Float, String, ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+import base64
+import csv
+import io
+import json
+import logging
+import time
 
-    def save_tee_times(self, tee_times: List[Dict]):
-        try:
-            # Create a dictionary to store courses
-            courses = {}
-            
-            # Get all course names from the tee times
-            course_names = set(tt['course_name'] for tt in tee_times)
-            
-            # Fetch or create courses
-            for course_name in course_names:
-                course = self.db.query(Course).filter(Course.name == course_name).first()
-                if not course:
-                    course = Course(name=course_name)
-                    self.db.add(course)
-                    self.db.flush()
-                courses[course_name] = course
-            
-            current_time = datetime.now(timezone.utc)
-            
-            for course_name, course in courses.items():
-                # Get all existing tee times for this course
-                existing_tee_times = self.db.query(TeeTime).filter(TeeTime.course_id == course.id).all()
-                
-                # Create a set of datetime objects from the scraped tee times for easy comparison
-                scraped_datetimes = {datetime.fromisoformat(tt['datetime']) for tt in tee_times if tt['course_name'] == course_name}
-                
-                for existing_tee_time in existing_tee_times:
-                    # Ensure existing_tee_time.datetime is timezone-aware
-                    if existing_tee_time.datetime.tzinfo is None:
-                        existing_tee_time.datetime = existing_tee_time.datetime.replace(tzinfo=timezone.utc)
-                    
-                    # Case 1: Mark past tee times as unavailable
-                    if existing_tee_time.datetime < current_time:
-                        existing_tee_time.available_booking_sizes = []
-                    # Case 2: Mark tee times not in the latest scrape as unavailable (only for the courses being scraped)
-                    elif existing_tee_time.datetime.date() in [datetime.fromisoformat(tt['datetime']).date() for tt in tee_times if tt['course_name'] == course_name]:
-                        if existing_tee_time.datetime not in scraped_datetimes:
-                            existing_tee_time.available_booking_sizes = []
-                
-                # Update or create tee times
-                for tee_time in tee_times:
-                    if tee_time['course_name'] == course_name:
-                        tee_time_datetime = datetime.fromisoformat(tee_time['datetime'])
-                        existing_tee_time = next((tt for tt in existing_tee_times if tt.datetime == tee_time_datetime), None)
-
-                        if existing_tee_time:
-                            # Update existing tee time
-                            existing_tee_time.price = tee_time['price']
-                            existing_tee_time.available_booking_sizes = tee_time['available_booking_sizes']
-                        else:
-                            # Create new tee time
-                            new_tee_time = TeeTime(
-                                course_id=course.id,
-                                datetime=tee_time_datetime,
-                                price=tee_time['price'],
-                                currency=tee_time['currency'],
-                                available_booking_sizes=tee_time['available_booking_sizes'],
-                                starting_hole=tee_time['starting_hole']
-                            )
-                            self.db.add(new_tee_time)
-
-            self.db.commit()
-            print(f"Successfully saved and updated tee times for {len(courses)} courses")
-        except Exception as e:
-            self.db.rollback()
-            print(f"Error saving tee times: {str(e)}")
-            raise
+from src.monitoring.metrics import Counter, Histogram
+from src.monitoring.tracing import span
+from src.utils.datetimes import ensure_utc, local_day_bounds, to_local
 
-    def get_all_tee_times(self, page: int, limit: int, sort_by: Optional[str], sort_order: str) -> Dict:
-        query = self.db.query(TeeTime).join(Course).outerjoin(Player)
-        query = self._apply_sorting(query, sort_by, sort_order)
-        return self._paginate_query(query, page, limit)
+logger = logging.getLogger(__name__)
 
-    def get_all_available_tee_times(self, page: int, limit: int, sort_by: Optional[str], sort_order: str) -> Dict:
-        query = self.db.query(TeeTime).join(Course).outerjoin(Player).filter(TeeTime.available_booking_sizes != [])
-        query = self._apply_sorting(query, sort_by, sort_order)
-        return self._paginate_query(query, page, limit)
+TEE_TIME_SAVE_SECONDS = Histogram(
+    "tee_time_save_seconds", "Duration of save_tee_times upserts, by outcome", labelnames=("status",)
+)
+TEE_TIME_SAVE_ROWS = Counter("tee_time_save_rows_total", "Scraped tee times handed to save_tee_times")
 
-    def _paginate_query(self, query, page: int, limit: int) -> Dict:
-        total_items = query.count()
-        tee_times = query.offset((page - 1) * limit).limit(limit).all()
+# Per-transaction staging table for bulk upserts; kept out of Base.metadata so
+# create_all never builds it as a permanent table.
+tee_time_staging = Table(
+    "tee_time_staging",
+    MetaData(),
+    Column("course_id", Integer),
+    Column("datetime", TZDateTime),
+    Column("price", Float),
+    Column("currency", String),
+    Column("available_booking_sizes", ARRAY(Integer)),
+    Column("starting_hole", Integer),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP"
+)
 
-        return {
-            "teeTimes": [self._format_tee_time(tee_time) for tee_time in tee_times],
-            "pagination": {
-                "currentPage": page,
-                "totalPages": (total_items + limit - 1) // limit,
-                "totalItems": total_items,
-                "itemsPerPage": limit
-            }
-        }
+class ExplainJson(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a statement, with its parameters bound as usual."""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(ExplainJson, "postgresql")
+def _compile_explain_json(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+# Columns the list endpoints can sort and page by (every tee time column, as
+# before cursors); id breaks ties
+SORT_FIELDS = ('datetime', 'price', 'currency', 'available_booking_sizes', 'starting_hole', 'course_id', 'id')
+
+
+def select_tee_times() -> Select:
+    """
+    The columns a tee time list response needs, with its course joined once.
+    Rows come back as plain tuples, so listing never loads ORM objects or
+    lazily fetches courses (or fans out over players).
+    """
+    return select(
+        TeeTime.id,
+        Course.name.label("course"),
+        TeeTime.datetime,
+        Course.timezone,
+        TeeTime.available_booking_sizes,
+        TeeTime.price,
+        TeeTime.currency,
+        TeeTime.starting_hole,
+        TeeTime.course_id
+    ).join_from(TeeTime, Course)
+
+
+def format_tee_time(tee_time: Row) -> Dict:
+    """
+    A select_tee_times() row as the API returns it, with the time in the
+    course's timezone. The datetime stays a datetime; the response encoder
+    writes it as ISO 8601 with its offset.
+    """
+    return {
+        "id": tee_time.id,
+        "course": tee_time.course,
+        "datetime": to_local(tee_time.datetime, tee_time.timezone),
+        "timezone": tee_time.timezone,
+        "available_booking_sizes": tee_time.available_booking_sizes,
+        "price": tee_time.price,
+        "currency": tee_time.currency,
+        "starting_hole": tee_time.starting_hole
+    }
+
+
+# What a write returns about each slot it changed, for the change feed. Table
+# columns, since ORM-enabled UPDATEs leave other tables out of RETURNING.
+CHANGE_COLUMNS = (
+    TeeTime.__table__.c.id,
+    TeeTime.__table__.c.course_id,
+    Course.__table__.c.name.label("course"),
+    TeeTime.__table__.c.datetime,
+    Course.__table__.c.timezone,
+    TeeTime.__table__.c.starting_hole,
+    TeeTime.__table__.c.available_booking_sizes,
+    TeeTime.__table__.c.price
+)
 
-    def _format_tee_time(self, tee_time: TeeTime) -> Dict:
-        course_timezone = pytz.timezone(tee_time.course.timezone)
-        localized_datetime = tee_time.datetime.astimezone(course_timezone)
-        
-        return {
-            "id": tee_time.id,
-            "course": tee_time.course.name,
-            "datetime": localized_datetime.isoformat(),
-            "timezone": tee_time.course.timezone,
-            "available_booking_sizes": tee_time.available_booking_sizes,
-            "price": tee_time.price,
-            "currency": tee_time.currency,
-            "starting_hole": tee_time.starting_hole
-        }
 
-    def update_expired_tee_times(self):
-        current_time = datetime.now(timezone.utc)
-        expired_tee_times = self.db.query(TeeTime).filter(
-            TeeTime.datetime < current_time,
-            TeeTime.available_booking_sizes != []
-        ).all()
+def _merge_change_type(row: Row) -> str:
+    if row.previous_available_booking_sizes is None:
+        return "added"
+    if not row.previous_available_booking_sizes and row.available_booking_sizes:
+        return "opened"
+    if row.previous_available_booking_sizes and not row.available_booking_sizes:
+        return "sold_out"
+    if row.previous_available_booking_sizes != row.available_booking_sizes:
+        return "availability_changed"
+    return "price_changed"
 
-        for tee_time in expired_tee_times:
-            tee_time.available_booking_sizes = []
 
-        self.db.commit()
-        print(f"Updated {len(expired_tee_times)} expired tee times")
+def _tee_time_change(change_type: str, row: Row) -> TeeTimeChange:
+    return TeeTimeChange(
+        type=change_type,
+        id=row.id,
+        course_id=row.course_id,
+        course=row.course,
+        datetime=row.datetime,
+        timezone=row.timezone,
+        starting_hole=row.starting_hole,
+        available_booking_sizes=list(row.available_booking_sizes or []),
+        price=row.price,
+        previous_available_booking_sizes=getattr(row, "previous_available_booking_sizes", None),
+        previous_price=getattr(row, "previous_price", None)
+    )
 
-    def get_filtered_tee_times(self, date: Optional[str], course: Optional[str], min_price: Optional[float], max_price: Optional[float], page: int, limit: int, sort_by: Optional[str], sort_order: str) -> Dict:
-        query = self.db.query(TeeTime).join(Course)
+
+@dataclass
+class PagePlan:
+    """The statements for one page of a tee time list and what is needed to shape the response."""
+    statement: Select
+    count_statement: Optional[Executable]
+    total: str
+    sort_by: str
+    descending: bool
+    direction: str
+    after: Optional[Tuple]
+    page: int
+    limit: int
+    cursor: Optional[str]
+
+
+class TeeTimeListQueries:
+    """
+    Builds the tee time list statements and shapes their results without
+    touching a session, so the sync and async repositories page identically.
+    """
+
+    def _filtered_query(self, date: Optional[str], course: Optional[str], min_price: Optional[float], max_price: Optional[float],
+                        available_only: bool = True) -> Select:
+        query = select_tee_times()
 
         if date:
-            query = query.filter(TeeTime.datetime.cast(Date) == date)
+            # A range on the raw column (not a cast to date) so the datetime indexes apply
+            day_start = datetime.fromisoformat(date).replace(tzinfo=timezone.utc)
+            query = query.where(TeeTime.datetime >= day_start, TeeTime.datetime < day_start + timedelta(days=1))
         if course:
-            query = query.filter(Course.name == course)
+            query = query.where(Course.name == course)
         if min_price is not None:
-            query = query.filter(TeeTime.price >= min_price)
+            query = query.where(TeeTime.price >= min_price)
         if max_price is not None:
-            query = query.filter(TeeTime.price <= max_price)
+            query = query.where(TeeTime.price <= max_price)
+
+        if available_only:
+            query = query.where(TeeTime.is_available)  # Only get available tee times
+        return query
+
+    def _plan_page(self, query: Select, page: int, limit: int, sort_by: Optional[str], sort_order: str,
+                   cursor: Optional[str] = None, total: Optional[str] = None) -> PagePlan:
+        """
+        Plan one page of `query` ordered by the sort key with id as a tie-breaker.
+
+        Without a cursor this is the classic page/OFFSET pagination. With a
+        cursor the page is read with a keyset predicate on (sort key, id), so
+        it costs the same however deep it is. `total` is 'exact' (a COUNT),
+        'estimate' (the planner's row estimate) or 'none'; it defaults to
+        'exact' for page mode and 'none' for cursor mode.
+        """
+        sort_by = self._sort_field(sort_by)
+        descending = sort_order == 'desc'
+        total = total or ('none' if cursor else 'exact')
+
+        if cursor is None:
+            direction, after = 'next', None
+            page_query = self._apply_sorting(query, sort_by, descending).offset((page - 1) * limit)
+        else:
+            direction, after = self._decode_cursor(cursor, sort_by, descending)
+            # Walking backwards reads the rows before the cursor in reverse order
+            reverse = descending != (direction == 'prev')
+            page_query = query.where(self._keyset_filter(sort_by, after, reverse))
+            page_query = self._apply_sorting(page_query, sort_by, reverse)
+
+        return PagePlan(
+            statement=page_query.limit(limit + 1),
+            count_statement=self._count_statement(query, total),
+            total=total,
+            sort_by=sort_by,
+            descending=descending,
+            direction=direction,
+            after=after,
+            page=page,
+            limit=limit,
+            cursor=cursor
+        )
+
+    def _page_result(self, plan: PagePlan, tee_times: List[Row], count_result) -> Dict:
+        total_items = self._total_items(plan.total, count_result)
+        limit = plan.limit
+        has_more = len(tee_times) > limit
+        tee_times = tee_times[:limit]
+        if plan.direction == 'prev':
+            tee_times.reverse()
+
+        has_next = has_more if plan.direction == 'next' else True
+        has_prev = (plan.after is not None or plan.page > 1) if plan.direction == 'next' else has_more
+        pagination = {"currentPage": plan.page} if plan.cursor is None else {}
+        pagination.update({
+            "totalPages": (total_items + limit - 1) // limit if total_items is not None else None,
+            "totalItems": total_items,
+            "totalIsEstimate": plan.total == 'estimate',
+            "itemsPerPage": limit,
+            "nextCursor": self._encode_cursor(tee_times[-1], plan.sort_by, plan.descending, 'next') if tee_times and has_next else None,
+            "prevCursor": self._encode_cursor(tee_times[0], plan.sort_by, plan.descending, 'prev') if tee_times and has_prev else None
+        })
+
+        return {
+            "teeTimes": [self._format_tee_time(tee_time) for tee_time in tee_times],
+            "pagination": pagination
+        }
+
+    def _count_statement(self, query: Select, total: str) -> Optional[Executable]:
+        if total == 'exact':
+            return select(func.count()).select_from(query.order_by(None).subquery())
+        if total == 'estimate':
+            # The planner's row estimate is free compared with a COUNT over a large table
+            return ExplainJson(query.order_by(None))
+        if total == 'none':
+            return None
+        raise ValueError(f"Invalid total mode '{total}'. Use exact, estimate or none.")
+
+    def _total_items(self, total: str, count_result) -> Optional[int]:
+        if total == 'estimate':
+            # asyncpg hands json back undecoded
+            plan = json.loads(count_result) if isinstance(count_result, str) else count_result
+            return int(plan[0]["Plan"]["Plan Rows"])
+        return count_result
+
+    def _sort_field(self, sort_by: Optional[str]) -> str:
+        if sort_by is None:
+            return 'datetime'
+        if sort_by not in SORT_FIELDS:
+            logger.warning("Invalid sort_by field '%s'. Ignoring sorting.", sort_by)
+            return 'datetime'
+        return sort_by
 
-        query = query.filter(TeeTime.available_booking_sizes != [])  # Only get available tee times
-        query = self._apply_sorting(query, sort_by, sort_order)
+    def _keyset_filter(self, sort_by: str, after: Tuple, descending: bool):
+        # Postgres sorts NULLs last ascending and first descending; the
+        # predicate follows that order so nullable keys (price) page correctly.
+        # Cursor values are bound as their column's type, since a bare JSON
+        # value (an ISO string, a list) would not compare as one
+        column = getattr(TeeTime, sort_by)
+        value, last_id = after
+        last_id = literal(last_id, TeeTime.id.type)
+        if value is None:
+            if descending:
+                return or_(column.isnot(None), TeeTime.id < last_id)
+            return and_(column.is_(None), TeeTime.id > last_id)
+        value = literal(value, column.type)
+        if descending:
+            return tuple_(column, TeeTime.id) < tuple_(value, last_id)
+        return or_(tuple_(column, TeeTime.id) > tuple_(value, last_id), column.is_(None))
+
+    def _encode_cursor(self, tee_time: Row, sort_by: str, descending: bool, direction: str) -> str:
+        value = getattr(tee_time, sort_by)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        payload = json.dumps([sort_by, descending, direction, value, tee_time.id], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def _decode_cursor(self, cursor: str, sort_by: str, descending: bool) -> Tuple[str, Tuple]:
+        try:
+            payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            cursor_sort_by, cursor_descending, direction, value, last_id = json.loads(payload)
+            if sort_by == 'datetime' and value is not None:
+                value = datetime.fromisoformat(value)
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor")
+        if (cursor_sort_by, cursor_descending) != (sort_by, descending) or direction not in ('next', 'prev'):
+            raise ValueError("Cursor does not match the requested sort order")
+        return direction, (value, last_id)
+
+    def _format_tee_time(self, tee_time: Row) -> Dict:
+        return format_tee_time(tee_time)
+
+    def _apply_sorting(self, query, sort_by: str, descending: bool):
+        column = getattr(TeeTime, sort_by)
+        if descending:
+            return query.order_by(desc(column), desc(TeeTime.id))
+        return query.order_by(column, TeeTime.id)
+
+
+class TeeTimeRepository(TeeTimeListQueries):
+    def __init__(self, db: Session, fingerprints: Optional[FingerprintStore] = None):
+        self.db = db
+        self.fingerprints = fingerprints
+
+    def save_tee_times(self, tee_times: List[Dict], scraped_dates: Optional[Set[date]] = None):
+        """
+        Upsert scraped tee times in a constant number of round-trips.
+
+        The scrape is COPY'd into a temporary staging table, the staged rows
+        are merged with INSERT ... ON CONFLICT on (course_id, datetime,
+        starting_hole), rewriting only rows whose price or availability
+        changed, and then slots that are in the past or missing from a scraped
+        day are marked unavailable with one UPDATE.
+
+        Days are each course's local days. `scraped_dates` are the days the
+        scrape covered in full, so a day that came back empty sells out and a
+        day whose unit failed is left alone; without it, the days the rows fall
+        on count as scraped.
+
+        With a fingerprint store, days whose tee sheet is identical to the last
+        one saved are left out of the write entirely.
+        """
+        started = time.perf_counter()
+        TEE_TIME_SAVE_ROWS.inc(len(tee_times))
+        try:
+            with span("save", tee_times=len(tee_times)):
+                rows = self._prepare_rows(tee_times)
+                courses = self._get_or_create_courses({row['course_name'] for row in rows})
+                course_ids = {name: course.id for name, course in courses.items()}
+                days = self._scraped_days(rows, courses, scraped_dates)
+                days, fingerprints = self._changed_days(days)
+                rows = [row for course_days in days.values() for day_rows in course_days.values() for row in day_rows]
+
+                changes = []
+                if course_ids:
+                    current_time = datetime.now(timezone.utc)
+                    if rows:
+                        with span("save.stage", rows=len(rows)):
+                            self._stage_rows(rows, course_ids)
+                    with span("save.merge"):
+                        if rows:
+                            changes += self._merge_staged_rows()
+                        # After the merge, so a scraped slot that has already started does not come back available
+                        scraped_days = {courses[name]: course_days.keys() for name, course_days in days.items()}
+                        changes += self._mark_unavailable(list(course_ids.values()), current_time, scraped_days, staged=bool(rows))
+                    HistoryRepository(self.db).record(changes, current_time)
+
+                with span("save.commit", changes=len(changes)):
+                    self.db.commit()
+                if self.fingerprints is not None and fingerprints:
+                    self.fingerprints.put(fingerprints)
+                if changes:
+                    publish_tee_times_changed(course_ids.keys())
+                    publish_tee_time_changes(changes)
+            TEE_TIME_SAVE_SECONDS.observe(time.perf_counter() - started, status="ok")
+            logger.info("Saved tee times for %d courses, %d changes", len(course_ids), len(changes))
+        except Exception:
+            self.db.rollback()
+            TEE_TIME_SAVE_SECONDS.observe(time.perf_counter() - started, status="error")
+            logger.exception("Error saving tee times")
+            raise
+
+    def _scraped_days(self, rows: List[Dict], courses: Dict[str, Row],
+                      scraped_dates: Optional[Set[date]]) -> Dict[str, Dict[date, List[Dict]]]:
+        # Each course's rows by the local day they fall on; a scraped day with no rows stays as an empty sheet
+        days_by_course = defaultdict(lambda: defaultdict(list))
+        for row in rows:
+            course_name = row['course_name']
+            days_by_course[course_name][to_local(row['datetime'], courses[course_name].timezone).date()].append(row)
+        if scraped_dates is None:
+            return days_by_course
+        for course_name, days in days_by_course.items():
+            for day in scraped_dates:
+                days.setdefault(day, [])
+        return days_by_course
+
+    def _changed_days(self, days_by_course: Dict[str, Dict[date, List[Dict]]]) -> Tuple[Dict[str, Dict[date, List[Dict]]], List[Tuple[str, date, str]]]:
+        # Unchanged days drop out of both the merge and the scraped days _mark_unavailable looks at
+        if self.fingerprints is None:
+            return days_by_course, []
+        changed_days, fingerprints, skipped = {}, [], 0
+        for course_name, days in days_by_course.items():
+            saved = self.fingerprints.get(course_name, days.keys())
+            changed_days[course_name] = {}
+            for day, day_rows in days.items():
+                fingerprint = fingerprint_tee_sheet(day_rows)
+                if saved.get(day) == fingerprint:
+                    skipped += 1
+                    continue
+                changed_days[course_name][day] = day_rows
+                fingerprints.append((course_name, day, fingerprint))
+        if skipped:
+            logger.info("Skipped %d unchanged tee sheet days", skipped)
+        return changed_days, fingerprints
+
+    def _prepare_rows(self, tee_times: List[Dict]) -> List[Dict]:
+        # Scrapers hand over UTC datetimes (ISO strings are still accepted).
+        # Keep the last row scraped for a slot, since ON CONFLICT cannot
+        # touch the same row twice in one statement
+        rows = {}
+        for tee_time in tee_times:
+            row = dict(tee_time, datetime=ensure_utc(tee_time['datetime']))
+            rows[(row['course_name'], row['datetime'], row['starting_hole'])] = row
+        return list(rows.values())
+
+    def _get_or_create_courses(self, course_names: Set[str]) -> Dict[str, Row]:
+        # Each course's (id, timezone)
+        if not course_names:
+            return {}
+        self.db.execute(
+            pg_insert(Course)
+            .values([{"name": name} for name in sorted(course_names)])
+            .on_conflict_do_nothing(index_elements=[Course.name])
+        )
+        result = self.db.execute(select(Course.name, Course.id, Course.timezone).where(Course.name.in_(course_names)))
+        return {row.name: row for row in result}
+
+    def _stage_rows(self, rows: List[Dict], course_ids: Dict[str, int]):
+        # The staging table is dropped automatically when the transaction ends
+        connection = self.db.connection()
+        tee_time_staging.create(connection)
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([
+                course_ids[row['course_name']],
+                row['datetime'].replace(tzinfo=None).isoformat(),
+                row['price'],
+                row['currency'],
+                '{' + ','.join(str(size) for size in row['available_booking_sizes']) + '}',
+                row['starting_hole'],
+            ])
+        buffer.seek(0)
+
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(
+                "COPY tee_time_staging (course_id, datetime, price, currency, available_booking_sizes, starting_hole) "
+                "FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+        finally:
+            cursor.close()
+
+    def _mark_unavailable(self, course_ids: List[int], current_time: datetime,
+                          scraped_days: Optional[Dict[Row, Iterable[date]]] = None, staged: bool = True) -> List[TeeTimeChange]:
+        # Case 1: past tee times. Case 2: tee times missing from a day that was
+        # scraped, i.e. from local midnight to the next for each (course, day)
+        unavailable = TeeTime.datetime < current_time
+        day_ranges = [
+            and_(TeeTime.course_id == course.id, TeeTime.datetime >= start, TeeTime.datetime < end)
+            for course, days in (scraped_days or {}).items()
+            for start, end in (local_day_bounds(day, course.timezone) for day in days)
+        ]
+        if day_ranges:
+            scraped_day = or_(*day_ranges)
+            if staged:
+                staged_columns = tee_time_staging.c
+                scraped_slot = exists().where(
+                    staged_columns.course_id == TeeTime.course_id,
+                    staged_columns.datetime == TeeTime.datetime,
+                    staged_columns.starting_hole == TeeTime.starting_hole
+                )
+                scraped_day = and_(scraped_day, ~scraped_slot)
+            unavailable = or_(unavailable, scraped_day)
+        result = self.db.connection().execute(
+            update(TeeTime.__table__)
+            .where(
+                TeeTime.course_id.in_(course_ids),
+                TeeTime.is_available,
+                unavailable,
+                TeeTime.course_id == Course.id
+            )
+            .values(available_booking_sizes=[])
+            .returning(*CHANGE_COLUMNS)
+        )
+        return [
+            _tee_time_change("expired" if row.datetime < current_time else "sold_out", row)
+            for row in result
+        ]
+
+    def _merge_staged_rows(self) -> List[TeeTimeChange]:
+        staged = tee_time_staging.c
+        columns = ['course_id', 'datetime', 'price', 'currency', 'available_booking_sizes', 'starting_hole']
+        # CTEs share the statement's snapshot, so this reads the slots as they were before the merge
+        previous = (
+            select(TeeTime.id, TeeTime.price, TeeTime.available_booking_sizes)
+            .join(tee_time_staging, and_(
+                staged.course_id == TeeTime.course_id,
+                staged.datetime == TeeTime.datetime,
+                staged.starting_hole == TeeTime.starting_hole
+            ))
+            .cte("previous")
+        )
+        insert_stmt = pg_insert(TeeTime).from_select(columns, select(*[staged[column] for column in columns]))
+        merged = (
+            insert_stmt.on_conflict_do_update(
+                constraint="uq_tee_times_course_datetime_hole",
+                set_={
+                    "price": insert_stmt.excluded.price,
+                    "available_booking_sizes": insert_stmt.excluded.available_booking_sizes
+                },
+                # Unchanged slots are not rewritten, so a rescrape costs no dead tuples or WAL for them
+                where=or_(
+                    TeeTime.price.is_distinct_from(insert_stmt.excluded.price),
+                    TeeTime.available_booking_sizes.is_distinct_from(insert_stmt.excluded.available_booking_sizes)
+                )
+            )
+            .returning(TeeTime.id, TeeTime.course_id, TeeTime.datetime, TeeTime.starting_hole,
+                       TeeTime.available_booking_sizes, TeeTime.price)
+            .cte("merged")
+        )
+        result = self.db.execute(
+            select(
+                merged.c.id,
+                merged.c.course_id,
+                Course.name.label("course"),
+                merged.c.datetime,
+                Course.timezone,
+                merged.c.starting_hole,
+                merged.c.available_booking_sizes,
+                merged.c.price,
+                previous.c.available_booking_sizes.label("previous_available_booking_sizes"),
+                previous.c.price.label("previous_price")
+            )
+            .join(Course, Course.id == merged.c.course_id)
+            .outerjoin(previous, previous.c.id == merged.c.id)
+        )
+        return [_tee_time_change(_merge_change_type(row), row) for row in result]
+
+    def get_all_tee_times(self, page: int, limit: int, sort_by: Optional[str], sort_order: str,
+                          cursor: Optional[str] = None, total: Optional[str] = None) -> Dict:
+        query = select_tee_times()
+        return self._paginate_query(query, page, limit, sort_by, sort_order, cursor, total)
+
+    def get_all_available_tee_times(self, page: int, limit: int, sort_by: Optional[str], sort_order: str,
+                                    cursor: Optional[str] = None, total: Optional[str] = None) -> Dict:
+        query = select_tee_times().where(TeeTime.is_available)
+        return self._paginate_query(query, page, limit, sort_by, sort_order, cursor, total)
+
+    def get_filtered_tee_times(self, date: Optional[str], course: Optional[str], min_price: Optional[float], max_price: Optional[float], page: int, limit: int, sort_by: Optional[str], sort_order: str,
+                               cursor: Optional[str] = None, total: Optional[str] = None) -> Dict:
+        query = self._filtered_query(date, course, min_price, max_price)
+        return self._paginate_query(query, page, limit, sort_by, sort_order, cursor, total)
+
+    def _paginate_query(self, query: Select, page: int, limit: int, sort_by: Optional[str], sort_order: str,
+                        cursor: Optional[str] = None, total: Optional[str] = None) -> Dict:
+        plan = self._plan_page(query, page, limit, sort_by, sort_order, cursor, total)
+        count_result = self.db.execute(plan.count_statement).scalar() if plan.count_statement is not None else None
+        return self._page_result(plan, self.db.execute(plan.statement).all(), count_result)
+
+    def update_expired_tee_times(self, cutoff: Optional[datetime] = None, since: Optional[datetime] = None,
+                                 batch_size: int = 5000) -> int:
+        """
+        Mark available tee times before `cutoff` (default now) as unavailable.
+
+        Runs set-based UPDATEs of at most `batch_size` rows, committing after
+        each so locks stay short, and only looks at slots from `since` on when
+        given (the previous sweep's cutoff). Returns the number of rows updated.
+        """
+        cutoff = cutoff or datetime.now(timezone.utc)
+        window = [TeeTime.is_available, TeeTime.datetime < cutoff]
+        if since is not None:
+            window.append(TeeTime.datetime >= since)
+
+        updated = 0
+        try:
+            while True:
+                # SKIP LOCKED lets concurrent sweeps (or a scrape holding rows) split the work
+                batch = (
+                    select(TeeTime.id)
+                    .where(*window)
+                    .order_by(TeeTime.datetime)
+                    .limit(batch_size)
+                    .with_for_update(skip_locked=True)
+                    .scalar_subquery()
+                )
+                changes = [
+                    _tee_time_change("expired", row)
+                    for row in self.db.connection().execute(
+                        update(TeeTime.__table__)
+                        .where(TeeTime.id.in_(batch), TeeTime.course_id == Course.id)
+                        .values(available_booking_sizes=[])
+                        .returning(*CHANGE_COLUMNS)
+                    )
+                ]
+                HistoryRepository(self.db).record(changes, cutoff)
+                self.db.commit()
+                rowcount = len(changes)
+                updated += rowcount
+                if changes:
+                    publish_tee_time_changes(changes)
+                if rowcount < batch_size:
+                    break
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            if updated:
+                publish_tee_times_changed()
 
-        return self._paginate_query(query, page, limit)
+        logger.info("Updated %d expired tee times", updated)
+        return updated
 
     def get_all_course_names(self) -> List[str]:
-        courses = self.db.query(Course.name).distinct().all()
-        return [course[0] for course in courses]
-
-    def _apply_sorting(self, query, sort_by: Optional[str], sort_order: str):
-        if sort_by:
-            if hasattr(TeeTime, sort_by):
-                order_func = desc if sort_order == 'desc' else None
-                query = query.order_by(order_func(getattr(TeeTime, sort_by)) if order_func else getattr(TeeTime, sort_by))
-            else:
-                print(f"Warning: Invalid sort_by field '{sort_by}'. Ignoring sorting.")
-        return query
\ No newline at end of file
+        return list(self.db.execute(select(Course.name).distinct()).scalars())
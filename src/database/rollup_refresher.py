@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from src.monitoring.metrics import Histogram
+from .repositories.history_repository import HistoryRepository
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_REFRESH_SECONDS = Histogram("rollup_refresh_seconds", "Duration of tee time history rollup refreshes")
+
+
+class RollupRefresher:
+    """Periodically folds new tee time snapshots into the hourly rollups behind the history API."""
+
+    def __init__(self, session_factory: Callable[[], Session], interval_seconds: float = 300, lag_seconds: float = 300):
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self.lag_seconds = lag_seconds
+        self._running = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {
+            "runs": 0,
+            "lastRunAt": None,
+            "lastDurationSeconds": None,
+            "lastCourseDays": None,
+            "lastError": None
+        }
+
+    @classmethod
+    def from_env(cls, session_factory: Callable[[], Session]) -> "RollupRefresher":
+        return cls(
+            session_factory,
+            interval_seconds=float(os.getenv('ROLLUP_INTERVAL_SECONDS', 300)),
+            lag_seconds=float(os.getenv('ROLLUP_LAG_SECONDS', 300))
+        )
+
+    def run_once(self) -> Optional[int]:
+        """Refresh once; returns the course days rebuilt, or None if a refresh was already running."""
+        if not self._running.acquire(blocking=False):
+            return None
+        started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        db = self.session_factory()
+        try:
+            course_days = HistoryRepository(db).refresh_rollups(self.lag_seconds)
+            self._stats.update(lastCourseDays=course_days, lastError=None)
+            return course_days
+        except Exception as e:
+            self._stats["lastError"] = str(e)
+            logger.error("Error refreshing tee time rollups: %s", e)
+            raise
+        finally:
+            db.close()
+            duration = time.perf_counter() - started
+            ROLLUP_REFRESH_SECONDS.observe(duration)
+            self._stats["runs"] += 1
+            self._stats.update(lastRunAt=started_at.isoformat(), lastDurationSeconds=duration)
+            self._running.release()
+
+    async def run_forever(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.run_once)
+            except Exception:
+                # Already recorded; try again next interval
+                pass
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict:
+        return dict(self._stats, intervalSeconds=self.interval_seconds, lagSeconds=self.lag_seconds)
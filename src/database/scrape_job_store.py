@@ -0,0 +1,99 @@
+import logging
+from typing import Callable, Dict, Optional, Union
+
+from sqlalchemy import Engine, delete, select, update
+from sqlalchemy.orm import Session
+
+from .leader import AdvisoryLockLeader
+from .models.scrape_job import ScrapeJobRecord
+
+logger = logging.getLogger(__name__)
+
+JOB_FIELDS = ("id", "course", "status", "created_at", "finished_at", "tee_times_found", "duration_seconds", "error")
+
+
+def _to_dict(record: Optional[ScrapeJobRecord]) -> Optional[Dict]:
+    return {name: getattr(record, name) for name in JOB_FIELDS} if record is not None else None
+
+
+class PostgresScrapeJobStore:
+    """
+    Scrape jobs kept in the scrape_jobs table, so every API worker sees the
+    same jobs whichever one started them.
+
+    Whoever scrapes a course holds a Postgres advisory lock on it for the
+    whole scrape (try_lock), so one process at a time scrapes it and a
+    runner that dies releases it. A course's 'running' job is only
+    abandoned once its lock is free again, which start() records.
+    """
+
+    def __init__(self, engine: Union[Engine, Callable[[], Engine]]):
+        # Either an engine or a function returning one, so the engine can be built after import
+        self._engine = engine
+
+    def engine(self) -> Engine:
+        return self._engine if isinstance(self._engine, Engine) else self._engine()
+
+    def try_lock(self, course: str) -> Optional[AdvisoryLockLeader]:
+        """The course's scrape lock if no other scrape of it is running; release() it when done."""
+        lock = AdvisoryLockLeader(self._engine, f"tee-time-scrape:{course}")
+        return lock if lock.try_acquire() else None
+
+    def start(self, job: Dict):
+        """Record a job that holds its course's lock."""
+        with Session(self.engine()) as db, db.begin():
+            # Holding the lock means no one else is scraping the course
+            abandoned = db.execute(
+                update(ScrapeJobRecord)
+                .where(ScrapeJobRecord.course == job["course"], ScrapeJobRecord.status == "running")
+                .values(status="failed", error="Abandoned", finished_at=job["created_at"])
+            ).rowcount
+            if abandoned:
+                logger.warning("Marked %d abandoned scrape jobs of %s failed", abandoned, job["course"])
+            db.add(ScrapeJobRecord(**job))
+
+    def finish(self, job: Dict):
+        with Session(self.engine()) as db, db.begin():
+            db.execute(
+                update(ScrapeJobRecord).where(ScrapeJobRecord.id == job["id"]).values(
+                    status=job["status"], finished_at=job["finished_at"], tee_times_found=job["tee_times_found"],
+                    duration_seconds=job["duration_seconds"], error=job["error"]
+                )
+            )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with Session(self.engine()) as db:
+            return _to_dict(db.get(ScrapeJobRecord, job_id))
+
+    def running(self, course: str) -> Optional[Dict]:
+        return self._latest(course, "running", ScrapeJobRecord.created_at)
+
+    def last_success(self, course: str) -> Optional[Dict]:
+        return self._latest(course, "succeeded", ScrapeJobRecord.finished_at)
+
+    def _latest(self, course: str, status: str, order_by) -> Optional[Dict]:
+        with Session(self.engine()) as db:
+            return _to_dict(db.scalars(
+                select(ScrapeJobRecord)
+                .where(ScrapeJobRecord.course == course, ScrapeJobRecord.status == status)
+                .order_by(order_by.desc())
+                .limit(1)
+            ).first())
+
+    def prune(self, max_jobs: int):
+        """Delete the oldest finished jobs past `max_jobs`, keeping each course's last success."""
+        newest = select(ScrapeJobRecord.id).order_by(ScrapeJobRecord.created_at.desc()).limit(max_jobs)
+        last_successes = (
+            select(ScrapeJobRecord.id)
+            .where(ScrapeJobRecord.status == "succeeded")
+            .distinct(ScrapeJobRecord.course)
+            .order_by(ScrapeJobRecord.course, ScrapeJobRecord.finished_at.desc())
+        )
+        with Session(self.engine()) as db, db.begin():
+            db.execute(
+                delete(ScrapeJobRecord).where(
+                    ScrapeJobRecord.status != "running",
+                    ScrapeJobRecord.id.not_in(newest),
+                    ScrapeJobRecord.id.not_in(last_successes)
+                )
+            )
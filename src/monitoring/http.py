@@ -0,0 +1,58 @@
+import time
+from typing import Dict
+
+from src.monitoring.metrics import Histogram
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending its response headers, by route",
+    labelnames=("method", "route", "status")
+)
+
+
+class RequestMetricsMiddleware:
+    """
+    Times every HTTP request up to its response headers, labelled with the
+    route's path template (/api/tee-times/{id}, not the raw path) so label
+    values stay bounded. Streaming responses such as the change feed are
+    timed to their first byte rather than for as long as they stay open.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._route_paths: Dict = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        responded = False
+
+        async def send_and_time(message):
+            nonlocal responded
+            if message["type"] == "http.response.start":
+                responded = True
+                self._observe(scope, message["status"], time.perf_counter() - started)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_time)
+        finally:
+            if not responded:
+                self._observe(scope, 500, time.perf_counter() - started)
+
+    def _observe(self, scope, status: int, seconds: float):
+        REQUEST_SECONDS.observe(seconds, method=scope["method"], route=self._route(scope), status=status)
+
+    def _route(self, scope) -> str:
+        # The router leaves the matched endpoint in the scope; map it back to its path template
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if endpoint not in self._route_paths:
+            for route in scope["app"].routes:
+                if getattr(route, "endpoint", None) is not None:
+                    self._route_paths[route.endpoint] = route.path
+        return self._route_paths.get(endpoint, "unmatched")
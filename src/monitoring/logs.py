@@ -0,0 +1,38 @@
+import json
+import logging
+import os
+from datetime import datetime, timezone
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, for log pipelines that parse fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level: str = None, log_format: str = None):
+    """
+    Send this project's loggers (src.*) to stderr at LOG_LEVEL, as text or as
+    JSON lines (LOG_FORMAT=json). Safe to call more than once.
+    """
+    level = (level or os.getenv('LOG_LEVEL', 'INFO')).upper()
+    log_format = log_format or os.getenv('LOG_FORMAT', 'text')
+    logger = logging.getLogger("src")
+    logger.setLevel(level)
+    if any(getattr(handler, "_tee_times", False) for handler in logger.handlers):
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter() if log_format == 'json' else logging.Formatter(TEXT_FORMAT))
+    handler._tee_times = True
+    logger.addHandler(handler)
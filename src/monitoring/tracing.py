@@ -0,0 +1,58 @@
+import logging
+import os
+import threading
+from contextlib import nullcontext
+from typing import ContextManager
+
+logger = logging.getLogger(__name__)
+
+# A span is a no-op unless TRACING_ENABLED=1 and OpenTelemetry is installed
+# (pip install opentelemetry-sdk opentelemetry-exporter-otlp); the exporter is
+# configured by the usual OTEL_* environment variables
+_tracer = None
+_tracer_lock = threading.Lock()
+_configured = False
+_NO_SPAN = nullcontext()
+
+
+def _get_tracer():
+    global _tracer, _configured
+    if _configured:
+        return _tracer
+    with _tracer_lock:
+        if not _configured:
+            if os.getenv('TRACING_ENABLED', '0') != '0':
+                _tracer = _create_tracer()
+            _configured = True
+    return _tracer
+
+
+def _create_tracer():
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        logger.warning("TRACING_ENABLED is set but opentelemetry is not installed; tracing is off")
+        return None
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    except ImportError:
+        # Only the API is installed; spans go to whatever provider the host process set up
+        return trace.get_tracer("tee-times")
+    provider = TracerProvider(resource=Resource.create({"service.name": os.getenv('OTEL_SERVICE_NAME', 'tee-times')}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(provider)
+    return trace.get_tracer("tee-times")
+
+
+def span(name: str, **attributes) -> ContextManager:
+    """
+    A trace span around one stage of work, e.g. `with span("scrape.fetch", course=course):`.
+    Attribute values must be str, bool, int or float.
+    """
+    tracer = _get_tracer()
+    if tracer is None:
+        return _NO_SPAN
+    return tracer.start_as_current_span(name, attributes=attributes)
@@ -1,15 +1,58 @@
 import abc
-from typing import List, Dict
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, List, Dict, Optional, Set
+
+from src.monitoring.tracing import span
+from src.utils.datetimes import get_timezone
+
+from .driver_pool import get_driver_pool
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ScrapeUnit:
+    """One independently scrapable piece of work: a single day of a tee sheet."""
+    index: int
+    date: date
+
 
 class BaseScraper(abc.ABC):
-    def __init__(self, url: str):
+    # Scrapers that can read their tee sheet without a browser set this and
+    # define `async def scrape_unit_http(self, unit) -> List[Dict]`, scraping
+    # one unit over plain HTTP; scrape_unit() stays the Selenium fallback.
+    supports_http = False
+    # Days ahead to scrape unless SCRAPE_HORIZON_DAYS or the constructor says otherwise
+    default_horizon_days = 5
+    # Where the tee sheet's wall clock times are; parse_tee_time() returns UTC datetimes
+    timezone_name = 'America/Vancouver'
+
+    def __init__(self, url: str, horizon_days: Optional[int] = None, unit_concurrency: Optional[int] = None):
         self.url = url
+        self.timezone = get_timezone(self.timezone_name)
+        self.horizon_days = horizon_days or int(os.getenv('SCRAPE_HORIZON_DAYS', self.default_horizon_days))
+        self.unit_concurrency = unit_concurrency or int(os.getenv('SCRAPE_UNIT_CONCURRENCY', 3))
+        # Day offsets to scrape (e.g. only the next few days); None scrapes the whole horizon
+        self.days: Optional[Set[int]] = None
+        # Local dates whose units completed in the last scrape; None until one has run
+        self.scraped_dates: Optional[Set[date]] = None
+        self._local = threading.local()
+        self._leased_drivers = set()
+        self._leased_lock = threading.Lock()
 
     @abc.abstractmethod
-    async def scrape(self) -> List[Dict]:
+    async def scrape_unit(self, unit: ScrapeUnit) -> List[Dict]:
         """
-        Scrape tee times from the website.
-        Returns a list of dictionaries containing tee time data.
+        Scrape a single unit of work with a browser.
+        Runs on its own thread with its own driver, see browser().
         """
         pass
 
@@ -19,3 +62,123 @@ class BaseScraper(abc.ABC):
         Parse raw tee time data into a standardized format.
         """
         pass
+
+    def work_units(self) -> List[ScrapeUnit]:
+        """
+        The independent units this scrape is made of, in the order their
+        results are merged. Defaults to one unit per day of the horizon,
+        limited to `days` when set.
+        """
+        today = datetime.now(self.timezone).date()
+        return [
+            ScrapeUnit(index=i, date=today + timedelta(days=i)) for i in range(self.horizon_days)
+            if self.days is None or i in self.days
+        ]
+
+    async def scrape(self) -> List[Dict]:
+        """
+        Scrape tee times from the website with a browser.
+        Returns a list of dictionaries containing tee time data.
+        """
+        logger.info("Starting scrape for %s", self.url)
+        all_tee_times = await self.scrape_units(self.scrape_unit, blocking=True)
+        logger.info("Scraping completed. Total tee times found: %d", len(all_tee_times))
+        return all_tee_times
+
+    async def scrape_http(self) -> List[Dict]:
+        logger.info("Starting HTTP scrape for %s", self.url)
+        all_tee_times = await self.scrape_units(self.scrape_unit_http, blocking=False)
+        logger.info("HTTP scraping completed. Total tee times found: %d", len(all_tee_times))
+        return all_tee_times
+
+    async def run(self) -> List[Dict]:
+        """
+        Scrape using the HTTP fast path when the scraper supports it, falling
+        back to the Selenium scraper if it fails or finds nothing.
+        """
+        if self.supports_http and os.getenv('SCRAPE_HTTP_ENABLED', '1') != '0':
+            try:
+                tee_times = await self.scrape_http()
+                if tee_times:
+                    return tee_times
+                logger.warning("HTTP scrape of %s found no tee times, falling back to browser", self.url)
+            except Exception as e:
+                logger.warning("HTTP scrape of %s failed, falling back to browser: %s", self.url, e)
+        return await self.scrape()
+
+    async def scrape_units(self, scrape_unit: Callable[[ScrapeUnit], Awaitable[List[Dict]]], blocking: bool) -> List[Dict]:
+        """
+        Fan the work units out and merge their results in unit order.
+
+        Blocking (browser) units each run on their own thread with their own
+        driver, at most `unit_concurrency` at a time, and a failed unit only
+        loses its own day: it is left out of `scraped_dates`, so the slots
+        saved for it are not taken as sold out. Non-blocking (HTTP) units share this event loop and
+        the HTTP client's connection limit; any failure propagates so run()
+        can fall back to the browser.
+        """
+        units = self.work_units()
+        if blocking:
+            loop = asyncio.get_running_loop()
+            with ThreadPoolExecutor(max_workers=self.unit_concurrency, thread_name_prefix="scrape-unit") as executor:
+                results = await asyncio.gather(*(
+                    # Each unit thread carries the current trace span over
+                    loop.run_in_executor(executor, contextvars.copy_context().run, self._run_unit_in_thread, scrape_unit, unit)
+                    for unit in units
+                ))
+        else:
+            results = await asyncio.gather(*(scrape_unit(unit) for unit in units))
+
+        all_tee_times = []
+        for tee_times in results:
+            all_tee_times.extend(tee_times or [])
+        self.scraped_dates = {unit.date for unit, tee_times in zip(units, results) if tee_times is not None}
+        return all_tee_times
+
+    def _run_unit_in_thread(self, scrape_unit, unit: ScrapeUnit) -> Optional[List[Dict]]:
+        # None marks a failed unit, as opposed to a day with no tee times
+        try:
+            return asyncio.run(scrape_unit(unit)) or []
+        except Exception as e:
+            logger.error("Error scraping %s for %s: %s", unit.date, self.url, e)
+            return None
+
+    def stage(self, name: str, unit: ScrapeUnit):
+        """A trace span around one stage (fetch, extract or parse) of a unit's scrape."""
+        return span(f"scrape.{name}", scraper=type(self).__name__, date=unit.date.isoformat())
+
+    @property
+    def driver(self):
+        # Each unit thread has its own leased driver
+        return getattr(self._local, 'driver', None)
+
+    @driver.setter
+    def driver(self, driver):
+        self._local.driver = driver
+
+    @contextmanager
+    def browser(self, timeout: Optional[float] = None):
+        """
+        Borrow a driver from the shared pool for the duration of the block.
+        The driver is available as `self.driver` on this thread while leased.
+        """
+        with get_driver_pool().lease(timeout) as driver:
+            self.driver = driver
+            with self._leased_lock:
+                self._leased_drivers.add(driver)
+            try:
+                yield driver
+            finally:
+                with self._leased_lock:
+                    self._leased_drivers.discard(driver)
+                self.driver = None
+
+    def close(self):
+        """
+        Release any resources held by the scraper (e.g. its browsers).
+        May be called from another thread to abort a running scrape.
+        """
+        with self._leased_lock:
+            drivers = list(self._leased_drivers)
+        for driver in drivers:
+            get_driver_pool().discard(driver)
@@ -0,0 +1,223 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.remote.webdriver import WebDriver
+
+logger = logging.getLogger(__name__)
+
+DRIVER_CACHE_FILE = Path(os.getenv('CHROMEDRIVER_CACHE_FILE', Path.home() / '.cache' / 'tee-time-scraper' / 'chromedriver.json'))
+DRIVER_CACHE_MAX_AGE = 7 * 24 * 60 * 60  # seconds
+
+_driver_path_lock = threading.Lock()
+_driver_path: Optional[str] = None
+
+
+def resolve_driver_path() -> str:
+    """
+    Resolve the chromedriver binary once. The path found by webdriver_manager
+    is cached on disk so later processes skip the version lookup entirely.
+    """
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is not None:
+            return _driver_path
+
+        try:
+            cached = json.loads(DRIVER_CACHE_FILE.read_text())
+            if os.path.exists(cached['path']) and time.time() - cached['resolved_at'] < DRIVER_CACHE_MAX_AGE:
+                _driver_path = cached['path']
+                return _driver_path
+        except (OSError, ValueError, KeyError):
+            pass
+
+        from webdriver_manager.chrome import ChromeDriverManager
+        _driver_path = ChromeDriverManager().install()
+        try:
+            DRIVER_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            DRIVER_CACHE_FILE.write_text(json.dumps({'path': _driver_path, 'resolved_at': time.time()}))
+        except OSError as e:
+            logger.warning("Could not cache chromedriver path: %s", e)
+        return _driver_path
+
+
+def create_chrome_driver(headless: bool = True) -> WebDriver:
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    return webdriver.Chrome(service=Service(resolve_driver_path()), options=options)
+
+
+class DriverPool:
+    """
+    A fixed-size pool of browser sessions shared by all scrapers.
+
+    Drivers are leased with `lease()` and returned when the block exits.
+    Idle drivers are health-checked before being handed out, and a driver is
+    recycled after `max_uses` leases so long-lived Chrome processes do not
+    accumulate state.
+    """
+
+    def __init__(self, size: int = 2, max_uses: int = 20, warm_sessions: int = 1, headless: bool = True,
+                 driver_factory: Optional[Callable[[], WebDriver]] = None):
+        self.size = size
+        self.max_uses = max_uses
+        self.warm_sessions = min(warm_sessions, size)
+        self._driver_factory = driver_factory or (lambda: create_chrome_driver(headless=headless))
+        self._condition = threading.Condition()
+        self._idle: List[WebDriver] = []
+        self._uses: Dict[int, int] = {}
+        self._leased = set()
+        self._discarded = set()
+        self._spawning = 0
+        self._closed = False
+
+    @classmethod
+    def from_env(cls) -> "DriverPool":
+        return cls(
+            size=int(os.getenv('DRIVER_POOL_SIZE', os.getenv('SCRAPE_MAX_BROWSERS', 2))),
+            max_uses=int(os.getenv('DRIVER_MAX_USES', 20)),
+            warm_sessions=int(os.getenv('DRIVER_POOL_WARM', 1)),
+            headless=os.getenv('CHROME_HEADLESS', '1') != '0'
+        )
+
+    @property
+    def total(self) -> int:
+        return len(self._idle) + len(self._leased) + self._spawning
+
+    def warm(self):
+        """Pre-spawn `warm_sessions` idle drivers so the first scrape skips Chrome startup."""
+        while True:
+            with self._condition:
+                if self._closed or len(self._idle) + self._spawning >= self.warm_sessions or self.total >= self.size:
+                    return
+                self._spawning += 1
+            driver = self._spawn()
+            with self._condition:
+                self._spawning -= 1
+                if driver is not None:
+                    self._idle.append(driver)
+                self._condition.notify()
+            if driver is None:
+                return
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def acquire(self, timeout: Optional[float] = None) -> WebDriver:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._condition:
+                while not self._idle and self.total >= self.size:
+                    if self._closed:
+                        raise RuntimeError("Driver pool is shut down")
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"No browser available within {timeout}s")
+                    self._condition.wait(remaining)
+                if self._closed:
+                    raise RuntimeError("Driver pool is shut down")
+                if self._idle:
+                    driver = self._idle.pop()
+                    self._leased.add(id(driver))
+                else:
+                    driver = None
+                    self._spawning += 1
+
+            if driver is None:
+                driver = self._spawn()
+                with self._condition:
+                    self._spawning -= 1
+                    if driver is None:
+                        self._condition.notify()
+                        raise RuntimeError("Could not start a browser")
+                    self._leased.add(id(driver))
+                return driver
+
+            if self._is_healthy(driver):
+                return driver
+            logger.info("Discarding unhealthy browser session")
+            with self._condition:
+                self._leased.discard(id(driver))
+                self._condition.notify()
+            self._quit(driver)
+
+    def release(self, driver: WebDriver):
+        with self._condition:
+            self._leased.discard(id(driver))
+            discarded = id(driver) in self._discarded
+            self._discarded.discard(id(driver))
+            uses = self._uses.get(id(driver), 0) + 1
+            self._uses[id(driver)] = uses
+            recycle = discarded or self._closed or uses >= self.max_uses
+            if not recycle:
+                self._idle.append(driver)
+            self._condition.notify()
+        if recycle:
+            self._quit(driver)
+
+    def discard(self, driver: WebDriver):
+        """Quit a leased driver now (e.g. to abort a hung scrape); it is not returned to the pool."""
+        with self._condition:
+            self._discarded.add(id(driver))
+        self._quit(driver)
+
+    def shutdown(self):
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for driver in idle:
+            self._quit(driver)
+
+    def _spawn(self) -> Optional[WebDriver]:
+        try:
+            return self._driver_factory()
+        except Exception as e:
+            logger.error("Error starting browser: %s", e)
+            return None
+
+    @staticmethod
+    def _is_healthy(driver: WebDriver) -> bool:
+        try:
+            driver.get("about:blank")
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _quit(self, driver: WebDriver):
+        with self._condition:
+            self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+
+_pool_lock = threading.Lock()
+_pool: Optional[DriverPool] = None
+
+
+def get_driver_pool() -> DriverPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool.from_env()
+        return _pool
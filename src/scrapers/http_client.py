@@ -0,0 +1,40 @@
+import asyncio
+import os
+import weakref
+
+import httpx
+from bs4 import BeautifulSoup, FeatureNotFound
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+
+# One pooled client per event loop; httpx clients cannot be shared across loops
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        max_connections = int(os.getenv('HTTP_MAX_CONNECTIONS', 10))
+        client = httpx.AsyncClient(
+            headers={'User-Agent': USER_AGENT},
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(float(os.getenv('HTTP_TIMEOUT_SECONDS', 15))),
+            follow_redirects=True
+        )
+        _clients[loop] = client
+    return client
+
+
+async def close_http_client():
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def parse_html(html: str) -> BeautifulSoup:
+    # lxml is considerably faster when installed; html.parser always works
+    try:
+        return BeautifulSoup(html, "lxml")
+    except FeatureNotFound:
+        return BeautifulSoup(html, "html.parser")
@@ -0,0 +1,273 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Dict, Mapping, Optional, Set, Tuple, Type
+
+from src.monitoring.metrics import Counter
+from .orchestrator import PersistCallback, ScrapeOrchestrator
+
+if TYPE_CHECKING:
+    from .base_scraper import BaseScraper
+
+logger = logging.getLogger(__name__)
+
+SCRAPE_JOB_REQUESTS = Counter(
+    "scrape_job_requests_total", "Scrape requests by whether they started, joined or reused a job", labelnames=("outcome",)
+)
+
+# A course locked by another worker that has not recorded its job yet is retried this often
+CLAIM_ATTEMPTS = 20
+CLAIM_RETRY_SECONDS = 0.05
+
+
+@dataclass(eq=False)
+class ScrapeJob:
+    id: str
+    course: str
+    status: str = "running"
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[datetime] = None
+    tee_times_found: Optional[int] = None
+    duration_seconds: Optional[float] = None
+    error: Optional[str] = None
+    # Only set on the worker running the job
+    task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status != "running"
+
+    @classmethod
+    def from_record(cls, record: Dict) -> "ScrapeJob":
+        return cls(**record)
+
+    def record(self) -> Dict:
+        """The fields a job store keeps."""
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.name != "task"}
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "course": self.course,
+            "status": self.status,
+            "createdAt": self.created_at.isoformat(),
+            "finishedAt": self.finished_at.isoformat() if self.finished_at else None,
+            "teeTimesFound": self.tee_times_found,
+            "durationSeconds": round(self.duration_seconds, 3) if self.duration_seconds is not None else None,
+            "error": self.error
+        }
+
+
+class CourseLock:
+    def __init__(self, locked: Set[str], course: str, guard: threading.Lock):
+        self._locked = locked
+        self._course = course
+        self._guard = guard
+
+    def release(self):
+        with self._guard:
+            self._locked.discard(self._course)
+
+
+class MemoryScrapeJobStore:
+    """
+    Scrape jobs kept in this process, for a single worker. Same interface as
+    PostgresScrapeJobStore, which every worker shares.
+    """
+
+    def __init__(self):
+        self._jobs: "OrderedDict[str, Dict]" = OrderedDict()
+        self._locked: Set[str] = set()
+        self._guard = threading.Lock()
+
+    def try_lock(self, course: str) -> Optional[CourseLock]:
+        with self._guard:
+            if course in self._locked:
+                return None
+            self._locked.add(course)
+            return CourseLock(self._locked, course, self._guard)
+
+    def start(self, job: Dict):
+        with self._guard:
+            self._jobs[job["id"]] = dict(job)
+
+    def finish(self, job: Dict):
+        with self._guard:
+            if job["id"] in self._jobs:
+                self._jobs[job["id"]].update(job)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._guard:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def running(self, course: str) -> Optional[Dict]:
+        return self._latest(course, "running", "created_at")
+
+    def last_success(self, course: str) -> Optional[Dict]:
+        return self._latest(course, "succeeded", "finished_at")
+
+    def _latest(self, course: str, status: str, order_by: str) -> Optional[Dict]:
+        with self._guard:
+            jobs = [job for job in self._jobs.values() if job["course"] == course and job["status"] == status]
+        return dict(max(jobs, key=lambda job: job[order_by])) if jobs else None
+
+    def prune(self, max_jobs: int):
+        # Oldest finished jobs go first. Running jobs and each course's last
+        # success stay, and those are bounded by the number of courses
+        with self._guard:
+            excess = len(self._jobs) - max_jobs
+            if excess <= 0:
+                return
+            last_successes = {}
+            for job in self._jobs.values():
+                if job["status"] == "succeeded":
+                    last = last_successes.get(job["course"])
+                    if last is None or job["finished_at"] >= last["finished_at"]:
+                        last_successes[job["course"]] = job
+            evictable = [
+                job_id for job_id, job in self._jobs.items()
+                if job["status"] != "running" and last_successes.get(job["course"]) is not job
+            ]
+            for job_id in evictable[:excess]:
+                del self._jobs[job_id]
+
+
+class ScrapeJobManager:
+    """
+    Runs scrapes as jobs with IDs, at most one per course at a time.
+
+    Requesting a course that is already being scraped joins the running job,
+    and a course whose last job succeeded less than `freshness_seconds` ago
+    returns that job instead of scraping again. Finished jobs are kept for
+    status lookups until more than `max_jobs` have piled up.
+
+    Jobs live in `store`. The default keeps them in this process; with
+    several workers use PostgresScrapeJobStore, so a course is scraped by one
+    worker at a time and any worker can report on a job. The scheduler runs
+    its scrapes through the manager too, so requests join those.
+    """
+
+    def __init__(self, orchestrator: ScrapeOrchestrator, scrapers: Mapping[str, Type["BaseScraper"]], persist: PersistCallback,
+                 freshness_seconds: float = 300, max_jobs: int = 1000, store=None):
+        self.orchestrator = orchestrator
+        self.scrapers = scrapers
+        self.persist = persist
+        self.freshness_seconds = freshness_seconds
+        self.max_jobs = max_jobs
+        self.store = store if store is not None else MemoryScrapeJobStore()
+        # Jobs this process is running, by course
+        self._running: Dict[str, ScrapeJob] = {}
+        self._claiming: Dict[str, asyncio.Lock] = {}
+
+    @classmethod
+    def from_env(cls, orchestrator: ScrapeOrchestrator, scrapers: Mapping[str, Type["BaseScraper"]],
+                 persist: PersistCallback, store=None) -> "ScrapeJobManager":
+        return cls(
+            orchestrator,
+            scrapers,
+            persist,
+            freshness_seconds=float(os.getenv('SCRAPE_JOB_FRESHNESS_SECONDS', 300)),
+            max_jobs=int(os.getenv('SCRAPE_JOB_HISTORY', 1000)),
+            store=store
+        )
+
+    async def submit(self, course: str, force: bool = False, days: Optional[Set[int]] = None) -> Tuple[ScrapeJob, str]:
+        """
+        Returns the job scraping `course` and whether it was "started",
+        "joined" (already running, here or on another worker) or "reused"
+        (fresh enough; `force` skips this). `days` limits a started scrape to
+        some day offsets, see ScrapeOrchestrator.run_one().
+        """
+        running = self._running.get(course)
+        if running is not None:
+            return self._counted(running, "joined")
+        # Requests on this worker wait for each other, so only one of them claims the course
+        async with self._claiming.setdefault(course, asyncio.Lock()):
+            running = self._running.get(course)
+            if running is not None:
+                return self._counted(running, "joined")
+            job, outcome, lock = await asyncio.to_thread(self._claim, course, force)
+            if outcome == "started":
+                self._running[course] = job
+                job.task = asyncio.get_running_loop().create_task(self._run(job, lock, days))
+            return self._counted(job, outcome)
+
+    async def get(self, job_id: str) -> Optional[ScrapeJob]:
+        for job in self._running.values():
+            if job.id == job_id:
+                return job
+        record = await asyncio.to_thread(self.store.get, job_id)
+        return ScrapeJob.from_record(record) if record is not None else None
+
+    def _claim(self, course: str, force: bool):
+        # Runs off the event loop; the store may be Postgres
+        for _ in range(CLAIM_ATTEMPTS):
+            lock = self.store.try_lock(course)
+            if lock is None:
+                running = self.store.running(course)
+                if running is not None:
+                    return ScrapeJob.from_record(running), "joined", None
+                # Its runner has the lock but has not recorded the job yet, or just finished
+                time.sleep(CLAIM_RETRY_SECONDS)
+                continue
+            try:
+                last = None if force else self.store.last_success(course)
+                if last is not None and (datetime.now(timezone.utc) - last["finished_at"]).total_seconds() < self.freshness_seconds:
+                    lock.release()
+                    return ScrapeJob.from_record(last), "reused", None
+                job = ScrapeJob(id=uuid.uuid4().hex, course=course)
+                self.store.start(job.record())
+                self.store.prune(self.max_jobs)
+                return job, "started", lock
+            except Exception:
+                lock.release()
+                raise
+        raise RuntimeError(f"Could not claim a scrape of {course}")
+
+    async def _run(self, job: ScrapeJob, lock, days: Optional[Set[int]]):
+        try:
+            # The first lookup of a course imports its scraper; keep that off the event loop
+            scraper_class = await asyncio.to_thread(self.scrapers.__getitem__, job.course)
+            result = await self.orchestrator.run_one(job.course, scraper_class, self.persist, days=days)
+            job.tee_times_found, job.duration_seconds, job.error = result.tee_times_found, result.duration_seconds, result.error
+            job.status = "failed" if result.error else "succeeded"
+        except asyncio.CancelledError:
+            job.status, job.error = "failed", "Cancelled"
+            raise
+        except Exception as e:
+            job.status, job.error = "failed", str(e) or type(e).__name__
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            job.task = None
+            try:
+                await asyncio.to_thread(self._finish, job, lock)
+            finally:
+                self._running.pop(job.course, None)
+            if job.status == "succeeded":
+                logger.info("Scrape job %s found %d tee times for %s in %.1fs",
+                            job.id, job.tee_times_found, job.course, job.duration_seconds)
+
+    def _finish(self, job: ScrapeJob, lock):
+        try:
+            self.store.finish(job.record())
+        except Exception as e:
+            logger.error("Error recording scrape job %s: %s", job.id, e)
+        finally:
+            lock.release()
+
+    def _counted(self, job: ScrapeJob, outcome: str) -> Tuple[ScrapeJob, str]:
+        SCRAPE_JOB_REQUESTS.inc(outcome=outcome)
+        return job, outcome
+
+    async def stop(self):
+        tasks = [job.task for job in self._running.values() if job.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,105 +1,149 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from .base_scraper import BaseScraper
-from typing import List, Dict
+from .base_scraper import BaseScraper, ScrapeUnit
+from typing import List, Dict, Optional
 from datetime import datetime
-import time
-from selenium.common.exceptions import TimeoutException, StaleElementReferenceException, NoSuchElementException
-import pytz
+from selenium.common.exceptions import TimeoutException
+from .http_client import parse_html
+from .waits import WaitStrategy
+from src.utils.datetimes import localize
+import logging
+
+logger = logging.getLogger(__name__)
+
+# How long a calendar click has to start its postback
+POSTBACK_START_SECONDS = 2
+
+TEE_TIME_ROWS_SELECTOR = "#dnn_ctr1325_DefaultView_ctl01_dlTeeTimes > span"
+
+# Selector for each raw field, relative to a tee time row
+RAW_FIELD_SELECTORS = {
+    'date': "span[id^='dnn_ctr1325_DefaultView_ctl01_dlTeeTimes_lblTeeDate_']",
+    'time': "span[id^='dnn_ctr1325_DefaultView_ctl01_dlTeeTimes_lblTeeTime_']",
+    'price': "span[id^='dnn_ctr1325_DefaultView_ctl01_dlTeeTimes_lblPlayers_']",
+    'availability': "select[id^='ddlNumPlayers']",
+    'course_name': "span[id^='dnn_ctr1325_DefaultView_ctl01_dlTeeTimes_lblCourseName_']",
+    'starting_hole': "span[id^='dnn_ctr1325_DefaultView_ctl01_dlTeeTimes_lblStartTee_']"
+}
+
+# Returns the raw dict of every row at once. innerText matches WebElement.text;
+# the availability <select> uses textContent, as extract_raw_data() does.
+EXTRACT_ROWS_SCRIPT = """
+const [rowsSelector, fields] = arguments;
+return Array.from(document.querySelectorAll(rowsSelector)).map(row => {
+    const raw = {};
+    for (const [name, selector] of Object.entries(fields)) {
+        const element = row.querySelector(selector);
+        if (!element) {
+            raw[name] = null;
+        } else {
+            raw[name] = name === 'availability' ? element.textContent : element.innerText.trim();
+        }
+    }
+    return raw;
+});
+"""
 
 class MayfairLakesScraper(BaseScraper):
-    def __init__(self):
+    # Calendar items past the last bookable day simply don't exist, see scrape_unit()
+    default_horizon_days = 14
+
+    def __init__(self, horizon_days: Optional[int] = None):
         url = "https://mayfairlakes.totaleintegrated.com/Book-a-Tee-Time"
-        super().__init__(url)
+        super().__init__(url, horizon_days=horizon_days)
         self.course_name = "Mayfair Lakes"
-        self.timezone = pytz.timezone('America/Vancouver')
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service)
-        print("MayfairLakesScraper initialized")
-
-    async def scrape(self) -> List[Dict]:
-        print(f"Starting scrape for {self.url}")
-        self.driver.get(self.url)
-        
-        all_tee_times = []
-        calendar_item_index = 0
-        
-        while True:
-        # for calendar_item_index in range(2):
-            calendar_item_id = f"customcaleder_{calendar_item_index}"
-            print(f"Attempting to find tee times for calendar item: {calendar_item_id}")
-            
-            try:
-                calendar_item = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.ID, calendar_item_id))
-                )
-                
-                self.driver.execute_script("arguments[0].click();", calendar_item)
-                print(f"Clicked on calendar item: {calendar_item_id}")
-                
-                # Wait for the page to update after clicking
-                time.sleep(3)  # Add a 3-second delay
-
-                # Wait for either tee times to load or "No Tee Times Available" message
+        logger.debug("MayfairLakesScraper initialized")
+
+    async def scrape_unit(self, unit: ScrapeUnit) -> List[Dict]:
+        # Calendar item N is the day N days from today
+        calendar_item_id = f"customcaleder_{unit.index}"
+        tee_times = []
+
+        with self.stage("fetch", unit), self.browser():
+            waits = WaitStrategy(self.driver, "mayfair_lakes")
+            self.driver.get(self.url)
+            logger.debug("Attempting to find tee times for calendar item: %s", calendar_item_id)
+
+            # The calendar renders all of its days at once, so once the first
+            # item is clickable a missing item means there is nothing to book
+            WebDriverWait(self.driver, 10).until(
+                EC.element_to_be_clickable((By.ID, "customcaleder_0"))
+            )
+            calendar_items = self.driver.find_elements(By.ID, calendar_item_id)
+            if not calendar_items:
+                logger.info("Calendar item %s not found. Nothing to scrape.", calendar_item_id)
+                return tee_times
+
+            # The page loads with today selected, and clicking the day already shown may not post back
+            if "selected" in (calendar_items[0].get_attribute("class") or "").split():
+                logger.debug("Calendar item %s is already selected", calendar_item_id)
+            else:
+                # The postback replaces the tee sheet, or the calendar when the day had none;
+                # until that element goes stale the old day's page is still showing
+                previous_page = self.driver.find_elements(By.ID, "dnn_ctr1325_DefaultView_ctl01_dlTeeTimes") or calendar_items
+                self.driver.execute_script("arguments[0].click();", calendar_items[0])
+                logger.debug("Clicked on calendar item: %s", calendar_item_id)
                 try:
-                    WebDriverWait(self.driver, 10).until(
-                        EC.presence_of_element_located((By.ID, "dnn_ctr1325_DefaultView_ctl01_dlTeeTimes"))
-                    )
-                    print(f"Tee times found for calendar item: {calendar_item_id}")
-                    
-                    tee_times_found = True
+                    # Only long enough for the postback to start; network_idle() waits for it to finish
+                    waits.staleness_of(previous_page[0], timeout=POSTBACK_START_SECONDS)
                 except TimeoutException:
-                    print(f"No tee times available for calendar item: {calendar_item_id}")
-                    tee_times_found = False
-                
-                if tee_times_found:
-                    # Process tee times without date verification
-                    tee_time_elements = WebDriverWait(self.driver, 10).until(
-                        EC.presence_of_all_elements_located((By.CSS_SELECTOR, "#dnn_ctr1325_DefaultView_ctl01_dlTeeTimes > span"))
-                    )
-                    print(f"Found {len(tee_time_elements)} tee time elements")
-                    
-                    for i, element in enumerate(tee_time_elements):
-                        try:
-                            print(f"Processing tee time {i+1}")
-                            raw_data = self.extract_raw_data(element)
-                            parsed_data = await self.parse_tee_time(raw_data)
-                            if parsed_data not in all_tee_times:
-                                all_tee_times.append(parsed_data)
-                        except StaleElementReferenceException:
-                            print(f"Stale element encountered for tee time {i+1}. Retrying...")
-                            # Refresh the list of elements and retry
-                            tee_time_elements = WebDriverWait(self.driver, 10).until(
-                                EC.presence_of_all_elements_located((By.CSS_SELECTOR, "#dnn_ctr1325_DefaultView_ctl01_dlTeeTimes > span"))
-                            )
-                            if i < len(tee_time_elements):
-                                element = tee_time_elements[i]
-                                raw_data = self.extract_raw_data(element)
-                                parsed_data = await self.parse_tee_time(raw_data)
-                                if parsed_data not in all_tee_times:
-                                    all_tee_times.append(parsed_data)
-                            else:
-                                print(f"Tee time {i+1} no longer available")
-                        except Exception as e:
-                            print(f"Error processing tee time {i+1}: {str(e)}")
-                
-                time.sleep(2)
-                calendar_item_index += 1
-                
-            except TimeoutException:
-                print(f"Calendar item {calendar_item_id} not found. Scraping complete.")
-                break
-            except Exception as e:
-                print(f"An error occurred while processing {calendar_item_id}: {str(e)}")
-                break
-        
-        self.driver.quit()
-        print(f"Scraping completed. Total tee times found: {len(all_tee_times)}")
-        return all_tee_times
+                    logger.debug("Page did not change after clicking calendar item: %s", calendar_item_id)
+            waits.network_idle()
+
+            # Once the page is idle it shows either the tee sheet or "No Tee Times Available"
+            if not self.driver.find_elements(By.ID, "dnn_ctr1325_DefaultView_ctl01_dlTeeTimes"):
+                logger.info("No tee times available for calendar item: %s", calendar_item_id)
+                return tee_times
+            logger.debug("Tee times found for calendar item: %s", calendar_item_id)
+            waits.row_count_stable(TEE_TIME_ROWS_SELECTOR)
+
+            # Read every row in one round-trip instead of six find_element calls per row
+            with self.stage("extract", unit):
+                raw_rows = self.extract_all_raw_data()
+            logger.debug("Found %d tee time elements", len(raw_rows))
+
+        with self.stage("parse", unit):
+            for i, raw_data in enumerate(raw_rows):
+                try:
+                    parsed_data = await self.parse_tee_time(raw_data)
+                    if parsed_data not in tee_times:
+                        tee_times.append(parsed_data)
+                except Exception as e:
+                    logger.warning("Error processing tee time %d: %s", i + 1, e)
+        return tee_times
+
+    def extract_all_raw_data(self) -> List[Dict]:
+        rows = self.driver.execute_script(EXTRACT_ROWS_SCRIPT, TEE_TIME_ROWS_SELECTOR, RAW_FIELD_SELECTORS)
+        return self._complete_rows(rows)
+
+    def extract_raw_data_from_html(self, html: str) -> List[Dict]:
+        """
+        Offline equivalent of extract_all_raw_data() for a page_source snapshot.
+        """
+        rows = []
+        for row in parse_html(html).select(TEE_TIME_ROWS_SELECTOR):
+            raw = {}
+            for name, selector in RAW_FIELD_SELECTORS.items():
+                element = row.select_one(selector)
+                if element is None:
+                    raw[name] = None
+                elif name == 'availability':
+                    raw[name] = element.get_text()
+                else:
+                    raw[name] = ' '.join(element.get_text(' ').split())
+            rows.append(raw)
+        return self._complete_rows(rows)
+
+    def _complete_rows(self, rows: List[Dict]) -> List[Dict]:
+        complete = []
+        for i, raw in enumerate(rows):
+            missing = [name for name, value in raw.items() if value is None]
+            if missing:
+                logger.warning("Error processing tee time %d: missing %s", i + 1, ', '.join(missing))
+            else:
+                complete.append(raw)
+        return complete
 
     def extract_raw_data(self, element) -> Dict:
         date = element.find_element(By.CSS_SELECTOR, "span[id^='dnn_ctr1325_DefaultView_ctl01_dlTeeTimes_lblTeeDate_']").text
@@ -109,7 +153,8 @@ class MayfairLakesScraper(BaseScraper):
         course_name = element.find_element(By.CSS_SELECTOR, "span[id^='dnn_ctr1325_DefaultView_ctl01_dlTeeTimes_lblCourseName_']").text
         starting_hole = element.find_element(By.CSS_SELECTOR, "span[id^='dnn_ctr1325_DefaultView_ctl01_dlTeeTimes_lblStartTee_']").text
         
-        print(f"Raw data: Date: {date}, Time: {time}, Price: {price}, Availability: {availability}, Course: {course_name}, Starting Hole: {starting_hole}")
+        logger.debug("Raw data: Date: %s, Time: %s, Price: %s, Availability: %s, Course: %s, Starting Hole: %s",
+                     date, time, price, availability, course_name, starting_hole)
         return {
             'date': date,
             'time': time,
@@ -125,14 +170,9 @@ class MayfairLakesScraper(BaseScraper):
         datetime_str = f"{date} {time}"
         naive_datetime = datetime.strptime(datetime_str, "%m/%d/%Y %I:%M %p")
         
-        # Localize the naive datetime to Vancouver time
-        localized_datetime = self.timezone.localize(naive_datetime)
-        
-        # Convert to UTC before returning
-        utc_datetime = localized_datetime.astimezone(pytz.UTC)
-        print(
-            f"Localized datetime: {localized_datetime}, UTC datetime: {utc_datetime}"
-        )
+        # The tee sheet shows Vancouver time; hand over UTC
+        utc_datetime = localize(naive_datetime, self.timezone_name)
+        logger.debug("Local datetime: %s, UTC datetime: %s", naive_datetime, utc_datetime)
         
         price = float(raw_data['price'].split('$')[1].split('/')[0])
         
@@ -151,14 +191,14 @@ class MayfairLakesScraper(BaseScraper):
         starting_hole = int(starting_hole) if starting_hole else 1  # Default to 1 if no digits found
         
         parsed_data = {
-            'datetime': utc_datetime.isoformat(),
+            'datetime': utc_datetime,
             'price': price,
             'currency': 'CAD',
             'available_booking_sizes': availability,
             'course_name': raw_data['course_name'],
             'starting_hole': starting_hole
         }
-        print(f"Parsed data: {parsed_data}")
+        logger.debug("Parsed data: %s", parsed_data)
         return parsed_data
 
     def get_expected_date(self, calendar_index):
@@ -169,8 +209,3 @@ class MayfairLakesScraper(BaseScraper):
         base_date = datetime.now().date()
         expected_date = base_date + timedelta(days=calendar_index)
         return expected_date.strftime("%m/%d/%Y")
-
-    def __del__(self):
-        if hasattr(self, 'driver'):
-            self.driver.quit()
-        print("MayfairLakesScraper instance destroyed")
@@ -0,0 +1,146 @@
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple, Type
+
+from src.monitoring.metrics import Counter, Gauge, Histogram
+from src.monitoring.tracing import span
+
+if TYPE_CHECKING:
+    # Only for annotations, so importing this module does not load Selenium
+    from .base_scraper import BaseScraper
+
+logger = logging.getLogger(__name__)
+
+SCRAPE_SECONDS = Histogram(
+    "scrape_duration_seconds", "Duration of course scrapes including persisting, by course and outcome",
+    labelnames=("course", "status"), buckets=(1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200)
+)
+SCRAPE_TEE_TIMES = Gauge("scrape_tee_times", "Tee times found by the latest scrape of each course", labelnames=("course",))
+SCRAPE_TEE_TIMES_TOTAL = Counter("scrape_tee_times_total", "Tee times found by scrapes, by course", labelnames=("course",))
+
+# Called with the course, its tee times and the local dates the scrape
+# covered in full (None when the scraper does not say)
+PersistCallback = Callable[[str, List[Dict], Optional[Set[date]]], None]
+
+
+@dataclass
+class ScrapeResult:
+    course: str
+    tee_times_found: int = 0
+    duration_seconds: float = 0.0
+    error: Optional[str] = None
+
+
+class ScrapeOrchestrator:
+    """
+    Runs scrapers concurrently on a bounded thread pool so their blocking
+    Selenium calls never run on the event loop.
+
+    Each course runs at most `per_course_limit` scrapes at a time, at most
+    `max_browsers` scrapes hold a browser at once, and each scrape is aborted
+    after `timeout_seconds`. Results are persisted as soon as each scraper
+    finishes.
+    """
+
+    def __init__(self, max_workers: int = 4, max_browsers: int = 2, per_course_limit: int = 1,
+                 timeout_seconds: float = 600, abort_grace_seconds: float = 30):
+        self.max_workers = max_workers
+        self.max_browsers = max_browsers
+        self.per_course_limit = per_course_limit
+        self.timeout_seconds = timeout_seconds
+        self.abort_grace_seconds = abort_grace_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scraper")
+        self._thread_state = threading.local()
+        self._browser_slots: Optional[asyncio.Semaphore] = None
+        self._course_slots: Dict[str, asyncio.Semaphore] = {}
+
+    @classmethod
+    def from_env(cls) -> "ScrapeOrchestrator":
+        return cls(
+            max_workers=int(os.getenv('SCRAPE_MAX_WORKERS', 4)),
+            max_browsers=int(os.getenv('SCRAPE_MAX_BROWSERS', 2)),
+            per_course_limit=int(os.getenv('SCRAPE_PER_COURSE_LIMIT', 1)),
+            timeout_seconds=float(os.getenv('SCRAPE_TIMEOUT_SECONDS', 600))
+        )
+
+    async def run(self, scrapers: Dict[str, Type["BaseScraper"]], persist: PersistCallback) -> Dict[str, ScrapeResult]:
+        results = await asyncio.gather(*(
+            self.run_one(course, scraper_class, persist) for course, scraper_class in scrapers.items()
+        ))
+        return {result.course: result for result in results}
+
+    async def run_one(self, course: str, scraper_class: Type["BaseScraper"], persist: PersistCallback,
+                      days: Optional[Set[int]] = None) -> ScrapeResult:
+        loop = asyncio.get_running_loop()
+        result = ScrapeResult(course=course)
+
+        async with self._course_slot(course):
+            started = time.perf_counter()
+            try:
+                with span("scrape", course=course):
+                    async with self._browser_slot():
+                        tee_times, scraped_dates = await self._scrape(course, scraper_class, days)
+                    result.tee_times_found = len(tee_times)
+                    SCRAPE_TEE_TIMES.set(len(tee_times), course=course)
+                    SCRAPE_TEE_TIMES_TOTAL.inc(len(tee_times), course=course)
+                    await loop.run_in_executor(self._executor, contextvars.copy_context().run, persist, course, tee_times, scraped_dates)
+            except Exception as e:
+                result.error = str(e) or type(e).__name__
+                logger.error("Error during scraping of %s: %s", course, result.error)
+            result.duration_seconds = time.perf_counter() - started
+            SCRAPE_SECONDS.observe(result.duration_seconds, course=course, status="error" if result.error else "ok")
+
+        return result
+
+    async def _scrape(self, course: str, scraper_class: Type["BaseScraper"],
+                      days: Optional[Set[int]] = None) -> Tuple[List[Dict], Optional[Set[date]]]:
+        loop = asyncio.get_running_loop()
+        holder = {}
+        # Copying the context carries the current trace span over to the worker thread
+        future = loop.run_in_executor(self._executor, contextvars.copy_context().run, self._run_scraper, scraper_class, holder, days)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            logger.warning("Scrape of %s exceeded %ss, aborting", course, self.timeout_seconds)
+            scraper = holder.get('scraper')
+            if scraper is not None:
+                await loop.run_in_executor(None, scraper.close)
+            # Keep the browser slot until the worker has actually let go of its browser
+            await asyncio.wait({future}, timeout=self.abort_grace_seconds)
+            raise TimeoutError(f"Scrape timed out after {self.timeout_seconds}s")
+
+    def _run_scraper(self, scraper_class: Type["BaseScraper"], holder: Dict,
+                     days: Optional[Set[int]] = None) -> Tuple[List[Dict], Optional[Set[date]]]:
+        # Each worker thread keeps one event loop, so pooled HTTP clients
+        # survive from one scrape to the next
+        loop = getattr(self._thread_state, 'loop', None)
+        if loop is None:
+            loop = self._thread_state.loop = asyncio.new_event_loop()
+        scraper = scraper_class()
+        scraper.days = days
+        holder['scraper'] = scraper
+        try:
+            tee_times = loop.run_until_complete(scraper.run())
+            return tee_times, scraper.scraped_dates
+        finally:
+            scraper.close()
+
+    def _course_slot(self, course: str) -> asyncio.Semaphore:
+        if course not in self._course_slots:
+            self._course_slots[course] = asyncio.Semaphore(self.per_course_limit)
+        return self._course_slots[course]
+
+    def _browser_slot(self) -> asyncio.Semaphore:
+        if self._browser_slots is None:
+            self._browser_slots = asyncio.Semaphore(self.max_browsers)
+        return self._browser_slots
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,66 @@
+import importlib
+import os
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, Mapping, Optional, Type
+
+if TYPE_CHECKING:
+    from .base_scraper import BaseScraper
+
+CONFIG_FILE = Path(__file__).resolve().parents[2] / "config.yml"
+
+
+class ScraperRegistry(Mapping[str, Type["BaseScraper"]]):
+    """
+    Course keys to scraper classes, from "module:ClassName" paths.
+
+    Membership and iteration only read the paths; a class (and Selenium,
+    through its module) is imported the first time its course is looked up,
+    which is when a scrape runs. Works anywhere the scrapers dict did.
+    """
+
+    def __init__(self, paths: Dict[str, str]):
+        self.paths = dict(paths)
+        self._classes: Dict[str, Type["BaseScraper"]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, path: Optional[str] = None) -> "ScraperRegistry":
+        """Reads the `scrapers` section of SCRAPER_CONFIG, by default config.yml at the project root."""
+        import yaml
+
+        config_file = Path(path or os.getenv('SCRAPER_CONFIG') or CONFIG_FILE)
+        config = yaml.safe_load(config_file.read_text()) or {}
+        return cls(config.get('scrapers') or {})
+
+    def __getitem__(self, course: str) -> Type["BaseScraper"]:
+        path = self.paths[course]
+        with self._lock:
+            if course not in self._classes:
+                self._classes[course] = self._resolve(course, path)
+            return self._classes[course]
+
+    def __contains__(self, course) -> bool:
+        # Mapping's default would look the class up, importing it
+        return course in self.paths
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.paths)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def load_all(self):
+        """Import every scraper now, e.g. on a worker thread ahead of the first scheduled scrape."""
+        for course in self.paths:
+            self[course]
+
+    def loaded(self) -> Dict[str, bool]:
+        return {course: course in self._classes for course in self.paths}
+
+    @staticmethod
+    def _resolve(course: str, path: str) -> Type["BaseScraper"]:
+        module_name, _, class_name = path.partition(":")
+        if not module_name or not class_name:
+            raise ValueError(f"Scraper for '{course}' must be 'module:ClassName', got '{path}'")
+        return getattr(importlib.import_module(module_name), class_name)
@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import os
+import random
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Type
+
+if TYPE_CHECKING:
+    from .base_scraper import BaseScraper
+    from .jobs import ScrapeJobManager
+from .orchestrator import PersistCallback, ScrapeOrchestrator
+
+logger = logging.getLogger(__name__)
+
+# Near-term days change fastest, so they are refreshed more often
+DEFAULT_SCHEDULE = "0-2:900,3-:3600"
+MAX_DAYS = 366
+
+
+@dataclass
+class ScrapeTier:
+    """A range of day offsets scraped every `interval_seconds`; last_day None means to the horizon."""
+    first_day: int
+    last_day: Optional[int]
+    interval_seconds: float
+
+    def days(self) -> Set[int]:
+        return set(range(self.first_day, (self.last_day if self.last_day is not None else MAX_DAYS) + 1))
+
+
+def parse_schedule(spec: str) -> List[ScrapeTier]:
+    """Parse "0-2:900,3-:3600" into tiers: days 0-2 every 15 minutes, day 3 onwards hourly."""
+    tiers = []
+    for part in spec.split(','):
+        try:
+            days, interval = part.strip().split(':')
+            first_day, _, last_day = days.partition('-')
+            tier = ScrapeTier(int(first_day), int(last_day) if last_day else None, float(interval))
+        except ValueError:
+            raise ValueError(f"Invalid scrape schedule '{spec}'. Use e.g. {DEFAULT_SCHEDULE}")
+        if tier.interval_seconds <= 0:
+            raise ValueError(f"Invalid scrape schedule '{spec}': intervals must be positive")
+        tiers.append(tier)
+    return tiers
+
+
+def schedule_from_env(course: str) -> List[ScrapeTier]:
+    # SCRAPE_SCHEDULE_MAYFAIR_LAKES overrides SCRAPE_SCHEDULE for one course
+    return parse_schedule(os.getenv(f'SCRAPE_SCHEDULE_{course.upper()}', os.getenv('SCRAPE_SCHEDULE', DEFAULT_SCHEDULE)))
+
+
+class ScrapeScheduler:
+    """
+    Scrapes every course on its own cadence from the API process.
+
+    Each course has tiers of days with their own interval; tiers that are due
+    together are merged into one scrape, and a course is never scraped twice
+    at once. Intervals are jittered by +/- `jitter` so courses drift apart
+    instead of hitting their sites in lockstep. With a `leader`, only the
+    process holding leadership scrapes; the others keep trying to take over.
+    `prepare` (e.g. importing scrapers and starting browsers) runs off the
+    event loop once, the first time this process may scrape. With `jobs`,
+    scrapes run as ScrapeJobManager jobs, so a course already being scraped
+    on demand is skipped and requests join scheduled scrapes.
+    """
+
+    def __init__(self, orchestrator: ScrapeOrchestrator, scrapers: Dict[str, Type["BaseScraper"]], persist: PersistCallback,
+                 schedules: Dict[str, List[ScrapeTier]], jitter: float = 0.1, leader=None, leader_retry_seconds: float = 30,
+                 prepare: Optional[Callable[[], None]] = None, jobs: Optional["ScrapeJobManager"] = None):
+        self.orchestrator = orchestrator
+        self.scrapers = scrapers
+        self.persist = persist
+        self.schedules = schedules
+        self.jitter = jitter
+        self.leader = leader
+        self.leader_retry_seconds = leader_retry_seconds
+        self._next_due: Dict[str, List[float]] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._is_leader = leader is None
+        self.prepare = prepare
+        self._prepared = False
+        self.jobs = jobs
+
+    @classmethod
+    def from_env(cls, orchestrator: ScrapeOrchestrator, scrapers: Dict[str, Type["BaseScraper"]], persist: PersistCallback,
+                 leader=None, prepare: Optional[Callable[[], None]] = None,
+                 jobs: Optional["ScrapeJobManager"] = None) -> "ScrapeScheduler":
+        return cls(
+            orchestrator,
+            scrapers,
+            persist,
+            schedules={course: schedule_from_env(course) for course in scrapers},
+            jitter=float(os.getenv('SCRAPE_SCHEDULE_JITTER', 0.1)),
+            leader=leader,
+            leader_retry_seconds=float(os.getenv('SCRAPE_LEADER_RETRY_SECONDS', 30)),
+            prepare=prepare,
+            jobs=jobs
+        )
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in list(self._running.values()):
+            task.cancel()
+        if self.leader is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.leader.release)
+
+    async def run_forever(self):
+        loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        now = loop.time()
+        # Spread the first runs over a slice of each interval instead of scraping everything at startup
+        self._next_due = {
+            course: [now + random.uniform(0, tier.interval_seconds * self.jitter) for tier in tiers]
+            for course, tiers in self.schedules.items()
+        }
+        while True:
+            if not await self._hold_leadership():
+                await asyncio.sleep(self.leader_retry_seconds)
+                continue
+            if not self._prepared:
+                await self._prepare()
+            self._start_due_scrapes(loop.time())
+            self._wake.clear()
+            sleep_for = max(self._seconds_until_next_due(loop.time()), 0)
+            if self.leader is not None:
+                sleep_for = min(sleep_for, self.leader_retry_seconds)
+            try:
+                # A finished scrape wakes the loop early in case its course fell due meanwhile
+                await asyncio.wait_for(self._wake.wait(), sleep_for)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _hold_leadership(self) -> bool:
+        if self.leader is None:
+            return True
+        loop = asyncio.get_running_loop()
+        try:
+            self._is_leader = await loop.run_in_executor(None, self.leader.try_acquire)
+        except Exception as e:
+            logger.error("Error checking scrape leadership: %s", e)
+            self._is_leader = False
+        return self._is_leader
+
+    async def _prepare(self):
+        self._prepared = True
+        if self.prepare is None:
+            return
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.prepare)
+        except Exception:
+            # Scrapers still load and start browsers on demand
+            logger.exception("Error preparing to scrape")
+
+    def _start_due_scrapes(self, now: float):
+        for course, tiers in self.schedules.items():
+            if course in self._running:
+                continue
+            due = [index for index, next_due in enumerate(self._next_due[course]) if next_due <= now]
+            if not due:
+                continue
+            days = set().union(*(tiers[index].days() for index in due))
+            for index in due:
+                self._next_due[course][index] = now + self._jittered(tiers[index].interval_seconds)
+            self._running[course] = asyncio.get_running_loop().create_task(self._scrape(course, days))
+
+    async def _scrape(self, course: str, days: Set[int]):
+        try:
+            if self.jobs is not None:
+                await self._scrape_as_job(course, days)
+                return
+            result = await self.orchestrator.run_one(course, self.scrapers[course], self.persist, days=days)
+            if result.error is None:
+                logger.info("Scheduled scrape of %s found %d tee times in %.1fs", course, result.tee_times_found, result.duration_seconds)
+        finally:
+            self._running.pop(course, None)
+            if self._wake is not None:
+                self._wake.set()
+
+    async def _scrape_as_job(self, course: str, days: Set[int]):
+        try:
+            job, outcome = await self.jobs.submit(course, force=True, days=days)
+        except Exception as e:
+            logger.error("Error starting the scheduled scrape of %s: %s", course, e)
+            return
+        if outcome != "started":
+            logger.info("Skipped the scheduled scrape of %s, job %s is already scraping it", course, job.id)
+            return
+        if job.task is not None:
+            await job.task
+        if job.status == "succeeded":
+            logger.info("Scheduled scrape of %s found %d tee times in %.1fs", course, job.tee_times_found, job.duration_seconds)
+
+    def _jittered(self, interval_seconds: float) -> float:
+        return interval_seconds * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _seconds_until_next_due(self, now: float) -> float:
+        waiting = [
+            min(next_due) for course, next_due in self._next_due.items() if next_due and course not in self._running
+        ]
+        return min(waiting) - now if waiting else self.leader_retry_seconds
+
+    def status(self) -> Dict:
+        now = asyncio.get_running_loop().time() if self._task is not None else None
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "leader": self._is_leader,
+            "courses": {
+                course: {
+                    "scraping": course in self._running,
+                    "tiers": [
+                        {
+                            "days": f"{tier.first_day}-{tier.last_day if tier.last_day is not None else ''}",
+                            "intervalSeconds": tier.interval_seconds,
+                            "nextRunInSeconds": round(self._next_due[course][index] - now, 1)
+                            if now is not None and course in self._next_due else None
+                        }
+                        for index, tier in enumerate(tiers)
+                    ]
+                }
+                for course, tiers in self.schedules.items()
+            }
+        }
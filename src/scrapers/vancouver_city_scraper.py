@@ -1,135 +1,137 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from .base_scraper import BaseScraper
-from typing import List, Dict
-from datetime import datetime, timedelta
-import time
-import pytz
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from .base_scraper import BaseScraper, ScrapeUnit
+from .http_client import get_http_client, parse_html
+from .waits import WaitStrategy
+from typing import List, Dict, Optional
+from datetime import datetime, time as datetime_time
+from src.utils.datetimes import localize
+import logging
 import re
 
+logger = logging.getLogger(__name__)
+
+TEE_TIME_SELECTOR = ".teeSheet .teetime"
+
 class VancouverCityScraper(BaseScraper):
-    def __init__(self):
-        self.base_url = "https://secure.west.prophetservices.com/CityofVancouver/Home/nIndex?CourseId=2,1,3&Date="
-        super().__init__(self.base_url)
-        self.timezone = pytz.timezone('America/Vancouver')
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service)
-        self.page_load_delay = 3  # seconds
-        print("VancouverCityScraper initialized")
-
-    async def scrape(self) -> List[Dict]:
-        print("Starting scrape for Vancouver City golf courses")
-        all_tee_times = []
-
-        current_date = datetime.now(self.timezone).date()
-        for i in range(5):  # Scrape for 5 days
-            date_to_scrape = current_date + timedelta(days=i)
-            formatted_date = date_to_scrape.strftime("%Y-%-m-%-d")
-            url = f"{self.base_url}{formatted_date}"
-            
-            print(f"Scraping for date: {formatted_date}")
+    # The tee sheet is server-rendered, so every row is in the initial HTML
+    supports_http = True
+
+    def __init__(self, base_url: Optional[str] = None, horizon_days: Optional[int] = None):
+        self.base_url = base_url or "https://secure.west.prophetservices.com/CityofVancouver/Home/nIndex?CourseId=2,1,3&Date="
+        super().__init__(self.base_url, horizon_days=horizon_days)
+        logger.debug("VancouverCityScraper initialized")
+
+    async def scrape_unit(self, unit: ScrapeUnit) -> List[Dict]:
+        date_to_scrape = unit.date
+        formatted_date = date_to_scrape.strftime("%Y-%-m-%-d")
+        url = f"{self.base_url}{formatted_date}"
+        tee_times = []
+
+        with self.stage("fetch", unit), self.browser():
+            waits = WaitStrategy(self.driver, "vancouver_city")
+            logger.debug("Scraping for date: %s", formatted_date)
             self.driver.get(url)
-            time.sleep(self.page_load_delay)
-            
+            waits.network_idle()
+            WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located((By.CLASS_NAME, "teeSheet"))
+            )
+            row_count = waits.row_count_stable(TEE_TIME_SELECTOR)
+
+            # Click "Show More Times" until the button is gone or stops adding rows
+            while True:
+                show_more_buttons = [
+                    button for button in self.driver.find_elements(By.ID, "btnShowMoreTimes")
+                    if button.is_displayed() and button.is_enabled()
+                ]
+                if not show_more_buttons:
+                    break  # No more "Show More Times" button, all tee times are visible
+                self.driver.execute_script("arguments[0].click();", show_more_buttons[0])
+                waits.network_idle()
+                new_row_count = waits.row_count_stable(TEE_TIME_SELECTOR)
+                if new_row_count <= row_count:
+                    break
+                row_count = new_row_count
+
+            # Get all tee times, including previously hidden ones, from one
+            # page_source snapshot instead of several WebDriver calls per row
+            page_source = self.driver.page_source
+
+        with self.stage("extract", unit):
+            raw_rows = self.extract_raw_data_from_html(page_source, date_to_scrape)
+        with self.stage("parse", unit):
+            for raw_data in raw_rows:
+                try:
+                    parsed_data = await self.parse_tee_time(raw_data)
+                    if parsed_data:
+                        tee_times.append(parsed_data)
+                except Exception as e:
+                    logger.warning("Unexpected error processing tee time: %s", e)
+        return tee_times
+
+    async def scrape_unit_http(self, unit: ScrapeUnit) -> List[Dict]:
+        with self.stage("fetch", unit):
+            html = await self.fetch_tee_sheet(unit.date)
+        with self.stage("extract", unit):
+            raw_rows = self.extract_raw_data_from_html(html, unit.date)
+        tee_times = []
+        with self.stage("parse", unit):
+            for raw_data in raw_rows:
+                parsed_data = await self.parse_tee_time(raw_data)
+                if parsed_data:
+                    tee_times.append(parsed_data)
+        return tee_times
+
+    async def fetch_tee_sheet(self, date) -> str:
+        formatted_date = date.strftime("%Y-%-m-%-d")
+        response = await get_http_client().get(f"{self.base_url}{formatted_date}")
+        response.raise_for_status()
+        return response.text
+
+    def extract_raw_data_from_html(self, html: str, date) -> List[Dict]:
+        """
+        Extract the raw tee time dicts from a tee sheet page, including rows
+        the browser only reveals via "Show More Times".
+        """
+        raw_rows = []
+        for element in parse_html(html).select(TEE_TIME_SELECTOR):
             try:
-                WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.CLASS_NAME, "teeSheet"))
-                )
-                
-                # Click "Show More Times" button until all tee times are visible
-                while True:
-                    try:
-                        show_more_button = WebDriverWait(self.driver, 5).until(
-                            EC.element_to_be_clickable((By.ID, "btnShowMoreTimes"))
-                        )
-                        self.driver.execute_script("arguments[0].click();", show_more_button)
-                        time.sleep(1)  # Wait for new tee times to load
-                    except TimeoutException:
-                        break  # No more "Show More Times" button, all tee times are visible
-
-                # Get all tee times, including previously hidden ones
-                tee_time_elements = self.driver.find_elements(By.CSS_SELECTOR, ".teeSheet .teetime")
-                
-                for element in tee_time_elements:
-                    try:
-                        raw_data = self.extract_raw_data(element, date_to_scrape)
-                        parsed_data = await self.parse_tee_time(raw_data)
-                        if parsed_data:
-                            all_tee_times.append(parsed_data)
-                    except ValueError as e:
-                        print(f"Skipping tee time due to error: {str(e)}")
-                    except Exception as e:
-                        print(f"Unexpected error processing tee time: {str(e)}")
-                
-            except Exception as e:
-                print(f"Error scraping date {formatted_date}: {str(e)}")
-
-        self.driver.quit()
-        print(f"Scraping completed. Total tee times found: {len(all_tee_times)}")
-        return all_tee_times
-
-    def extract_raw_data(self, element, date) -> Dict:
-        try:
-            time_text = element.get_attribute("teetime")
-            if not time_text:
-                time_element = element.find_element(By.CSS_SELECTOR, ".timeDiv span")
-                time_text = time_element.text.strip()
-            if not time_text:
-                raise ValueError("Time not found")
-            print(f"Raw time text: '{time_text}'")
-            # Remove all whitespace and newline characters
-            time_text = ''.join(time_text.split())
-            time_match = re.search(r'(\d{2}:\d{2})', time_text)
-            if time_match:
-                time = time_match.group(1)
-                print(f"Extracted time: {time}")
-            else:
-                raise ValueError("Time not found in: " + time_text)
-        except NoSuchElementException:
-            raise ValueError("Time element not found")
+                raw_rows.append(self._extract_raw_data_from_tag(element, date))
+            except ValueError as e:
+                logger.warning("Skipping tee time due to error: %s", e)
+        return raw_rows
 
-        try:
-            price_element = element.find_element(By.CSS_SELECTOR, ".priceDiv h3")
-            price_text = price_element.text.strip()
-            if not price_text:
-                price_text = element.get_attribute("data-price")
-            price_match = re.search(r'\$?(\d+(\.\d{2})?)', price_text)
-            if price_match:
-                price = price_match.group(1)
-            else:
-                raise ValueError("No valid price found in: " + price_text)
-        except NoSuchElementException:
-            raise ValueError("Price element not found")
+    def _extract_raw_data_from_tag(self, element, date) -> Dict:
+        def text(selector):
+            found = element.select_one(selector)
+            return found.get_text(strip=True) if found else ''
 
-        try:
-            course_name = element.find_element(By.CSS_SELECTOR, ".p-nopadding p").text.strip()
-            if not course_name:
-                course_div = element.find_element(By.CSS_SELECTOR, "div[name^='course-']")
-                course_name = course_div.get_attribute("name").replace("course-", "")
-            if not course_name:
-                raise ValueError("Course name not found")
-        except NoSuchElementException:
-            raise ValueError("Course name element not found")
+        time_text = ''.join((element.get("teetime") or text(".timeDiv span")).split())
+        time_match = re.search(r'(\d{2}:\d{2})', time_text)
+        if not time_match:
+            raise ValueError("Time not found in: " + time_text)
+
+        price_text = text(".priceDiv h3") or element.get("data-price") or ''
+        price_match = re.search(r'\$?(\d+(\.\d{2})?)', price_text)
+        if not price_match:
+            raise ValueError("No valid price found in: " + price_text)
+
+        course_name = text(".p-nopadding p")
+        if not course_name:
+            course_div = element.select_one("div[name^='course-']")
+            course_name = course_div.get("name", "").replace("course-", "") if course_div else ''
+        if not course_name:
+            raise ValueError("Course name not found")
+
+        players = text(".player p") or element.get("data-player")
+        if not players:
+            raise ValueError("Players information not found")
 
-        try:
-            players = element.find_element(By.CSS_SELECTOR, ".player p").text.strip()
-            if not players:
-                players = element.get_attribute("data-player")
-            if not players:
-                raise ValueError("Players information not found")
-        except NoSuchElementException:
-            raise ValueError("Players element not found")
-
-        print(f"Raw data: Date: {date}, Time: {time}, Price: {price}, Course: {course_name}, Players: {players}")
         return {
             'date': date,
-            'time': time,
-            'price': price,
+            'time': time_match.group(1),
+            'price': price_match.group(1),
             'course_name': course_name,
             'players': players
         }
@@ -138,18 +140,18 @@ class VancouverCityScraper(BaseScraper):
         date = raw_data['date']
         time = raw_data['time']
         if not time:
-            print(f"Error: Time is None for date {date}")
+            logger.warning("Time is None for date %s", date)
             return None
-        datetime_str = f"{date} {time}"
+        # The date is already a date; only the HH:MM needs parsing
         try:
-            naive_datetime = datetime.strptime(datetime_str, "%Y-%m-%d %H:%M")
+            hour, minute = map(int, time.split(':'))
+            naive_datetime = datetime.combine(date, datetime_time(hour, minute))
         except ValueError:
-            print(f"Error parsing datetime: {datetime_str}")
+            logger.warning("Error parsing datetime: %s %s", date, time)
             return None
         
-        localized_datetime = self.timezone.localize(naive_datetime)
-        utc_datetime = localized_datetime.astimezone(pytz.UTC)
-        print(f"Localized datetime: {localized_datetime}, UTC datetime: {utc_datetime}")
+        utc_datetime = localize(naive_datetime, self.timezone_name)
+        logger.debug("Local datetime: %s, UTC datetime: %s", naive_datetime, utc_datetime)
         
         try:
             price = float(raw_data['price'])
@@ -168,17 +170,12 @@ class VancouverCityScraper(BaseScraper):
                 available_booking_sizes = [2]  # Default to 2 players if parsing fails
         
         parsed_data = {
-            'datetime': utc_datetime.isoformat(),
+            'datetime': utc_datetime,
             'price': price,
             'currency': 'CAD',
             'available_booking_sizes': available_booking_sizes,
             'course_name': raw_data['course_name'],
             'starting_hole': 1,  # Assuming all start from hole 1, adjust if needed
         }
-        print(f"Parsed data: {parsed_data}")
+        logger.debug("Parsed data: %s", parsed_data)
         return parsed_data
-
-    def __del__(self):
-        if hasattr(self, 'driver'):
-            self.driver.quit()
-        print("VancouverCityScraper instance destroyed")
\ No newline at end of file
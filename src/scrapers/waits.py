@@ -0,0 +1,144 @@
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support import expected_conditions as EC
+
+from src.monitoring.metrics import Histogram
+
+WAIT_SECONDS = Histogram(
+    "scrape_wait_seconds",
+    "Time scrapers spend waiting on pages, by scraper and wait",
+    labelnames=("scraper", "wait")
+)
+
+# jQuery.active covers jQuery XHRs; PageRequestManager covers ASP.NET UpdatePanel postbacks
+NETWORK_STATE_SCRIPT = """
+const prm = window.Sys && Sys.WebForms && Sys.WebForms.PageRequestManager
+    ? Sys.WebForms.PageRequestManager.getInstance() : null;
+return [
+    document.readyState,
+    (window.jQuery ? window.jQuery.active : 0) + (prm && prm.get_isInAsyncPostBack() ? 1 : 0),
+    performance.getEntriesByType('resource').length
+];
+"""
+
+ROW_COUNT_SCRIPT = "return document.querySelectorAll(arguments[0]).length;"
+
+
+class LatencyTracker:
+    """
+    Smoothed latency of one kind of wait, used to size its polling interval
+    and timeout from what the site actually does instead of fixed sleeps.
+    """
+
+    def __init__(self, initial: float, alpha: float = 0.2):
+        self.alpha = alpha
+        self.mean = initial
+        self.deviation = initial / 2
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            error = seconds - self.mean
+            self.mean += self.alpha * error
+            self.deviation += self.alpha * (abs(error) - self.deviation)
+
+    def poll_interval(self, floor: float = 0.05, ceiling: float = 0.5) -> float:
+        return min(max(self.mean / 10, floor), ceiling)
+
+    def timeout(self, floor: float, ceiling: float) -> float:
+        # Generous headroom over the typical latency, like a TCP retransmit timer
+        return min(max(self.mean + 4 * self.deviation, floor), ceiling)
+
+
+_trackers: Dict[Tuple[str, str], LatencyTracker] = {}
+_trackers_lock = threading.Lock()
+
+
+def get_tracker(scraper: str, wait: str, initial: float) -> LatencyTracker:
+    with _trackers_lock:
+        if (scraper, wait) not in _trackers:
+            _trackers[(scraper, wait)] = LatencyTracker(initial)
+        return _trackers[(scraper, wait)]
+
+
+class WaitStrategy:
+    """
+    Condition-based waits for one scraper's driver. Every wait is timed into
+    the scrape_wait_seconds histogram and feeds the adaptive timeouts.
+    """
+
+    # Adaptive timeouts only ever grow past the 10s the fixed WebDriverWaits
+    # used, so a slow page is waited on rather than silently missed
+    def __init__(self, driver, scraper: str, min_timeout: float = 10, max_timeout: float = 30):
+        self.driver = driver
+        self.scraper = scraper
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+
+    def until(self, wait: str, condition: Callable[[], Optional[object]], initial: float = 1.0,
+              timeout: Optional[float] = None, backoff: float = 1.5):
+        """
+        Poll `condition` until it returns something truthy, starting at the
+        tracked poll interval and backing off by `backoff` each attempt.
+        Raises TimeoutException if the adaptive (or given) timeout passes.
+        """
+        tracker = get_tracker(self.scraper, wait, initial)
+        timeout = timeout if timeout is not None else tracker.timeout(self.min_timeout, self.max_timeout)
+        interval = tracker.poll_interval()
+        started = time.perf_counter()
+        deadline = started + timeout
+        try:
+            while True:
+                result = condition()
+                if result:
+                    tracker.record(time.perf_counter() - started)
+                    return result
+                if time.perf_counter() >= deadline:
+                    raise TimeoutException(f"{self.scraper}: '{wait}' not met within {timeout:.1f}s")
+                time.sleep(min(interval, max(deadline - time.perf_counter(), 0)))
+                interval = min(interval * backoff, 0.5)
+        finally:
+            WAIT_SECONDS.observe(time.perf_counter() - started, scraper=self.scraper, wait=wait)
+
+    def network_idle(self, idle_for: float = 0.3, timeout: Optional[float] = None):
+        """
+        Wait until the document has loaded, no jQuery requests are in flight
+        and no new resources have started loading for `idle_for` seconds.
+        """
+        state = {'resources': -1, 'since': time.perf_counter()}
+
+        def idle():
+            ready_state, active, resources = self.driver.execute_script(NETWORK_STATE_SCRIPT)
+            now = time.perf_counter()
+            if ready_state != 'complete' or active or resources != state['resources']:
+                state['resources'], state['since'] = resources, now
+                return False
+            return now - state['since'] >= idle_for
+
+        return self.until("network_idle", idle, initial=1.0, timeout=timeout)
+
+    def staleness_of(self, element, timeout: Optional[float] = None):
+        """Wait until `element` has been removed from the page, e.g. replaced by a postback."""
+        return self.until("staleness_of", lambda: EC.staleness_of(element)(self.driver), initial=0.5, timeout=timeout)
+
+    def row_count_stable(self, selector: str, more_than: int = -1, stable_for: float = 0.3,
+                         timeout: Optional[float] = None) -> int:
+        """
+        Wait until more than `more_than` rows match `selector` and the count
+        has stopped changing for `stable_for` seconds. Returns the row count.
+        """
+        state = {'count': -1, 'since': time.perf_counter()}
+
+        def stable():
+            count = self.driver.execute_script(ROW_COUNT_SCRIPT, selector)
+            now = time.perf_counter()
+            if count != state['count']:
+                state['count'], state['since'] = count, now
+                return False
+            return count > more_than and now - state['since'] >= stable_for
+
+        self.until("row_count_stable", stable, initial=1.0, timeout=timeout)
+        return state['count']
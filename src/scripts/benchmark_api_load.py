@@ -0,0 +1,144 @@
+"""
+Load test the tee time list API: requests per second and latency under concurrency.
+
+Seeds --rows tee times for a throwaway course and serves GET /filtered for it
+from two apps on local ports, one at a time:
+  * sync: the route before the async read path, an async handler running the
+    blocking TeeTimeRepository on the event loop
+  * async: the current route on AsyncSession / asyncpg
+
+Each is driven by --concurrency clients for --seconds with the query cache
+disabled, so every request reaches the database. Pool sizes come from
+DB_POOL_SIZE and DB_MAX_OVERFLOW. Keep --concurrency within their sum: past
+it the sync app blocks its event loop waiting for a connection that only the
+loop can release, and stalls for the pool timeout. Runs against the database
+configured in .env and cleans up after itself:
+
+    python -m src.scripts.benchmark_api_load --concurrency 12 --seconds 10
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import threading
+import time
+import uuid
+
+from dotenv import load_dotenv
+load_dotenv()
+
+# Measure the database path, not cache hits
+os.environ['QUERY_CACHE_BACKEND'] = 'none'
+
+import httpx
+import uvicorn
+from fastapi import APIRouter, Depends, FastAPI
+from sqlalchemy.orm import Session
+
+from src.api.dependencies import get_db_session
+from src.api.routers import tee_times
+from src.api.routers.tee_times import FilterParams
+from src.database.repositories.tee_time_repository import TeeTimeRepository
+from src.scripts.benchmark_list_queries import cleanup, seed
+
+
+def sync_app() -> FastAPI:
+    # The read route before the async database layer, kept here for comparison
+    router = APIRouter()
+
+    @router.get("/filtered")
+    async def get_filtered_tee_times(params: FilterParams = Depends(), db: Session = Depends(get_db_session)):
+        return TeeTimeRepository(db).get_filtered_tee_times(
+            params.date.isoformat() if params.date else None, params.course, params.min_price, params.max_price,
+            params.page, params.limit, params.sort_by, params.sort_order, params.cursor, params.total
+        )
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api/tee-times")
+    return app
+
+
+def async_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(tee_times.router, prefix="/api/tee-times")
+    return app
+
+
+class BackgroundServer(uvicorn.Server):
+    def install_signal_handlers(self):
+        pass
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+        while not self.started:
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.should_exit = True
+        self._thread.join()
+
+
+async def drive(url: str, params: dict, concurrency: int, seconds: float):
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + seconds
+
+    async def client_loop(client: httpx.AsyncClient, offset: int):
+        nonlocal errors
+        page = offset
+        while time.perf_counter() < deadline:
+            # Spread clients over the first pages so they don't all read the same rows
+            started = time.perf_counter()
+            response = await client.get(url, params=dict(params, page=page % 20 + 1))
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+            page += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client, offset) for offset in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors
+    }
+
+
+def measure(app: FastAPI, port: int, params: dict, concurrency: int, seconds: float):
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off")
+    with BackgroundServer(config):
+        url = f"http://127.0.0.1:{port}/api/tee-times/filtered"
+        # Warm up the pools before measuring
+        asyncio.run(drive(url, params, concurrency, 1))
+        return asyncio.run(drive(url, params, concurrency, seconds))
+
+
+def run(rows: int, limit: int, concurrency: int, seconds: float, port: int):
+    course_name = f"Benchmark Course {uuid.uuid4().hex[:8]}"
+    params = {"course": course_name, "limit": limit}
+    try:
+        seed(course_name, rows)
+        print(f"{rows} rows, {limit} per page, {concurrency} concurrent clients for {seconds:.0f}s")
+        print(f"{'app':>6} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for name, app in (("sync", sync_app()), ("async", async_app())):
+            result = measure(app, port, params, concurrency, seconds)
+            print(f"{name:>6} {result['rps']:>8.1f} {result['p50']:>8.1f} {result['p99']:>8.1f} {result['errors']:>7}")
+    finally:
+        cleanup(course_name)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=12)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    run(args.rows, args.limit, args.concurrency, args.seconds, args.port)
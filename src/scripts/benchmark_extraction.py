@@ -0,0 +1,78 @@
+"""
+Compare per-element tee time extraction with the batch paths on saved fixture HTML.
+
+Loads the recorded Mayfair Lakes tee sheet in a headless browser, pads it to
+--rows rows, then times:
+  * per-element: extract_raw_data() on every row (six find_element calls each)
+  * execute_script: extract_all_raw_data() (one round-trip)
+  * page_source: one snapshot parsed offline with BeautifulSoup
+
+    python -m src.scripts.benchmark_extraction --rows 150 --repeat 5
+"""
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from selenium.webdriver.common.by import By
+
+from src.scrapers.driver_pool import DriverPool
+from src.scrapers.mayfair_lakes_scraper import MayfairLakesScraper, TEE_TIME_ROWS_SELECTOR
+
+FIXTURE = Path(__file__).resolve().parents[2] / "tests" / "fixtures" / "mayfair_lakes" / "tee_sheet.html"
+
+PAD_ROWS_SCRIPT = """
+const [rowsSelector, target] = arguments;
+const rows = document.querySelectorAll(rowsSelector);
+const container = rows[0].parentNode;
+for (let i = rows.length; i < target; i++) {
+    container.appendChild(rows[i % rows.length].cloneNode(true));
+}
+return document.querySelectorAll(rowsSelector).length;
+"""
+
+
+def time_it(func, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+
+def run(rows: int, repeat: int):
+    pool = DriverPool(size=1, warm_sessions=0)
+    scraper = MayfairLakesScraper()
+    try:
+        with pool.lease() as driver:
+            scraper.driver = driver
+            driver.get(FIXTURE.as_uri())
+            row_count = driver.execute_script(PAD_ROWS_SCRIPT, TEE_TIME_ROWS_SELECTOR, rows)
+
+            def per_element():
+                return [scraper.extract_raw_data(element) for element in driver.find_elements(By.CSS_SELECTOR, TEE_TIME_ROWS_SELECTOR)]
+
+            results = {
+                'per-element': time_it(per_element, repeat),
+                'execute_script': time_it(scraper.extract_all_raw_data, repeat),
+                'page_source': time_it(lambda: scraper.extract_raw_data_from_html(driver.page_source), repeat)
+            }
+    finally:
+        pool.shutdown()
+
+    baseline = results['per-element'][0]
+    print(f"\n{row_count} rows, median of {repeat} runs")
+    print(f"{'path':>15} {'seconds':>10} {'speedup':>9}")
+    for name, (seconds, extracted) in results.items():
+        assert len(extracted) == row_count, f"{name} extracted {len(extracted)} of {row_count} rows"
+        print(f"{name:>15} {seconds:>10.4f} {baseline / seconds:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=150)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
@@ -0,0 +1,84 @@
+"""
+Measure API cold start: how long a fresh interpreter takes to import
+src.api.main, against a budget.
+
+Each run imports the app in a new process with -X importtime and reports the
+median total, the slowest direct imports of src.api.main, and any modules
+that should only load once a scrape or query runs (Selenium, asyncpg). Exits
+with status 1 when over budget or when such a module was imported, so it can
+gate CI. Needs no database:
+
+    python -m src.scripts.benchmark_import_time --runs 5 --budget 1.0
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+from dotenv import load_dotenv
+load_dotenv()
+
+MODULE = "src.api.main"
+# Loaded by scrapes and database queries, never by importing the app
+DEFERRED_MODULES = ("selenium", "webdriver_manager", "bs4", "asyncpg")
+
+
+def import_once() -> Tuple[float, List[Tuple[str, float]], List[str]]:
+    code = f"import sys, {MODULE}; print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True, cwd=os.getcwd()
+    )
+    # Modules are listed after everything they import, indented by depth
+    total, children, pending = 0.0, [], []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        seconds = int(cumulative) / 1e6
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            pending.append((name.strip(), seconds))
+        elif depth == 0:
+            if name.strip() == MODULE:
+                total, children = seconds, pending
+            pending = []
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return total, children, loaded
+
+
+def run(runs: int, budget: float, top: int) -> int:
+    totals, by_module, loaded = [], {}, set()
+    for _ in range(runs):
+        total, children, deferred = import_once()
+        totals.append(total)
+        loaded.update(deferred)
+        for name, seconds in children:
+            by_module.setdefault(name, []).append(seconds)
+
+    median = statistics.median(totals)
+    print(f"import {MODULE}: median {median * 1000:.0f} ms over {runs} runs (budget {budget * 1000:.0f} ms)")
+    slowest: Dict[str, float] = {name: statistics.median(times) for name, times in by_module.items()}
+    for name, seconds in sorted(slowest.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"  {seconds * 1000:>7.1f} ms  {name}")
+
+    failed = False
+    if median > budget:
+        print(f"Over budget by {(median - budget) * 1000:.0f} ms")
+        failed = True
+    if loaded:
+        print(f"Imported at startup but should be deferred: {', '.join(sorted(loaded))}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=float(os.getenv('IMPORT_BUDGET_SECONDS', 1.0)),
+                        help="Median import time allowed, in seconds")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    sys.exit(run(args.runs, args.budget, args.top))
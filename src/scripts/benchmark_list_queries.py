@@ -0,0 +1,119 @@
+"""
+Benchmark the tee time list read path: statements and latency per page.
+
+Seeds --rows tee times (a few with players) for a throwaway course, then reads
+pages at increasing depths with:
+  * legacy: ORM query with the Player outer join and a lazy course load per row
+  * page: the column projection with page numbers (OFFSET)
+  * cursor: the column projection walking nextCursor (keyset)
+
+Runs against the database configured in .env and cleans up after itself:
+
+    python -m src.scripts.benchmark_list_queries --rows 50000 --limit 50
+"""
+import argparse
+import statistics
+import time
+import uuid
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from sqlalchemy import delete, event
+
+from src.database.db_config import SessionLocal, engine
+from src.database.models.tee_time import Course, Player, TeeTime
+from src.database.repositories.tee_time_repository import TeeTimeRepository
+from src.scripts.benchmark_save_tee_times import StatementCounter, generate_tee_times
+
+DEPTHS = (1, 10, 100, 1000)
+
+
+def legacy_page(db, course_name: str, page: int, limit: int):
+    # The read path before the column projection, kept here for comparison
+    query = db.query(TeeTime).join(Course).outerjoin(Player).filter(Course.name == course_name).order_by(TeeTime.datetime, TeeTime.id)
+    query.count()
+    tee_times = query.offset((page - 1) * limit).limit(limit).all()
+    return [(tee_time.id, tee_time.course.name, tee_time.course.timezone) for tee_time in tee_times]
+
+
+def measure(func, repeat: int):
+    counter = StatementCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    timings = []
+    try:
+        for _ in range(repeat):
+            db = SessionLocal()
+            try:
+                started = time.perf_counter()
+                func(db)
+                timings.append(time.perf_counter() - started)
+            finally:
+                db.close()
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+    return statistics.median(timings) * 1000, counter.count // repeat
+
+
+def cursor_at(course_name: str, page: int, limit: int) -> str:
+    # The cursor a client would hold after reading page - 1 pages
+    db = SessionLocal()
+    try:
+        result = TeeTimeRepository(db).get_filtered_tee_times(None, course_name, None, None, page - 1, limit, "datetime", "asc", total="none")
+        return result["pagination"]["nextCursor"]
+    finally:
+        db.close()
+
+
+def seed(course_name: str, rows: int):
+    db = SessionLocal()
+    try:
+        TeeTimeRepository(db).save_tee_times(generate_tee_times(course_name, rows, 50.0))
+        tee_time_ids = [tee_time_id for (tee_time_id,) in db.query(TeeTime.id).join(Course).filter(Course.name == course_name).limit(rows // 10)]
+        db.add_all([Player(tee_time_id=tee_time_id, age=40) for tee_time_id in tee_time_ids for _ in range(3)])
+        db.commit()
+    finally:
+        db.close()
+
+
+def cleanup(course_name: str):
+    db = SessionLocal()
+    try:
+        course_id = db.query(Course.id).filter(Course.name == course_name).scalar()
+        if course_id is not None:
+            tee_time_ids = db.query(TeeTime.id).filter(TeeTime.course_id == course_id)
+            db.execute(delete(Player).where(Player.tee_time_id.in_(tee_time_ids)))
+            db.execute(delete(TeeTime).where(TeeTime.course_id == course_id))
+            db.execute(delete(Course).where(Course.id == course_id))
+            db.commit()
+    finally:
+        db.close()
+
+
+def run(rows: int, limit: int, repeat: int):
+    course_name = f"Benchmark Course {uuid.uuid4().hex[:8]}"
+    try:
+        seed(course_name, rows)
+        print(f"{rows} rows, {limit} per page, median of {repeat} runs")
+        print(f"{'page':>6} {'legacy ms':>10} {'stmts':>6} {'page ms':>8} {'stmts':>6} {'cursor ms':>10} {'stmts':>6}")
+        for depth in DEPTHS:
+            if (depth - 1) * limit >= rows:
+                break
+            cursor = cursor_at(course_name, depth, limit) if depth > 1 else None
+            legacy = measure(lambda db: legacy_page(db, course_name, depth, limit), repeat)
+            paged = measure(lambda db: TeeTimeRepository(db).get_filtered_tee_times(
+                None, course_name, None, None, depth, limit, "datetime", "asc"), repeat)
+            keyset = measure(lambda db: TeeTimeRepository(db).get_filtered_tee_times(
+                None, course_name, None, None, 1, limit, "datetime", "asc", cursor=cursor), repeat)
+            print(f"{depth:>6} {legacy[0]:>10.1f} {legacy[1]:>6} {paged[0]:>8.1f} {paged[1]:>6} {keyset[0]:>10.1f} {keyset[1]:>6}")
+    finally:
+        cleanup(course_name)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.rows, args.limit, args.repeat)
@@ -0,0 +1,90 @@
+"""
+Benchmark TeeTimeRepository.save_tee_times at increasing scrape sizes.
+
+Runs against the database configured in .env and cleans up after itself:
+
+    python -m src.scripts.benchmark_save_tee_times --sizes 1000 10000 100000
+"""
+import argparse
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from sqlalchemy import event, delete
+
+from src.database.db_config import SessionLocal, engine
+from src.database.models.tee_time import Course, TeeTime
+from src.database.repositories.tee_time_repository import TeeTimeRepository
+
+SLOTS_PER_DAY = 100
+
+
+def generate_tee_times(course_name: str, count: int, price: float):
+    start = datetime.now(timezone.utc).replace(hour=13, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    return [
+        {
+            'datetime': (start + timedelta(days=i // SLOTS_PER_DAY, minutes=8 * (i % SLOTS_PER_DAY))).isoformat(),
+            'price': price,
+            'currency': 'CAD',
+            'available_booking_sizes': [2, 3, 4],
+            'course_name': course_name,
+            'starting_hole': 1
+        }
+        for i in range(count)
+    ]
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+def timed_save(tee_times):
+    counter = StatementCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        TeeTimeRepository(db).save_tee_times(tee_times)
+        return time.perf_counter() - started, counter.count
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", counter)
+
+
+def cleanup(course_name: str):
+    db = SessionLocal()
+    try:
+        course_id = db.query(Course.id).filter(Course.name == course_name).scalar()
+        if course_id is not None:
+            db.execute(delete(TeeTime).where(TeeTime.course_id == course_id))
+            db.execute(delete(Course).where(Course.id == course_id))
+            db.commit()
+    finally:
+        db.close()
+
+
+def run(sizes):
+    print(f"{'rows':>8} {'insert s':>10} {'rescrape s':>11} {'rows/s':>10} {'statements':>11}")
+    for size in sizes:
+        course_name = f"Benchmark Course {uuid.uuid4().hex[:8]}"
+        try:
+            insert_seconds, _ = timed_save(generate_tee_times(course_name, size, 50.0))
+            # Re-scrape with new prices and every other slot gone to exercise both UPDATE paths
+            rescrape = generate_tee_times(course_name, size, 55.0)[::2]
+            rescrape_seconds, statements = timed_save(rescrape)
+            print(f"{size:>8} {insert_seconds:>10.3f} {rescrape_seconds:>11.3f} {size / rescrape_seconds:>10.0f} {statements:>11}")
+        finally:
+            cleanup(course_name)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    run(parser.parse_args().sizes)
@@ -0,0 +1,343 @@
+"""
+Offline scraper benchmark: replay recorded tee sheets from a local stub server
+through each scraper and save the results, timing every stage.
+
+Serves tests/fixtures/<course>/tee_sheet.html on 127.0.0.1 and, for --days
+days of tee sheets and --rounds rounds, runs:
+  * vancouver_city: the scraper's own HTTP path (scrape_http), end to end
+  * mayfair_lakes: the page a browser would load, fetched over HTTP and read
+    with the scraper's page_source path (extract_raw_data_from_html), since
+    it only scrapes with a browser. The recording is of a single day, so its
+    rows are moved to each replayed day, as the site would show them
+then save_tee_times on the parsed rows, under throwaway course names, in the
+database at --database-url (default TEST_DATABASE_URL). Without one the
+persist stage is skipped. Tables are created if missing; only the benchmark's
+own courses are deleted afterwards.
+
+Reports rows/s and wall time per stage (fetch, extract, parse, persist; the
+fastest of the rounds) and the process's peak RSS. Extraction and parsing run on the
+event loop, so their time is measured directly; the rest of the scrape's wall
+time is fetch, i.e. waiting on the network. Compares the results with a
+baseline and exits with status 1 when a stage is more than --tolerance slower,
+or peak RSS more than --tolerance higher. Timings only compare on the machine
+that recorded them, so the baseline is a local, untracked file (--baseline,
+default .benchmarks/benchmark_scrapers.json); --update-baseline records the
+current run there, e.g. on the main branch before a change:
+
+    python -m src.scripts.benchmark_scrapers --days 60 --rounds 7 --update-baseline
+    python -m src.scripts.benchmark_scrapers --days 60 --rounds 7
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from sqlalchemy import delete, select
+
+from src.database.db_config import Base, create_db_engine
+from src.database.models.tee_time import Course, TeeTime
+from src.database.repositories.tee_time_repository import TeeTimeRepository
+from src.monitoring.logs import configure_logging
+from src.scrapers.base_scraper import ScrapeUnit
+from src.scrapers.http_client import close_http_client, get_http_client
+from src.scrapers.mayfair_lakes_scraper import MayfairLakesScraper
+from src.scrapers.vancouver_city_scraper import VancouverCityScraper
+
+FIXTURES = Path(__file__).resolve().parents[2] / "tests" / "fixtures"
+BASELINE_FILE = Path(__file__).resolve().parents[2] / ".benchmarks" / "benchmark_scrapers.json"
+STAGES = ("fetch", "extract", "parse", "persist")
+
+# Path each recorded page is served under, and the fixture behind it
+ROUTES = {
+    "/CityofVancouver/Home/nIndex": "vancouver_city/tee_sheet.html",
+    "/Book-a-Tee-Time": "mayfair_lakes/tee_sheet.html"
+}
+
+
+class Server(ThreadingHTTPServer):
+    # The default backlog of 5 drops concurrent connects, which then wait a second to retry
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class StubServer:
+    """Serves the recorded pages on a free local port, like the tests' stub_server fixture."""
+
+    def __init__(self, routes: Dict[str, str]):
+        pages = {prefix: (FIXTURES / fixture).read_bytes() for prefix, fixture in routes.items()}
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep connections open between requests, as a real site would
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                for prefix, body in pages.items():
+                    if self.path.startswith(prefix):
+                        self.send_response(200)
+                        self.send_header("Content-Type", "text/html; charset=utf-8")
+                        self.send_header("Content-Length", str(len(body)))
+                        self.end_headers()
+                        self.wfile.write(body)
+                        return
+                self.send_error(404)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = Server(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class StageTimer:
+    def __init__(self):
+        self.seconds = defaultdict(float)
+
+    def wrap(self, stage: str, func: Callable) -> Callable:
+        """Time every call of `func`, a method or coroutine function, under `stage`."""
+        if asyncio.iscoroutinefunction(func):
+            async def timed(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    self.seconds[stage] += time.perf_counter() - started
+        else:
+            def timed(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.seconds[stage] += time.perf_counter() - started
+        return timed
+
+
+async def scrape_vancouver_city(base_url: str, days: int, timer: StageTimer) -> List[Dict]:
+    scraper = VancouverCityScraper(f"{base_url}/CityofVancouver/Home/nIndex?CourseId=2,1,3&Date=", horizon_days=days)
+    scraper.extract_raw_data_from_html = timer.wrap("extract", scraper.extract_raw_data_from_html)
+    scraper.parse_tee_time = timer.wrap("parse", scraper.parse_tee_time)
+    return await scraper.scrape_http()
+
+
+async def scrape_mayfair_lakes(base_url: str, days: int, timer: StageTimer) -> List[Dict]:
+    scraper = MayfairLakesScraper(horizon_days=days)
+    parse_tee_time = timer.wrap("parse", scraper.parse_tee_time)
+    extract = timer.wrap("extract", scraper.extract_raw_data_from_html)
+
+    async def fetch(unit: ScrapeUnit) -> str:
+        response = await get_http_client().get(f"{base_url}/Book-a-Tee-Time?day={unit.index}")
+        response.raise_for_status()
+        return response.text
+
+    async def scrape_unit(unit: ScrapeUnit) -> List[Dict]:
+        # What scrape_unit() does after the browser has loaded the day's tee sheet
+        tee_times = []
+        for raw_data in extract(await fetch(unit)):
+            # Every replayed day would otherwise save the same slots over and over
+            raw_data['date'] = unit.date.strftime("%m/%d/%Y")
+            parsed_data = await parse_tee_time(raw_data)
+            if parsed_data not in tee_times:
+                tee_times.append(parsed_data)
+        return tee_times
+
+    return await scraper.scrape_units(scrape_unit, blocking=False)
+
+
+SCRAPERS = {
+    "vancouver_city": scrape_vancouver_city,
+    "mayfair_lakes": scrape_mayfair_lakes
+}
+
+
+def scrape(scrape_course, base_url: str, days: int, timer: StageTimer) -> List[Dict]:
+    async def run():
+        try:
+            return await scrape_course(base_url, days, timer)
+        finally:
+            await close_http_client()
+    started = time.perf_counter()
+    tee_times = asyncio.run(run())
+    # Requests overlap each other and the loop's CPU work, so fetch is what remains
+    timer.seconds["fetch"] = time.perf_counter() - started - timer.seconds["extract"] - timer.seconds["parse"]
+    return tee_times
+
+
+def persist(session_factory, tee_times: List[Dict], timer: StageTimer):
+    db = session_factory()
+    try:
+        started = time.perf_counter()
+        TeeTimeRepository(db).save_tee_times(tee_times)
+        timer.seconds["persist"] += time.perf_counter() - started
+    finally:
+        db.close()
+
+
+def cleanup(session_factory, course_names: List[str]):
+    db = session_factory()
+    try:
+        course_ids = db.execute(select(Course.id).where(Course.name.in_(course_names))).scalars().all()
+        if course_ids:
+            db.execute(delete(TeeTime).where(TeeTime.course_id.in_(course_ids)))
+            db.execute(delete(Course).where(Course.id.in_(course_ids)))
+            db.commit()
+    finally:
+        db.close()
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_course(name: str, base_url: str, days: int, rounds: int, session_factory) -> Dict:
+    suffix = f" (benchmark {uuid.uuid4().hex[:8]})"
+    timings, course_names, rows = defaultdict(list), set(), 0
+    try:
+        # Round 0 warms imports, connections and caches and is not counted
+        for round_number in range(rounds + 1):
+            timer = StageTimer()
+            tee_times = scrape(SCRAPERS[name], base_url, days, timer)
+            rows = len(tee_times)
+            if session_factory is not None:
+                tee_times = [dict(tee_time, course_name=tee_time['course_name'] + suffix) for tee_time in tee_times]
+                course_names.update(tee_time['course_name'] for tee_time in tee_times)
+                persist(session_factory, tee_times, timer)
+            if round_number == 0:
+                continue
+            for stage, seconds in timer.seconds.items():
+                timings[stage].append(seconds)
+    finally:
+        if session_factory is not None and course_names:
+            cleanup(session_factory, sorted(course_names))
+    stages = {}
+    for stage in STAGES:
+        if timings[stage]:
+            # The fastest round is the least disturbed by other work on the machine
+            seconds = min(timings[stage])
+            stages[stage] = {"seconds": seconds, "rowsPerSecond": rows / seconds if seconds else None}
+    return {"rows": rows, "stages": stages, "peakRssMb": peak_rss_mb()}
+
+
+def regressed_courses(results: Dict, baseline: Dict, tolerance: float) -> Dict[str, List[str]]:
+    regressions = defaultdict(list)
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        for stage, current in result["stages"].items():
+            before = expected["stages"].get(stage, {}).get("rowsPerSecond")
+            if before and current["rowsPerSecond"] is not None and current["rowsPerSecond"] < before * (1 - tolerance):
+                regressions[name].append(f"{stage}: {current['rowsPerSecond']:.0f} rows/s, baseline {before:.0f}")
+        if result["peakRssMb"] > expected["peakRssMb"] * (1 + tolerance):
+            regressions[name].append(f"peak RSS: {result['peakRssMb']:.0f} MB, baseline {expected['peakRssMb']:.0f} MB")
+    return regressions
+
+
+def best_of(first: Dict, second: Dict) -> Dict:
+    stages = {
+        stage: min(first["stages"][stage], second["stages"][stage], key=lambda timing: timing["seconds"])
+        for stage in first["stages"]
+    }
+    return dict(first, stages=stages, peakRssMb=min(first["peakRssMb"], second["peakRssMb"]))
+
+
+def rounded(results: Dict) -> Dict:
+    return {
+        name: {
+            "rows": result["rows"],
+            "stages": {
+                stage: {"seconds": round(timing["seconds"], 5), "rowsPerSecond": round(timing["rowsPerSecond"])}
+                for stage, timing in result["stages"].items()
+            },
+            "peakRssMb": round(result["peakRssMb"], 1)
+        }
+        for name, result in results.items()
+    }
+
+
+def print_results(results: Dict, days: int, rounds: int):
+    print(f"{days} days of tee sheets, best of {rounds} rounds")
+    print(f"{'scraper':>15} {'stage':>8} {'rows':>6} {'seconds':>9} {'rows/s':>10}")
+    for name, result in results.items():
+        for stage, timing in result["stages"].items():
+            print(f"{name:>15} {stage:>8} {result['rows']:>6} {timing['seconds']:>9.4f} {timing['rowsPerSecond']:>10.0f}")
+    print(f"peak RSS {max(result['peakRssMb'] for result in results.values()):.0f} MB")
+
+
+def run(days: int, rounds: int, database_url: Optional[str], tolerance: float, update_baseline: bool,
+        baseline_file: Path = BASELINE_FILE) -> int:
+    baseline = None
+    if not update_baseline and baseline_file.exists():
+        baseline = json.loads(baseline_file.read_text())
+        if baseline.get("days") != days:
+            print(f"Baseline was recorded with --days {baseline.get('days')}; not comparing")
+            baseline = None
+
+    session_factory, engine = None, None
+    if database_url:
+        from sqlalchemy.orm import sessionmaker
+        import src.database.models  # noqa: F401, registers every table with Base
+        engine = create_db_engine(database_url, "benchmark")
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine, autoflush=False)
+    else:
+        print("No --database-url or TEST_DATABASE_URL; skipping the persist stage")
+
+    regressions = {}
+    try:
+        with StubServer(ROUTES) as stub:
+            results = {name: run_course(name, stub.base_url, days, rounds, session_factory) for name in SCRAPERS}
+            if baseline is not None:
+                # A busy machine slows single runs down; only a slowdown that repeats counts
+                for name in regressed_courses(results, baseline["results"], tolerance):
+                    results[name] = best_of(results[name], run_course(name, stub.base_url, days, rounds, session_factory))
+                regressions = regressed_courses(results, baseline["results"], tolerance)
+    finally:
+        if engine is not None:
+            engine.dispose()
+
+    print_results(results, days, rounds)
+    if update_baseline:
+        baseline_file.parent.mkdir(parents=True, exist_ok=True)
+        baseline_file.write_text(json.dumps({"days": days, "results": rounded(results)}, indent=2) + "\n")
+        print(f"Baseline written to {baseline_file}")
+    elif not baseline_file.exists():
+        print(f"No baseline at {baseline_file}; run with --update-baseline on this machine to record one")
+    for name, problems in regressions.items():
+        for problem in problems:
+            print(f"Regression: {name} {problem}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--database-url", default=os.getenv("TEST_DATABASE_URL"))
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Allowed slowdown before failing, as a fraction")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE, help="Baseline file recorded on this machine")
+    args = parser.parse_args()
+    # The fixtures include malformed rows on purpose; their warnings are expected
+    configure_logging("ERROR")
+    sys.exit(run(args.days, args.rounds, args.database_url, args.tolerance, args.update_baseline, args.baseline))
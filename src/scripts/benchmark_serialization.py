@@ -0,0 +1,121 @@
+"""
+Benchmark turning a 10k-row page of tee times into a response body, and scraped
+rows into the datetimes save_tee_times writes.
+
+  * format: select_tee_times() rows to the JSON body of a list response
+      legacy: pytz lookup and isoformat per row, FastAPI's jsonable_encoder
+              and json.dumps (what returning a dict from a route did)
+      current: format_tee_time keeping datetimes typed, FastJSONResponse
+              (orjson when installed)
+  * scrape: Vancouver City rows (a date and an HH:MM) to UTC datetimes
+      legacy: strptime, pytz localize, isoformat, then fromisoformat again
+              in save_tee_times
+      current: zoneinfo localize, handing the datetime straight over
+
+Needs no database:
+
+    python -m src.scripts.benchmark_serialization --rows 10000
+"""
+import argparse
+import json
+import statistics
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta, timezone
+
+import pytz
+from fastapi.encoders import jsonable_encoder
+
+from src.api.responses import FastJSONResponse
+from src.database.repositories.tee_time_repository import format_tee_time
+from src.utils.datetimes import ensure_utc, localize
+from src.utils.serialization import orjson
+
+# The columns of select_tee_times()
+Row = namedtuple("Row", "id course datetime timezone available_booking_sizes price currency starting_hole course_id")
+ZONE = "America/Vancouver"
+
+
+def generate_rows(count: int):
+    start = datetime(2030, 6, 1, 13, tzinfo=timezone.utc)
+    return [
+        Row(index, "Benchmark Course", start + timedelta(minutes=8 * index), ZONE, [1, 2, 3, 4][index % 4:], 55.0 + index % 7, "CAD", 1, 1)
+        for index in range(count)
+    ]
+
+
+def legacy_format(rows):
+    tee_times = [
+        {
+            "id": row.id,
+            "course": row.course,
+            "datetime": row.datetime.astimezone(pytz.timezone(row.timezone)).isoformat(),
+            "timezone": row.timezone,
+            "available_booking_sizes": row.available_booking_sizes,
+            "price": row.price,
+            "currency": row.currency,
+            "starting_hole": row.starting_hole
+        }
+        for row in rows
+    ]
+    content = jsonable_encoder({"teeTimes": tee_times, "pagination": {}})
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def current_format(rows):
+    return FastJSONResponse({"teeTimes": [format_tee_time(row) for row in rows], "pagination": {}}).body
+
+
+def generate_scraped(count: int):
+    day = date(2030, 6, 1)
+    return [(day + timedelta(days=index // 100), f"{6 + index % 100 // 8:02d}:{index % 8 * 7:02d}") for index in range(count)]
+
+
+def legacy_parse(scraped):
+    vancouver = pytz.timezone(ZONE)
+    parsed = [
+        vancouver.localize(datetime.strptime(f"{day} {clock}", "%Y-%m-%d %H:%M")).astimezone(pytz.UTC).isoformat()
+        for day, clock in scraped
+    ]
+    return [datetime.fromisoformat(value).astimezone(timezone.utc) for value in parsed]
+
+
+def current_parse(scraped):
+    parsed = []
+    for day, clock in scraped:
+        hour, minute = map(int, clock.split(':'))
+        parsed.append(localize(datetime(day.year, day.month, day.day, hour, minute), ZONE))
+    return [ensure_utc(value) for value in parsed]
+
+
+def measure(func, argument, repeat: int) -> float:
+    func(argument)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(argument)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def run(rows: int, repeat: int):
+    page, scraped = generate_rows(rows), generate_scraped(rows)
+    assert json.loads(legacy_format(page)) == json.loads(current_format(page))
+    assert legacy_parse(scraped) == current_parse(scraped)
+
+    print(f"{rows} rows, median of {repeat} runs, JSON encoder: {'orjson' if orjson else 'json'}")
+    print(f"{'stage':>8} {'legacy ms':>10} {'current ms':>11} {'speedup':>8}")
+    for name, legacy, current, argument in (
+        ("format", legacy_format, current_format, page),
+        ("scrape", legacy_parse, current_parse, scraped)
+    ):
+        legacy_ms, current_ms = measure(legacy, argument, repeat), measure(current, argument, repeat)
+        print(f"{name:>8} {legacy_ms:>10.1f} {current_ms:>11.1f} {legacy_ms / current_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=9)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
@@ -1,12 +1,17 @@
 from dotenv import load_dotenv
 load_dotenv()
 
+from alembic import command
+from alembic.config import Config
+
 from src.database.db_config import Base, engine
 import src.database.models  # This will import all models
 
 def create_tables():
     Base.metadata.create_all(bind=engine)
+    # Fresh schemas already match the models, so mark every migration as applied
+    command.stamp(Config("alembic.ini"), "head")
 
 if __name__ == "__main__":
     create_tables()
-    print("Database tables created successfully.")
\ No newline at end of file
+    print("Database tables created successfully.")
@@ -1,12 +1,12 @@
 import sys
 from pathlib import Path
 
-# Add the src directory to the Python path
-src_path = Path(__file__).resolve().parents[1]
-sys.path.append(str(src_path))
+# Add the project root to the Python path
+project_root = Path(__file__).resolve().parents[2]
+sys.path.append(str(project_root))
 
-from database.db_config import SessionLocal, engine
-from database.models.tee_time import Course, Base
+from src.database.db_config import SessionLocal, engine
+from src.database.models.tee_time import Course, Base
 from sqlalchemy.orm import Session
 
 def get_db():
@@ -0,0 +1,35 @@
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Tuple, Union
+from zoneinfo import ZoneInfo
+
+UTC = timezone.utc
+
+
+@lru_cache(maxsize=None)
+def get_timezone(name: str) -> ZoneInfo:
+    # ZoneInfo's own cache normalises the key on every call; this is a plain dict hit
+    return ZoneInfo(name)
+
+
+def localize(naive: datetime, zone: str) -> datetime:
+    """A wall clock time at a course as an aware UTC datetime."""
+    return naive.replace(tzinfo=get_timezone(zone)).astimezone(UTC)
+
+
+def to_local(value: datetime, zone: str) -> datetime:
+    return value.astimezone(get_timezone(zone))
+
+
+def local_day_bounds(day: date, zone: str) -> Tuple[datetime, datetime]:
+    """A course's local day as [midnight, next midnight) in UTC; 23 or 25 hours long when the clocks change."""
+    return localize(datetime.combine(day, time()), zone), localize(datetime.combine(day + timedelta(days=1), time()), zone)
+
+
+def ensure_utc(value: Union[str, datetime]) -> datetime:
+    """An aware UTC datetime from a datetime or an ISO 8601 string. Naive values are taken to be UTC."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value.astimezone(UTC)
@@ -0,0 +1,336 @@
+import asyncio
+import csv
+import io
+import json
+import subprocess
+import sys
+import threading
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from src.api.cache import CACHE_REQUESTS, MemoryCacheBackend, QueryCache, RedisCacheBackend
+from src.api.export import COLUMNS, ExportFormat, encode_export, make_encoder
+from src.api.feed import ChangeBroker, ChangeFilter, sse_events
+from src.api.responses import FastJSONResponse
+from src.api.routers.tee_times import SortOrder
+from src.database.change_relay import decode_changes, encode_changes
+from src.database.events import TeeTimeChange
+from src.monitoring.http import REQUEST_SECONDS, RequestMetricsMiddleware
+from src.monitoring.metrics import REGISTRY, Counter, Histogram
+from src.utils.datetimes import get_timezone, localize, to_local
+from src.utils.serialization import dumps, loads
+
+
+def result_with_slot(slot: datetime, course: str = "Test Course"):
+    return {"teeTimes": [{"id": 1, "course": course, "datetime": slot.isoformat()}], "pagination": {}}
+
+
+def in_an_hour():
+    return datetime.now(timezone.utc) + timedelta(hours=1)
+
+
+class Computer:
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.result
+
+
+def test_cache_hits_on_equivalent_params_and_counts_lookups():
+    cache = QueryCache(MemoryCacheBackend(), ttl_seconds=60)
+    compute = Computer(result_with_slot(in_an_hour()))
+    hits = CACHE_REQUESTS.value(endpoint="test_hits", result="hit")
+
+    first = cache.get_or_compute("test_hits", {"course": None, "sort_by": None, "sort_order": SortOrder.asc}, compute)
+    second = cache.get_or_compute("test_hits", {"course": None, "sort_by": "datetime", "sort_order": "asc"}, compute)
+
+    assert first == second
+    assert compute.calls == 1
+    assert CACHE_REQUESTS.value(endpoint="test_hits", result="hit") == hits + 1
+
+
+def test_cache_entries_expire_with_their_first_upcoming_slot():
+    cache = QueryCache(MemoryCacheBackend(), ttl_seconds=60)
+    compute = Computer(result_with_slot(datetime.now(timezone.utc) + timedelta(seconds=0.2)))
+
+    cache.get_or_compute("test_expiry", {}, compute)
+    cache.get_or_compute("test_expiry", {}, compute)
+    assert compute.calls == 1
+    time.sleep(0.3)
+    cache.get_or_compute("test_expiry", {}, compute)
+    assert compute.calls == 2
+
+
+def test_cache_serves_fresh_datetimes_as_the_iso_strings_responses_carry():
+    cache = QueryCache(MemoryCacheBackend(), ttl_seconds=60)
+    slot = (datetime.now(timezone.utc) + timedelta(hours=1)).astimezone(get_timezone("America/Vancouver"))
+    compute = Computer({"teeTimes": [{"id": 1, "course": "Test Course", "datetime": slot}], "pagination": {}})
+
+    first = cache.get_or_compute("test_datetimes", {}, compute)
+    second = cache.get_or_compute("test_datetimes", {}, compute)
+
+    assert compute.calls == 1
+    assert second["teeTimes"][0]["datetime"] == slot.isoformat()
+    assert json.loads(FastJSONResponse(first).body) == json.loads(FastJSONResponse(second).body) == second
+
+
+def test_serialization_writes_datetimes_with_their_offset():
+    slot = localize(datetime(2030, 6, 1, 8, 30), "America/Vancouver")
+
+    assert slot == datetime(2030, 6, 1, 15, 30, tzinfo=timezone.utc)
+    assert loads(dumps({"datetime": to_local(slot, "America/Vancouver"), "day": slot.date()})) == {
+        "datetime": "2030-06-01T08:30:00-07:00", "day": "2030-06-01"
+    }
+
+
+def test_memory_backend_evicts_least_recently_used_within_budget():
+    backend = MemoryCacheBackend(max_entries=2, max_bytes=1000)
+    backend.set("a", "*", "1", 60)
+    backend.set("b", "*", "2", 60)
+    backend.get("a", "*")
+    backend.set("c", "*", "3", 60)
+    assert [backend.get(key, "*") for key in "abc"] == ["1", None, "3"]
+
+    backend.set("big", "*", "x" * 990, 60)
+    assert backend.get("a", "*") is None and backend.get("big", "*") is not None
+    backend.set("too big", "*", "x" * 2000, 60)
+    assert backend.get("too big", "*") is None
+
+
+def make_redis_backend():
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisCacheBackend(client=fakeredis.FakeRedis())
+
+
+@pytest.mark.parametrize("make_backend", [MemoryCacheBackend, make_redis_backend], ids=["memory", "redis"])
+def test_invalidation_is_per_course(make_backend):
+    cache = QueryCache(make_backend(), ttl_seconds=60)
+    computers = {course: Computer(result_with_slot(in_an_hour(), course or "any")) for course in ("A", "B", None)}
+
+    def lookup(course):
+        return cache.get_or_compute("test_invalidation", {"course": course}, computers[course])
+
+    for course in computers:
+        lookup(course)
+    cache.invalidate(["A"])
+    for course in computers:
+        lookup(course)
+
+    # A's entry and the all-courses entry are dropped, B's survives
+    assert {course: computer.calls for course, computer in computers.items()} == {"A": 2, "B": 1, None: 2}
+
+    cache.invalidate(None)
+    lookup("B")
+    assert computers["B"].calls == 2
+
+
+@pytest.mark.parametrize("make_backend", [MemoryCacheBackend, make_redis_backend], ids=["memory", "redis"])
+def test_results_computed_across_an_invalidation_are_not_cached(make_backend):
+    cache = QueryCache(make_backend(), ttl_seconds=60)
+    stale = Computer(result_with_slot(in_an_hour(), "stale"))
+
+    def compute_while_a_save_lands():
+        cache.invalidate(["A"])
+        return stale()
+
+    cache.get_or_compute("test_race", {"course": "A"}, compute_while_a_save_lands)
+    fresh = cache.get_or_compute("test_race", {"course": "A"}, Computer(result_with_slot(in_an_hour(), "fresh")))
+    assert fresh["teeTimes"][0]["course"] == "fresh"
+
+
+def test_memory_backend_is_off_with_several_workers(monkeypatch):
+    monkeypatch.setenv("QUERY_CACHE_BACKEND", "memory")
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    assert QueryCache.from_env().backend is None
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "1")
+    assert isinstance(QueryCache.from_env().backend, MemoryCacheBackend)
+
+
+def test_redis_backend_is_shared_between_workers():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    workers = [QueryCache(RedisCacheBackend(client=fakeredis.FakeRedis(server=server))) for _ in range(2)]
+    compute = Computer(result_with_slot(in_an_hour()))
+
+    workers[0].get_or_compute("test_shared", {"course": "A"}, compute)
+    workers[1].get_or_compute("test_shared", {"course": "A"}, compute)
+    assert compute.calls == 1
+
+    workers[0].invalidate(["A"])
+    workers[1].get_or_compute("test_shared", {"course": "A"}, compute)
+    assert compute.calls == 2
+
+
+ExportRow = namedtuple("ExportRow", COLUMNS)
+
+
+def export_rows():
+    slot = datetime(2030, 6, 1, 15, 30, tzinfo=timezone.utc)
+    return [
+        ExportRow(1, "Test Course", slot, "America/Vancouver", [2, 4], 55.0, "CAD", 1),
+        ExportRow(2, "Test Course", slot + timedelta(minutes=8), "America/Vancouver", [], None, "CAD", 10)
+    ]
+
+
+async def as_batches(*batches):
+    for rows in batches:
+        yield rows
+
+
+def export(export_format: ExportFormat) -> bytes:
+    async def collect():
+        rows = export_rows()
+        return b"".join([chunk async for chunk in encode_export(as_batches(rows[:1], rows[1:]), make_encoder(export_format))])
+    return asyncio.run(collect())
+
+
+def test_ndjson_export_matches_list_responses():
+    lines = export(ExportFormat.ndjson).decode().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"id": 1, "course": "Test Course", "datetime": "2030-06-01T08:30:00-07:00", "timezone": "America/Vancouver",
+         "available_booking_sizes": [2, 4], "price": 55.0, "currency": "CAD", "starting_hole": 1},
+        {"id": 2, "course": "Test Course", "datetime": "2030-06-01T08:38:00-07:00", "timezone": "America/Vancouver",
+         "available_booking_sizes": [], "price": None, "currency": "CAD", "starting_hole": 10}
+    ]
+
+
+def test_csv_export_writes_one_header_and_a_row_per_tee_time():
+    rows = list(csv.DictReader(io.StringIO(export(ExportFormat.csv).decode())))
+    assert [row["id"] for row in rows] == ["1", "2"]
+    assert json.loads(rows[0]["available_booking_sizes"]) == [2, 4]
+    assert rows[1]["price"] == ""
+
+
+def test_arrow_export_is_one_ipc_stream():
+    pyarrow = pytest.importorskip("pyarrow")
+    table = pyarrow.ipc.open_stream(export(ExportFormat.arrow)).read_all()
+    assert table.column_names == list(COLUMNS)
+    assert table.column("id").to_pylist() == [1, 2]
+    assert table.column("datetime").to_pylist()[0] == datetime(2030, 6, 1, 15, 30, tzinfo=timezone.utc)
+    assert table.column("available_booking_sizes").to_pylist() == [[2, 4], []]
+
+
+def change(change_type: str = "added", course: str = "Test Course", sizes=(2, 3, 4), previous_sizes=None, day: int = 1):
+    return TeeTimeChange(
+        type=change_type, id=day, course_id=1, course=course, datetime=datetime(2030, 6, day, 15, 30, tzinfo=timezone.utc),
+        timezone="America/Vancouver", starting_hole=1, available_booking_sizes=list(sizes), price=50.0,
+        previous_available_booking_sizes=list(previous_sizes) if previous_sizes is not None else None
+    )
+
+
+def test_change_filter_matches_course_dates_and_party_size():
+    change_filter = ChangeFilter(courses={"Test Course"}, start_date=date(2030, 6, 2), end_date=date(2030, 6, 3), players=4)
+    assert change_filter.matches(change(day=2))
+    assert not change_filter.matches(change(day=1))
+    assert not change_filter.matches(change(day=2, course="Other Course"))
+    assert not change_filter.matches(change(day=2, sizes=(2,)))
+    # A party hears when a slot it could have taken stops fitting, or goes
+    assert change_filter.matches(change("availability_changed", day=2, sizes=(2,), previous_sizes=(2, 4)))
+    assert change_filter.matches(change("sold_out", day=2, sizes=()))
+
+
+def test_relayed_changes_fit_notify_payloads_and_round_trip():
+    changes = [change(day=day % 28 + 1) for day in range(100)]
+    payloads = encode_changes(changes, limit=2000)
+
+    assert len(payloads) > 1 and all(len(payload) <= 2000 for payload in payloads)
+    assert sum((decode_changes(payload) for payload in payloads), []) == changes
+
+
+def test_broker_fans_out_changes_published_from_other_threads():
+    async def scenario():
+        broker = ChangeBroker()
+        everything = broker.subscribe(ChangeFilter())
+        others_only = broker.subscribe(ChangeFilter(courses={"Other Course"}))
+        writer = threading.Thread(target=broker.publish, args=([change(), change(course="Other Course", day=2)],))
+        writer.start()
+        writer.join()
+        received = [await asyncio.wait_for(everything.queue.get(), 1) for _ in range(2)]
+        other = await asyncio.wait_for(others_only.queue.get(), 1)
+        return received, other, others_only.queue.empty()
+
+    received, other, drained = asyncio.run(scenario())
+    assert [(event.type, event.data["course"]) for event in received] == [("added", "Test Course"), ("added", "Other Course")]
+    assert received[0].data["datetime"].isoformat() == "2030-06-01T08:30:00-07:00"
+    assert other.id == received[1].id and drained
+
+
+def test_broker_disconnects_subscribers_that_fall_behind():
+    async def scenario():
+        broker = ChangeBroker(queue_size=3)
+        slow = broker.subscribe(ChangeFilter())
+        broker._fan_out([change(day=day) for day in range(1, 6)])
+        events = [frame async for frame in sse_events(broker, slow, heartbeat_seconds=1)]
+        return broker, events
+
+    broker, frames = asyncio.run(scenario())
+    assert frames[0] == ": subscribed\n\n"
+    assert [frame.split("\n")[1] for frame in frames[1:]] == ["event: overflow"]
+    assert broker.stats()["subscribers"] == 0
+
+
+def test_broker_turns_subscribers_away_when_full():
+    async def scenario():
+        broker = ChangeBroker(max_subscribers=1)
+        broker.subscribe(ChangeFilter())
+        with pytest.raises(RuntimeError):
+            broker.subscribe(ChangeFilter())
+
+    asyncio.run(scenario())
+
+
+def test_importing_the_app_defers_scrapers_and_database_engines():
+    code = (
+        "import sys, src.api.main, src.database.db_config as db_config;"
+        "print([name for name in ('selenium', 'webdriver_manager', 'asyncpg') if name in sys.modules],"
+        " db_config._engine, db_config._async_engine)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "[] None None"
+
+
+def test_metrics_render_in_the_prometheus_text_format():
+    lookups = Counter("test_render_lookups_total", "Lookups", labelnames=("result",))
+    lookups.inc(2, result='a "quoted" hit')
+    waits = Histogram("test_render_wait_seconds", "Waits", buckets=(0.1, 1.0))
+    waits.observe(0.05)
+    waits.observe(2)
+
+    lines = REGISTRY.render().splitlines()
+
+    assert "# TYPE test_render_lookups_total counter" in lines
+    assert 'test_render_lookups_total{result="a \\"quoted\\" hit"} 2' in lines
+    assert 'test_render_wait_seconds_bucket{le="0.1"} 1' in lines
+    assert 'test_render_wait_seconds_bucket{le="1"} 1' in lines
+    assert 'test_render_wait_seconds_bucket{le="+Inf"} 2' in lines
+    assert "test_render_wait_seconds_sum 2.05" in lines
+    assert "test_render_wait_seconds_count 2" in lines
+
+
+def test_request_latency_is_labelled_by_route_template():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware)
+
+    @app.get("/test-metrics/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    client = TestClient(app)
+    client.get("/test-metrics/1")
+    client.get("/test-metrics/2")
+    client.get("/test-metrics-missing")
+
+    latencies = REQUEST_SECONDS.values()
+    assert latencies[("GET", "/test-metrics/{item_id}", "200")][2] == 2
+    assert latencies[("GET", "unmatched", "404")][2] >= 1
@@ -0,0 +1,671 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import date, datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from src.scrapers import driver_pool
+from src.scrapers.base_scraper import BaseScraper
+from src.scrapers.driver_pool import DriverPool
+from src.scrapers.http_client import close_http_client
+from src.scrapers.jobs import ScrapeJobManager
+from src.scrapers.mayfair_lakes_scraper import MayfairLakesScraper
+from src.scrapers.orchestrator import ScrapeOrchestrator, ScrapeResult
+from src.scrapers.registry import ScraperRegistry
+from src.scrapers.scheduler import ScrapeScheduler, parse_schedule
+from src.scrapers.vancouver_city_scraper import VancouverCityScraper
+from src.scrapers.waits import LatencyTracker, WAIT_SECONDS, WaitStrategy
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+class FakeScraper(BaseScraper):
+    delay = 0.2
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self):
+        super().__init__("http://example.invalid")
+        self.closed = threading.Event()
+
+    async def scrape(self):
+        cls = type(self)
+        with cls.lock:
+            cls.running += 1
+            cls.peak = max(cls.peak, cls.running)
+        try:
+            # Blocking on purpose, like the Selenium scrapers
+            deadline = time.monotonic() + cls.delay
+            while time.monotonic() < deadline and not self.closed.is_set():
+                time.sleep(0.01)
+            if self.closed.is_set():
+                raise RuntimeError("browser closed")
+            return [{'course_name': cls.__name__}]
+        finally:
+            with cls.lock:
+                cls.running -= 1
+
+    async def scrape_unit(self, unit):
+        return []
+
+    async def parse_tee_time(self, raw_data):
+        return raw_data
+
+    def close(self):
+        self.closed.set()
+
+
+def make_scraper(name, delay=0.2):
+    return type(name, (FakeScraper,), {'delay': delay, 'running': 0, 'peak': 0, 'lock': threading.Lock()})
+
+
+def test_orchestrator_runs_scrapers_concurrently_off_the_event_loop():
+    scrapers = {name: make_scraper(name) for name in ("a", "b", "c")}
+    orchestrator = ScrapeOrchestrator(max_workers=4, max_browsers=3)
+    persisted = []
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        results = await orchestrator.run(scrapers, lambda course, tee_times, scraped_dates: persisted.append(course))
+        ticking.cancel()
+        return results, time.perf_counter() - started, ticks
+
+    results, elapsed, ticks = asyncio.run(run())
+
+    assert sorted(persisted) == ["a", "b", "c"]
+    assert all(result.error is None and result.tee_times_found == 1 for result in results.values())
+    assert elapsed < 0.5
+    # The loop kept serving while scrapers blocked their threads
+    assert ticks > 5
+
+
+def test_orchestrator_respects_browser_cap():
+    scrapers = {name: make_scraper(name, delay=0.1) for name in ("a", "b", "c", "d")}
+    orchestrator = ScrapeOrchestrator(max_workers=4, max_browsers=1)
+
+    started = time.perf_counter()
+    asyncio.run(orchestrator.run(scrapers, lambda course, tee_times, scraped_dates: None))
+
+    assert time.perf_counter() - started >= 0.4
+
+
+def test_orchestrator_limits_concurrency_per_course():
+    scraper = make_scraper("same_course", delay=0.1)
+    orchestrator = ScrapeOrchestrator(max_workers=4, max_browsers=4, per_course_limit=1)
+
+    async def run():
+        await asyncio.gather(*(orchestrator.run_one("same_course", scraper, lambda c, t: None) for _ in range(3)))
+
+    asyncio.run(run())
+
+    assert scraper.peak == 1
+
+
+def test_orchestrator_persists_each_course_as_it_finishes():
+    scrapers = {"slow": make_scraper("slow", delay=0.5), "fast": make_scraper("fast", delay=0.05)}
+    orchestrator = ScrapeOrchestrator(max_workers=4, max_browsers=2)
+    persisted_at = {}
+    started = time.perf_counter()
+
+    asyncio.run(orchestrator.run(scrapers, lambda course, tee_times, scraped_dates: persisted_at.setdefault(course, time.perf_counter() - started)))
+
+    assert persisted_at["fast"] < 0.3 < persisted_at["slow"]
+
+
+def test_orchestrator_aborts_scrapers_that_time_out():
+    scrapers = {"hung": make_scraper("hung", delay=10)}
+    orchestrator = ScrapeOrchestrator(max_workers=2, max_browsers=1, timeout_seconds=0.1, abort_grace_seconds=1)
+    persisted = []
+
+    results = asyncio.run(orchestrator.run(scrapers, lambda course, tee_times, scraped_dates: persisted.append(course)))
+
+    assert "timed out" in results["hung"].error
+    assert persisted == []
+
+
+class FakeDriver:
+    def __init__(self):
+        self.healthy = True
+        self.quit_called = False
+
+    def get(self, url):
+        if not self.healthy:
+            raise RuntimeError("session gone")
+
+    def execute_script(self, script):
+        return 1
+
+    def quit(self):
+        self.quit_called = True
+
+
+def make_pool(**kwargs):
+    spawned = []
+
+    def factory():
+        spawned.append(FakeDriver())
+        return spawned[-1]
+
+    return DriverPool(driver_factory=factory, **kwargs), spawned
+
+
+def test_driver_pool_reuses_returned_drivers():
+    pool, spawned = make_pool(size=2)
+
+    with pool.lease() as first:
+        pass
+    with pool.lease() as second:
+        pass
+
+    assert first is second
+    assert len(spawned) == 1
+
+
+def test_driver_pool_warm_pre_spawns_sessions():
+    pool, spawned = make_pool(size=3, warm_sessions=2)
+
+    pool.warm()
+
+    assert len(spawned) == 2
+    with pool.lease() as driver:
+        assert driver in spawned
+    assert len(spawned) == 2
+
+
+def test_driver_pool_recycles_after_max_uses():
+    pool, spawned = make_pool(size=1, max_uses=2)
+
+    for _ in range(3):
+        with pool.lease():
+            pass
+
+    assert len(spawned) == 2
+    assert spawned[0].quit_called
+
+
+def test_driver_pool_replaces_unhealthy_drivers():
+    pool, spawned = make_pool(size=1)
+    with pool.lease() as driver:
+        pass
+    driver.healthy = False
+
+    with pool.lease() as replacement:
+        assert replacement is not driver
+
+    assert driver.quit_called
+
+
+def test_driver_pool_blocks_when_exhausted():
+    pool, _ = make_pool(size=1)
+
+    with pool.lease():
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=0.05)
+
+
+def test_driver_pool_discarded_driver_is_not_returned():
+    pool, spawned = make_pool(size=1)
+
+    with pool.lease() as driver:
+        pool.discard(driver)
+    with pool.lease() as replacement:
+        pass
+
+    assert driver.quit_called
+    assert replacement is not driver
+
+
+def test_resolve_driver_path_uses_disk_cache(tmp_path, monkeypatch):
+    binary = tmp_path / "chromedriver"
+    binary.write_text("")
+    cache_file = tmp_path / "chromedriver.json"
+    cache_file.write_text(json.dumps({'path': str(binary), 'resolved_at': time.time()}))
+    monkeypatch.setattr(driver_pool, "DRIVER_CACHE_FILE", cache_file)
+    monkeypatch.setattr(driver_pool, "_driver_path", None)
+
+    assert driver_pool.resolve_driver_path() == str(binary)
+
+
+@pytest.fixture
+def stub_server():
+    """Serves recorded tee sheet pages; `routes` maps a path prefix to (status, fixture file)."""
+    routes = {}
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests.append(self.path)
+            for prefix, (status, fixture) in routes.items():
+                if self.path.startswith(prefix):
+                    body = (FIXTURES / fixture).read_bytes() if fixture else b""
+                    self.send_response(status)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+            self.send_error(404)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.routes = routes
+    server.requests = requests
+    server.base_url = f"http://127.0.0.1:{server.server_port}"
+    yield server
+    server.shutdown()
+
+
+def run_scraper(coroutine_factory):
+    async def run():
+        try:
+            return await coroutine_factory()
+        finally:
+            await close_http_client()
+    return asyncio.run(run())
+
+
+def test_vancouver_city_extracts_rows_from_html():
+    html = (FIXTURES / "vancouver_city" / "tee_sheet.html").read_text()
+    scraper = VancouverCityScraper()
+
+    rows = scraper.extract_raw_data_from_html(html, date(2024, 6, 1))
+
+    # The malformed row is skipped; rows hidden behind "Show More Times" are included
+    assert [(row['time'], row['course_name']) for row in rows] == [
+        ("07:00", "Fraserview"), ("07:08", "Fraserview"), ("09:30", "Langara"),
+        ("13:15", "McCleery"), ("16:40", "McCleery")
+    ]
+    assert rows[0] == {'date': date(2024, 6, 1), 'time': "07:00", 'price': "65.00", 'course_name': "Fraserview", 'players': "2 to 4 Players"}
+
+
+def test_vancouver_city_http_scrape_against_stub_server(stub_server):
+    stub_server.routes["/CityofVancouver/Home/nIndex"] = (200, "vancouver_city/tee_sheet.html")
+    scraper = VancouverCityScraper(f"{stub_server.base_url}/CityofVancouver/Home/nIndex?CourseId=2,1,3&Date=")
+
+    tee_times = run_scraper(scraper.scrape_http)
+
+    assert len(stub_server.requests) == 5
+    assert len(tee_times) == 25
+    assert tee_times[0]['course_name'] == "Fraserview"
+    assert tee_times[0]['price'] == 65.0
+    assert tee_times[0]['available_booking_sizes'] == [2, 3, 4]
+    assert tee_times[0]['datetime'].tzinfo == timezone.utc
+
+
+def test_http_failure_falls_back_to_browser_scrape(stub_server, monkeypatch):
+    stub_server.routes["/CityofVancouver/Home/nIndex"] = (503, None)
+    scraper = VancouverCityScraper(f"{stub_server.base_url}/CityofVancouver/Home/nIndex?CourseId=2,1,3&Date=")
+
+    async def browser_scrape():
+        return [{'course_name': "from browser"}]
+
+    monkeypatch.setattr(scraper, "scrape", browser_scrape)
+
+    assert run_scraper(scraper.run) == [{'course_name': "from browser"}]
+
+
+def test_mayfair_lakes_extracts_rows_from_page_source():
+    html = (FIXTURES / "mayfair_lakes" / "tee_sheet.html").read_text()
+    scraper = MayfairLakesScraper()
+
+    rows = scraper.extract_raw_data_from_html(html)
+    parsed = [asyncio.run(scraper.parse_tee_time(row)) for row in rows]
+
+    assert len(rows) == 4
+    assert rows[0]['time'] == "7:00 AM 18 Holes"
+    assert rows[0]['price'] == "Green Fee: $59.00/Player"
+    assert [tee_time['available_booking_sizes'] for tee_time in parsed] == [[2, 3, 4], [1, 2, 3, 4], [2], [1, 2, 3]]
+    assert [tee_time['starting_hole'] for tee_time in parsed] == [1, 1, 10, 1]
+    assert parsed[0]['datetime'] == datetime(2024, 6, 1, 14, 0, tzinfo=timezone.utc)
+    assert parsed[0]['price'] == 59.0
+
+
+class CalendarItem:
+    def __init__(self, selected):
+        self.selected = selected
+
+    def get_attribute(self, name):
+        return "day selected" if self.selected else "day"
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        # Never goes stale: clicks do not post back
+        return True
+
+
+class CalendarPageDriver:
+    """A Mayfair Lakes page with no tee times whose calendar clicks do nothing."""
+
+    def __init__(self):
+        self.items = {f"customcaleder_{index}": CalendarItem(selected=index == 0) for index in range(3)}
+        self.clicked = []
+
+    def get(self, url):
+        pass
+
+    def find_element(self, by, value):
+        return self.items[value]
+
+    def find_elements(self, by, value):
+        return [self.items[value]] if value in self.items else []
+
+    def execute_script(self, script, *args):
+        if "click()" in script:
+            self.clicked.append(args[0])
+            return None
+        if "readyState" in script:
+            return ["complete", 0, 10]
+        return 1
+
+
+def test_mayfair_lakes_does_not_wait_out_clicks_that_do_not_post_back(monkeypatch):
+    page = CalendarPageDriver()
+    monkeypatch.setattr(driver_pool, "_pool", DriverPool(driver_factory=lambda: page, size=1))
+    monkeypatch.setattr("src.scrapers.mayfair_lakes_scraper.POSTBACK_START_SECONDS", 0.2)
+    scraper = MayfairLakesScraper()
+    today, tomorrow = scraper.work_units()[:2]
+
+    # The day already selected is not clicked at all
+    started = time.perf_counter()
+    assert asyncio.run(scraper.scrape_unit(today)) == []
+    assert page.clicked == [] and time.perf_counter() - started < 1
+
+    # Another day's click gets only the short postback window, not the 10s adaptive minimum
+    started = time.perf_counter()
+    assert asyncio.run(scraper.scrape_unit(tomorrow)) == []
+    assert page.clicked == [page.items["customcaleder_1"]] and time.perf_counter() - started < 1.5
+
+
+class UnitScraper(BaseScraper):
+    def __init__(self, **kwargs):
+        super().__init__("http://example.invalid", **kwargs)
+
+    async def scrape_unit(self, unit):
+        # Later days finish first to prove the merge order does not depend on timing
+        time.sleep(0.1 * (self.horizon_days - unit.index))
+        if unit.index == 2:
+            raise RuntimeError("page failed to load")
+        return [{'day': unit.index}]
+
+    async def parse_tee_time(self, raw_data):
+        return raw_data
+
+
+def test_registry_reads_config_and_imports_scrapers_on_lookup(tmp_path):
+    config = tmp_path / "config.yml"
+    config.write_text(
+        "scrapers:\n"
+        "  vancouver_city: src.scrapers.vancouver_city_scraper:VancouverCityScraper\n"
+        "  broken: src.scrapers.vancouver_city_scraper\n"
+    )
+    registry = ScraperRegistry.from_config(str(config))
+
+    assert list(registry) == ["vancouver_city", "broken"] and "vancouver_city" in registry
+    assert registry.loaded() == {"vancouver_city": False, "broken": False}
+    assert registry["vancouver_city"] is VancouverCityScraper
+    assert registry.loaded()["vancouver_city"]
+    with pytest.raises(ValueError):
+        registry["broken"]
+
+
+def test_default_config_lists_every_scraper():
+    registry = ScraperRegistry.from_config()
+
+    assert dict(registry.items()) == {"mayfair_lakes": MayfairLakesScraper, "vancouver_city": VancouverCityScraper}
+
+
+def test_work_units_cover_the_configured_horizon(monkeypatch):
+    monkeypatch.setenv("SCRAPE_HORIZON_DAYS", "14")
+
+    units = UnitScraper().work_units()
+
+    assert [unit.index for unit in units] == list(range(14))
+    assert units[13].date - units[0].date == (units[1].date - units[0].date) * 13
+
+
+def test_browser_units_fan_out_and_merge_in_unit_order():
+    scraper = UnitScraper(horizon_days=4, unit_concurrency=4)
+
+    started = time.perf_counter()
+    tee_times = asyncio.run(scraper.scrape())
+    elapsed = time.perf_counter() - started
+
+    # Unit 2 failed and only its own day is lost
+    assert tee_times == [{'day': 0}, {'day': 1}, {'day': 3}]
+    assert elapsed < 0.6
+    # ...and is not reported as scraped, so its saved slots are not sold out
+    units = scraper.work_units()
+    assert scraper.scraped_dates == {units[0].date, units[1].date, units[3].date}
+
+
+class RowsDriver:
+    """Answers the wait scripts like a page whose rows keep arriving for a while."""
+
+    def __init__(self, counts):
+        self.counts = list(counts)
+
+    def execute_script(self, script, *args):
+        if len(self.counts) > 1:
+            return self.counts.pop(0)
+        return self.counts[0]
+
+
+def test_latency_tracker_adapts_to_observed_waits():
+    tracker = LatencyTracker(initial=1.0)
+    for _ in range(50):
+        tracker.record(0.1)
+
+    assert tracker.mean == pytest.approx(0.1, abs=0.01)
+    assert tracker.poll_interval() == 0.05
+    assert tracker.timeout(floor=0.2, ceiling=30) == pytest.approx(0.2, abs=0.05)
+
+
+def test_row_count_stable_waits_for_rows_to_stop_arriving():
+    waits = WaitStrategy(RowsDriver([0, 3, 7, 12, 12]), "test_rows", min_timeout=2, max_timeout=2)
+    observed = WAIT_SECONDS.values().get(("test_rows", "row_count_stable"), ([], 0.0, 0))[2]
+
+    assert waits.row_count_stable("span", stable_for=0.05) == 12
+    assert WAIT_SECONDS.values()[("test_rows", "row_count_stable")][2] == observed + 1
+
+
+def test_wait_times_out_when_condition_never_holds():
+    waits = WaitStrategy(RowsDriver([0]), "test_empty")
+
+    started = time.perf_counter()
+    with pytest.raises(TimeoutException):
+        waits.row_count_stable("span", more_than=0, timeout=0.3)
+
+    assert time.perf_counter() - started < 1
+    assert WAIT_SECONDS.values()[("test_empty", "row_count_stable")][2] == 1
+
+
+def test_work_units_can_be_limited_to_some_days():
+    scraper = UnitScraper(horizon_days=5)
+    scraper.days = {0, 3, 9}
+
+    assert [unit.index for unit in scraper.work_units()] == [0, 3]
+
+
+def test_parse_schedule():
+    near, far = parse_schedule("0-2:900, 3-:3600")
+
+    assert near.days() == {0, 1, 2} and near.interval_seconds == 900
+    assert far.first_day == 3 and far.last_day is None and 13 in far.days()
+    with pytest.raises(ValueError):
+        parse_schedule("soon:often")
+
+
+class RecordingOrchestrator:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.active = set()
+        self.overlaps = 0
+
+    async def run_one(self, course, scraper_class, persist, days=None):
+        if course in self.active:
+            self.overlaps += 1
+        self.active.add(course)
+        self.calls.append((course, frozenset(days)))
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active.discard(course)
+        return ScrapeResult(course=course)
+
+
+class FakeLeader:
+    def __init__(self, leader):
+        self.leader = leader
+        self.released = False
+
+    def try_acquire(self):
+        return self.leader
+
+    def release(self):
+        self.released = True
+
+
+def run_scheduler(scheduler, seconds):
+    async def run():
+        scheduler.start()
+        await asyncio.sleep(seconds)
+        await scheduler.stop()
+
+    asyncio.run(run())
+
+
+def test_scheduler_refreshes_near_days_more_often_than_far_days():
+    orchestrator = RecordingOrchestrator()
+    schedules = {"a": parse_schedule("0-1:0.1,2-:0.3"), "b": parse_schedule("0-:0.3")}
+    scheduler = ScrapeScheduler(orchestrator, {"a": UnitScraper, "b": UnitScraper}, None, schedules, jitter=0)
+
+    run_scheduler(scheduler, 0.65)
+
+    a_calls = [days for course, days in orchestrator.calls if course == "a"]
+    near = sum(1 for days in a_calls if 0 in days)
+    far = sum(1 for days in a_calls if 5 in days)
+    assert 5 <= near <= 7 and 2 <= far <= 3
+    # Tiers due at the same time are merged into one scrape
+    assert 0 in a_calls[0] and 5 in a_calls[0]
+    assert 2 <= sum(1 for course, _ in orchestrator.calls if course == "b") <= 3
+
+
+def test_scheduler_never_overlaps_scrapes_of_a_course():
+    orchestrator = RecordingOrchestrator(delay=0.25)
+    scheduler = ScrapeScheduler(orchestrator, {"a": UnitScraper}, None, {"a": parse_schedule("0-:0.05")}, jitter=0.2)
+
+    run_scheduler(scheduler, 0.6)
+
+    assert orchestrator.overlaps == 0
+    assert 2 <= len(orchestrator.calls) <= 3
+
+
+def test_scheduler_only_scrapes_while_leader():
+    orchestrator = RecordingOrchestrator()
+    leader = FakeLeader(False)
+    prepared = []
+    scheduler = ScrapeScheduler(orchestrator, {"a": UnitScraper}, None, {"a": parse_schedule("0-:0.05")},
+                                leader=leader, leader_retry_seconds=0.05, prepare=lambda: prepared.append(True))
+
+    run_scheduler(scheduler, 0.2)
+    assert orchestrator.calls == [] and scheduler.status()["leader"] is False
+    # Followers never start browsers
+    assert prepared == []
+
+    leader.leader = True
+    run_scheduler(scheduler, 0.2)
+    assert orchestrator.calls and leader.released
+    assert prepared == [True]
+
+
+def test_scrape_jobs_join_the_running_job_of_a_course():
+    scraper = make_scraper("joined", delay=0.2)
+    persisted = []
+    jobs = ScrapeJobManager(ScrapeOrchestrator(max_workers=4, max_browsers=4), {"a": scraper},
+                            lambda course, tee_times, scraped_dates: persisted.append(course))
+
+    async def run():
+        submitted = await asyncio.gather(*(jobs.submit("a") for _ in range(5)))
+        assert (await jobs.get(submitted[0][0].id)).status == "running"
+        await submitted[0][0].task
+        return submitted, await jobs.get(submitted[0][0].id)
+
+    submitted, finished = asyncio.run(run())
+
+    assert [outcome for _, outcome in submitted] == ["started"] + ["joined"] * 4
+    assert len({job.id for job, _ in submitted}) == 1
+    assert persisted == ["a"] and scraper.peak == 1
+    assert finished.to_dict()["status"] == "succeeded"
+    assert finished.tee_times_found == 1
+
+
+def test_requests_join_scheduled_scrapes():
+    scraper = make_scraper("scheduled", delay=0.3)
+    jobs = ScrapeJobManager(ScrapeOrchestrator(max_workers=4, max_browsers=4), {"a": scraper},
+                            lambda course, tee_times, scraped_dates: None)
+    scheduler = ScrapeScheduler(None, {"a": scraper}, None, {"a": parse_schedule("0-:10")}, jitter=0, jobs=jobs)
+
+    async def run():
+        scheduler.start()
+        await asyncio.sleep(0.05)
+        job, outcome = await jobs.submit("a")
+        await job.task
+        await scheduler.stop()
+        return job, outcome
+
+    job, outcome = asyncio.run(run())
+
+    assert outcome == "joined" and job.status == "succeeded"
+    assert scraper.peak == 1
+
+
+class FailingScraper(FakeScraper):
+    async def scrape(self):
+        raise RuntimeError("site down")
+
+
+def test_scrape_jobs_reuse_fresh_results_unless_forced():
+    scrapers = {"a": make_scraper("fresh", delay=0.01), "b": FailingScraper}
+    jobs = ScrapeJobManager(ScrapeOrchestrator(), scrapers, lambda course, tee_times, scraped_dates: None, freshness_seconds=0.2)
+
+    async def submit(course, force=False):
+        job, outcome = await jobs.submit(course, force=force)
+        if job.task is not None:
+            await job.task
+        return job, outcome
+
+    async def run():
+        first, _ = await submit("a")
+        outcomes = [(await submit("a"))[1], (await submit("a", force=True))[1]]
+        await asyncio.sleep(0.25)
+        outcomes.append((await submit("a"))[1])
+        failed, _ = await submit("b")
+        outcomes.append((await submit("b"))[1])
+        return first, failed, outcomes
+
+    first, failed, outcomes = asyncio.run(run())
+
+    assert outcomes == ["reused", "started", "started", "started"]
+    assert failed.status == "failed" and failed.error